@@ -0,0 +1,99 @@
+'''
+Created on 18 oct 2026
+
+@desc: Cache of images, fonts and rendered texts
+@author: Alejandro R. Lopez
+'''
+
+# Imports
+import pygame as pg
+import os
+from collections import OrderedDict
+
+# Folder of the graphical resources, independent of the working directory and the platform
+IMG_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "img")
+
+# Caches
+images = {}
+fonts = {}
+texts = OrderedDict()
+MAX_TEXTS = 256
+
+def img_path(name):
+    """
+    Returns the path of a graphical resource
+
+        Parameters:
+            name (str): File name inside the img folder
+    """
+
+    return os.path.join(IMG_DIR, name)
+
+def load_image(name, size = None):
+    """
+    Returns an image with alpha, loading it from disk only the first time.
+    Scaled versions are kept, one for each size requested; the original is
+    only kept if it is requested without size, since some resources are large.
+
+        Parameters:
+            name (str): File name inside the img folder
+            size (float tuple): Width and height to scale the image to, if needed
+
+        Returns:
+            Pygame surface of the image
+    """
+
+    if size is not None: size = (round(size[0]), round(size[1]))
+    key = (name, size)
+    img = images.get(key)
+    if img is None:
+        img = images.get((name, None)) or pg.image.load(img_path(name)).convert_alpha()
+        if size is not None: img = pg.transform.scale(img, size)
+        images[key] = img
+    return img
+
+def get_font(name, size):
+    """
+    Returns a system font, creating it only the first time
+
+        Parameters:
+            name (str): Name of the font
+            size (int): Size of the font
+    """
+
+    key = (name, size)
+    font = fonts.get(key)
+    if font is None: font = fonts[key] = pg.font.SysFont(name, size)
+    return font
+
+def render_text(font_name, size, text, colour = (0,0,0), background = None):
+    """
+    Returns a rendered text, rendering it only if it is not among the last MAX_TEXTS used
+
+        Parameters:
+            font_name (str): Name of the font
+            size (int): Size of the font
+            text (str): Text to render
+            colour (int tuple): Colour of the text
+            background (int tuple): Colour of the background, transparent if None
+
+        Returns:
+            Pygame surface of the text
+    """
+
+    key = (font_name, size, text, colour, background)
+    surface = texts.get(key)
+    if surface is None:
+        surface = texts[key] = get_font(font_name, size).render(text, True, colour, background)
+        if len(texts) > MAX_TEXTS: texts.popitem(last=False)
+    else: texts.move_to_end(key)
+    return surface
+
+def clear():
+    """
+    Empties every cache, for instance when the display is recreated
+    """
+
+    images.clear()
+    fonts.clear()
+    texts.clear()
@@ -0,0 +1,382 @@
+'''
+Created on 18 oct 2026
+
+@desc: Seeded benchmarks of the simulation, world generation and rendering, compared with a stored baseline
+@author: Alejandro R. Lopez
+'''
+
+# Imports
+from graphics import world_gen as wg
+from graphics import species_gen as sg
+from graphics import menu_info as mi
+from graphics import rng
+from graphics import species
+from graphics import species_stats
+from graphics import lifecycle
+from graphics.population import Population
+from graphics.camera import Camera, ChunkedBackground
+import numpy as np
+import pygame as pg
+import argparse
+import fnmatch
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+# Default files of the results
+BASELINE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks", "baseline.json")
+
+# Scenarios
+POPULATIONS = [1000, 10000, 100000]
+WORLD_SIZES = [25, 100, 250, 500, 1000]
+N_SPECIES = 10
+SQ_SIZE = 35
+WINDOW = 875
+
+# Relative slowdown reported as a regression for the scenarios whose fastest time varies more
+# than the default tolerance between runs of the same code (blits to large surfaces, days)
+TOLERANCES = {"render/*": 0.75, "update/*/1000": 0.5, "update/*/10000": 0.5}
+
+def reset(seed):
+    """
+    Seeds the random streams and empties the module state, so every scenario starts the same way
+
+        Parameters:
+            seed (int): Seed of the random streams
+    """
+
+    rng.seed(seed)
+    species.reset_taxonomy()
+    species.next_id = 0
+    sg.pregnancies.clear()
+    species_stats.reset()
+    lifecycle.reset()
+
+def world_side(n):
+    """
+    Returns the tiles of each side of a world for n individuals, about ten per tile
+
+        Parameters:
+            n (int): Number of individuals
+    """
+
+    return max(25, round((n/10)**0.5))
+
+def make_population(n, engine, seed):
+    """
+    Returns a seeded world and a population of about n individuals of N_SPECIES species
+
+        Parameters:
+            n (int): Number of individuals
+            engine (str): "objects" for a list of Species, "arrays" for a Population
+            seed (int): Seed of the random streams
+
+        Returns:
+            bg_mat (int 2d array): Numerical info of the world
+            individuals (list of Species or Population): Individuals
+            n_squares (int): Tiles of each side of the world
+    """
+
+    reset(seed)
+    n_squares = world_side(n)
+    bg_mat = wg.createBg(n_squares)
+    individuals = Population() if engine == "arrays" else []
+    for _ in range(N_SPECIES):
+        sg.gen_individuals(n_squares, SQ_SIZE, bg_mat, individuals, n//N_SPECIES - 1)
+    if engine == "arrays": individuals._flush()                                        # Species objects moved into the arrays
+    return bg_mat, individuals, n_squares
+
+def measure(call, samples, setup = None):
+    """
+    Returns the median and the fastest time of some calls to a function. The garbage collector
+    is off while timing, like in timeit, so the times do not depend on the objects left by other
+    scenarios.
+
+        Parameters:
+            call (function): Function measured, given the result of setup if there is one
+            samples (int): Calls measured
+            setup (function): Function called before each call, not measured
+
+        Returns:
+            metrics (dict): Median ("seconds") and fastest ("min_seconds") time of a call
+    """
+
+    times = []
+    for _ in range(samples):
+        arg = setup() if setup is not None else None
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            if setup is not None: call(arg)
+            else: call()
+            times.append(time.perf_counter() - start)
+        finally: gc.enable()
+    return {"seconds": statistics.median(times), "min_seconds": min(times)}
+
+def bench_update(n, engine, samples, seed):
+    """
+    Measures the time of update_individuals on a population of n individuals. Crowding kills
+    about 40% of the population each day, so every sample is the first day of a new population.
+
+        Parameters:
+            n (int): Number of individuals
+            engine (str): "objects" or "arrays"
+            samples (int): Days measured
+            seed (int): Seed of the random streams
+    """
+
+    update = lambda p: sg.update_individuals(p[1], p[2], SQ_SIZE, p[0])
+    update(make_population(n, engine, seed))                                            # Caches filled once
+    metrics = measure(update, samples, lambda: make_population(n, engine, seed))
+    metrics["population"] = n
+    return metrics
+
+def bench_world(n_squares, samples, seed):
+    """
+    Measures the time of createBg
+
+        Parameters:
+            n_squares (int): Tiles of each side of the world
+            samples (int): Worlds generated
+            seed (int): Seed of the random streams
+    """
+
+    reset(seed)
+    return measure(lambda: wg.createBg(n_squares), samples)
+
+def bench_render(n, engine, samples, seed):
+    """
+    Measures the time of display_individuals on an off-screen surface
+
+        Parameters:
+            n (int): Number of individuals
+            engine (str): "objects" or "arrays"
+            samples (int): Frames rendered
+            seed (int): Seed of the random streams
+    """
+
+    _, individuals, n_squares = make_population(n, engine, seed)
+    scr = pg.Surface((n_squares*SQ_SIZE, n_squares*SQ_SIZE))
+    sg.display_individuals(individuals, scr)                                            # Sprites cached once
+    metrics = measure(lambda: sg.display_individuals(individuals, scr), samples)
+    metrics["population"] = n
+    return metrics
+
+def bench_camera(n, engine, samples, seed):
+    """
+    Measures the time of a frame of the window (background and individuals) under a camera
+    at the top-left corner of the world, which should not grow with the world or the population
+
+        Parameters:
+            n (int): Number of individuals
+            engine (str): "objects" or "arrays"
+            samples (int): Frames rendered
+            seed (int): Seed of the random streams
+    """
+
+    bg_mat, individuals, n_squares = make_population(n, engine, seed)
+    scr = pg.Surface((WINDOW, WINDOW))
+    background = ChunkedBackground(bg_mat)
+    camera = Camera(n_squares, SQ_SIZE, (WINDOW, WINDOW))
+    background.draw(scr, camera)                                                        # Chunks, sprites and index
+    sg.display_individuals(individuals, scr, camera)                                    # of the individuals cached once
+    def frame():
+        background.draw(scr, camera)
+        sg.display_individuals(individuals, scr, camera)
+    metrics = measure(frame, samples)
+    metrics["population"] = n
+    return metrics
+
+def bench_menu(samples, seed):
+    """
+    Measures the time of the menu (dominant species and display_info) on an off-screen surface
+
+        Parameters:
+            samples (int): Frames rendered, after the first one
+            seed (int): Seed of the random streams
+    """
+
+    _, individuals, n_squares = make_population(1000, "objects", seed)
+    win_size = n_squares*SQ_SIZE
+    scr = pg.Surface((win_size, win_size))
+    def menu():
+        dominant = mi.get_dominant_species(individuals)
+        mi.display_info(mi.get_dominant_info(dominant, individuals), scr, win_size)
+    first = measure(menu, 1)["seconds"]
+    metrics = measure(menu, samples)
+    metrics["first_seconds"] = first
+    return metrics
+
+def bench_memory(n, engine, days, seed):
+    """
+    Measures the memory held by each individual (and embryo) after some days of simulation.
+    A single day keeps the population large enough for the fixed costs not to count.
+
+        Parameters:
+            n (int): Number of individuals at the beginning
+            engine (str): "objects" or "arrays"
+            days (int): Days simulated
+            seed (int): Seed of the random streams
+    """
+
+    tracemalloc.start()
+    bg_mat, individuals, n_squares = make_population(n, engine, seed)
+    for _ in range(days):
+        if not individuals: break
+        sg.update_individuals(individuals, n_squares, SQ_SIZE, bg_mat)
+    gc.collect()
+    alive = len(individuals) + sum(len(litter) for litter in sg.pregnancies.values())
+    held = tracemalloc.get_traced_memory()[0]
+    del individuals
+    sg.pregnancies.clear()
+    species_stats.reset()
+    lifecycle.reset()
+    gc.collect()
+    held -= tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return {"bytes_per_individual": held/alive if alive else 0.0, "population": alive, "days": days}
+
+def scenarios(quick):
+    """
+    Returns the name and the function of every scenario. The scenarios are the same
+    with quick, so that their results can be compared with a complete baseline.
+
+        Parameters:
+            quick (bool): Whether to skip the largest sizes
+    """
+
+    populations = POPULATIONS[:2] if quick else POPULATIONS
+    world_sizes = WORLD_SIZES[:3] if quick else WORLD_SIZES
+    samples = 10
+    memory_days = 1
+
+    found = []
+    for engine in ("objects", "arrays"):
+        for n in populations:
+            found.append(("update/"+engine+"/"+str(n), lambda seed, n=n, engine=engine: bench_update(n, engine, samples, seed)))
+    for n_squares in world_sizes:
+        found.append(("world/"+str(n_squares), lambda seed, n_squares=n_squares: bench_world(n_squares, samples, seed)))
+    for engine in ("objects", "arrays"):
+        for n in populations:
+            found.append(("render/"+engine+"/"+str(n), lambda seed, n=n, engine=engine: bench_render(n, engine, samples, seed)))
+    for engine in ("objects", "arrays"):
+        for n in populations:
+            found.append(("camera/"+engine+"/"+str(n), lambda seed, n=n, engine=engine: bench_camera(n, engine, samples, seed)))
+    found.append(("render/menu", lambda seed: bench_menu(samples, seed)))
+    for engine in ("objects", "arrays"):
+        found.append(("memory/"+engine, lambda seed, engine=engine: bench_memory(10000, engine, memory_days, seed)))
+    return found
+
+def run(pattern = "*", quick = False, seed = 0):
+    """
+    Runs the scenarios whose name matches a pattern
+
+        Parameters:
+            pattern (str): Shell-style pattern of the scenario names
+            quick (bool): Whether to skip the largest sizes
+            seed (int): Seed of the random streams
+
+        Returns:
+            results (dict): Description of the machine and metrics of each scenario
+    """
+
+    # Off-screen rendering, unless another video driver is chosen
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pg.display.init()
+    pg.display.set_mode((1, 1))
+    pg.font.init()
+
+    results = {"machine": {"python": platform.python_version(), "numpy": np.__version__,
+                           "pygame": pg.version.ver, "platform": platform.platform()},
+               "seed": seed, "quick": quick, "scenarios": {}}
+    for name, bench in scenarios(quick):
+        if not fnmatch.fnmatch(name, pattern): continue
+        results["scenarios"][name] = bench(seed)
+        print(name+": "+format_metrics(results["scenarios"][name]), flush = True)
+
+    pg.quit()
+    return results
+
+def main_metric(metrics):
+    """
+    Returns the name of the metric of a scenario compared with the baseline: the memory per
+    individual, or the fastest sample, which is much less noisy than the median
+
+        Parameters:
+            metrics (dict): Metrics of the scenario
+    """
+
+    return "bytes_per_individual" if "bytes_per_individual" in metrics else "min_seconds"
+
+def format_metrics(metrics):
+    """
+    Returns the main metric of a scenario as text
+
+        Parameters:
+            metrics (dict): Metrics of the scenario
+    """
+
+    if "bytes_per_individual" in metrics: return str(round(metrics["bytes_per_individual"]))+" B/individual"
+    return str(round(metrics["min_seconds"]*1000, 3))+" ms"
+
+def compare(results, baseline, tolerance = 0.25):
+    """
+    Compares the main metric of each scenario with the baseline. Every metric is better when lower.
+
+        Parameters:
+            results (dict): Results of run
+            baseline (dict): Results of a previous run
+            tolerance (float): Relative increase reported as a regression, widened by TOLERANCES
+
+        Returns:
+            regressions (str list): Names of the scenarios slower or larger than the baseline
+    """
+
+    regressions = []
+    for name, metrics in results["scenarios"].items():
+        base = baseline["scenarios"].get(name)
+        if base is None: continue
+        key = main_metric(metrics)
+        ratio = metrics[key]/base[key] if base[key] > 0 else 1.0
+        limit = max([tolerance] + [t for pattern, t in TOLERANCES.items() if fnmatch.fnmatch(name, pattern)])
+        flag = ""
+        if ratio > 1 + limit:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        elif ratio < 1 - limit: flag = "  improvement"
+        print(name+": "+format_metrics(base)+" -> "+format_metrics(metrics)+" (x"+str(round(ratio, 2))+")"+flag)
+    return regressions
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description = "Runs the benchmarks and compares them with the baseline.")
+    parser.add_argument("--only", default = "*", help = "shell-style pattern of the scenarios to run, e.g. 'update/*'")
+    parser.add_argument("--quick", action = "store_true", help = "skip the largest sizes")
+    parser.add_argument("--seed", type = int, default = 0, help = "seed of the random streams")
+    parser.add_argument("--output", help = "file where the results are written as JSON")
+    parser.add_argument("--baseline", default = BASELINE, help = "results to compare with")
+    parser.add_argument("--save-baseline", action = "store_true", help = "store the results as the new baseline")
+    parser.add_argument("--tolerance", type = float, default = 0.25, help = "relative slowdown reported as a regression")
+    args = parser.parse_args(argv)
+
+    results = run(args.only, args.quick, args.seed)
+
+    if args.output is not None:
+        with open(args.output, "w") as f: json.dump(results, f, indent = 1)
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok = True)
+        with open(args.baseline, "w") as f: json.dump(results, f, indent = 1)
+        print("Baseline saved to "+args.baseline)
+    elif os.path.exists(args.baseline):
+        with open(args.baseline, "r") as f: baseline = json.load(f)
+        print("Comparison with "+args.baseline+":")
+        if compare(results, baseline, args.tolerance): sys.exit(1)
+
+if __name__ == "__main__":
+    main()
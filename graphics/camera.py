@@ -0,0 +1,264 @@
+'''
+Created on 18 oct 2026
+
+@desc: Camera over the world and background rendered in cached chunks
+@author: Alejandro R. Lopez
+'''
+
+# Imports
+from graphics import world_gen as wg
+from collections import OrderedDict
+import numpy as np
+import pygame as pg
+
+# Pixels of each side of a background chunk, about the same at every zoom
+CHUNK_PX = 256
+MAX_CHUNKS = 512
+
+# Largest zoom, as a multiple of the size of squares
+MAX_ZOOM = 4
+
+class Camera:
+    """
+    A class to represent the part of the world shown in the window.
+    The zoom is kept as the pixels of a tile on screen, so that every tile covers a whole
+    number of pixels, and the position as the zoomed world pixel at the top-left corner.
+    A world point (x, y) is shown at (x*zoom - ox, y*zoom - oy).
+
+        Attributes
+        ----------
+            n_squares : int
+                Tiles of each side of the world
+            sq_size : int
+                Size of squares
+            view_size : int tuple
+                Width and height of the view in pixels
+            tile_px : int
+                Pixels of each side of a tile on screen
+            ox : int
+                Zoomed world pixel at the left border of the view
+            oy : int
+                Zoomed world pixel at the top border of the view
+
+
+        Methods
+        -------
+            zoom:
+                Screen pixels per world pixel
+            pan(dx, dy):
+                Moves the view some pixels of the screen
+            zoom_at(steps, pos):
+                Zooms in (positive steps) or out, keeping the same world point under a screen position
+            fit():
+                Zooms out as much as possible
+            visible_rect():
+                Returns the part of the world shown, in world pixels
+            to_world(pos):
+                Returns the world point shown at a screen position
+    """
+
+    def __init__(self, n_squares, sq_size, view_size):
+        """
+        Initializes the camera at the top-left corner of the world, without zoom.
+
+        Parameters
+        ----------
+            n_squares : int
+                Tiles of each side of the world
+            sq_size : int
+                Size of squares
+            view_size : int tuple
+                Width and height of the view in pixels
+        """
+
+        self.n_squares = n_squares
+        self.sq_size = sq_size
+        self.view_size = view_size
+        self.tile_px = sq_size
+        self.ox = 0
+        self.oy = 0
+        self._clamp()
+
+    @property
+    def zoom(self):
+        """
+        Returns the screen pixels per world pixel
+        """
+
+        return self.tile_px/self.sq_size
+
+    def pan(self, dx, dy):
+        """
+        Moves the view some pixels of the screen, without leaving the world
+
+        Parameters
+        ----------
+            dx : int
+                Pixels to the right
+            dy : int
+                Pixels downwards
+        """
+
+        self.ox += int(dx)
+        self.oy += int(dy)
+        self._clamp()
+
+    def zoom_at(self, steps, pos = None):
+        """
+        Zooms in (positive steps) or out, about 25% per step, keeping the same
+        world point under a screen position
+
+        Parameters
+        ----------
+            steps : int
+                Zoom steps
+            pos : int tuple
+                Screen position, the centre of the view if None
+        """
+
+        if pos is None: pos = (self.view_size[0]//2, self.view_size[1]//2)
+        tile_px = self.tile_px
+        for _ in range(abs(steps)):
+            tile_px = max(tile_px+1, round(tile_px*1.25)) if steps > 0 else min(tile_px-1, round(tile_px/1.25))
+        tile_px = max(min(tile_px, self.sq_size*MAX_ZOOM), self._min_tile_px())
+
+        ratio = tile_px/self.tile_px
+        self.ox = round((self.ox + pos[0])*ratio - pos[0])
+        self.oy = round((self.oy + pos[1])*ratio - pos[1])
+        self.tile_px = tile_px
+        self._clamp()
+
+    def fit(self):
+        """
+        Zooms out as much as possible
+        """
+
+        self.tile_px = self._min_tile_px()
+        self.ox = self.oy = 0
+        self._clamp()
+
+    def visible_rect(self):
+        """
+        Returns the left, top, right and bottom borders of the part of the world shown, in world pixels
+        """
+
+        zoom = self.zoom
+        return (self.ox/zoom, self.oy/zoom, (self.ox+self.view_size[0])/zoom, (self.oy+self.view_size[1])/zoom)
+
+    def to_world(self, pos):
+        """
+        Returns the world point shown at a screen position
+
+        Parameters
+        ----------
+            pos : int tuple
+                Screen position
+        """
+
+        zoom = self.zoom
+        return ((pos[0]+self.ox)/zoom, (pos[1]+self.oy)/zoom)
+
+    def _min_tile_px(self):
+        """
+        Returns the smallest tile size, at which the world still fills the view (at least one pixel)
+        """
+
+        return max(1, -(-min(self.view_size)//self.n_squares))
+
+    def _clamp(self):
+        """
+        Keeps the view inside the world, or centres the world when it is smaller than the view
+        """
+
+        for axis, attr in enumerate(("ox", "oy")):
+            world = self.n_squares*self.tile_px
+            view = self.view_size[axis]
+            if world <= view: setattr(self, attr, (world-view)//2)
+            else: setattr(self, attr, min(max(getattr(self, attr), 0), world-view))
+
+class ChunkedBackground:
+    """
+    A class to draw the world under a camera. The world is split in square chunks of
+    tiles, each rendered once per zoom and kept in a cache, so drawing the view costs
+    the same whatever the size of the world.
+
+        Attributes
+        ----------
+            bg_mat : int 2d array
+                Numerical info of the world
+            chunks : OrderedDict
+                Images of the chunks, indexed by tile size and chunk coordinates, least recently used first
+
+
+        Methods
+        -------
+            draw(scr, camera):
+                Draws the part of the world shown by a camera
+    """
+
+    def __init__(self, bg_mat):
+        """
+        Initializes an empty cache of chunks.
+
+        Parameters
+        ----------
+            bg_mat : int 2d array
+                Numerical info of the world
+        """
+
+        self.bg_mat = np.asarray(bg_mat)
+        self.chunks = OrderedDict()
+
+    def draw(self, scr, camera):
+        """
+        Draws the part of the world shown by a camera, and black outside the world
+
+        Parameters
+        ----------
+            scr : pygame Surface
+                Surface of the size of the view
+            camera : Camera
+                Camera of the view
+        """
+
+        tile_px = camera.tile_px
+        tiles = max(1, CHUNK_PX//tile_px)                                               # Tiles of each side of a chunk
+        chunk_px = tiles*tile_px
+        n_chunks = -(-len(self.bg_mat)//tiles)
+
+        first_x = max(0, camera.ox//chunk_px)
+        first_y = max(0, camera.oy//chunk_px)
+        last_x = min(n_chunks-1, (camera.ox+camera.view_size[0]-1)//chunk_px)
+        last_y = min(n_chunks-1, (camera.oy+camera.view_size[1]-1)//chunk_px)
+
+        if camera.n_squares*tile_px < max(camera.view_size): scr.fill((0,0,0))
+        scr.blits([(self._chunk(tile_px, tiles, cx, cy), (cx*chunk_px-camera.ox, cy*chunk_px-camera.oy))
+                   for cx in range(first_x, last_x+1) for cy in range(first_y, last_y+1)], False)
+
+    def _chunk(self, tile_px, tiles, cx, cy):
+        """
+        Returns the image of a chunk, rendering it if it is not in the cache
+
+        Parameters
+        ----------
+            tile_px : int
+                Pixels of each side of a tile
+            tiles : int
+                Tiles of each side of a chunk
+            cx : int
+                Horizontal coordinate of the chunk
+            cy : int
+                Vertical coordinate of the chunk
+        """
+
+        key = (tile_px, cx, cy)
+        chunk = self.chunks.get(key)
+        if chunk is not None:
+            self.chunks.move_to_end(key)
+            return chunk
+
+        chunk = wg.matrix2Img(self.bg_mat[cx*tiles:(cx+1)*tiles, cy*tiles:(cy+1)*tiles], tile_px)
+        if pg.display.get_surface() is not None: chunk = chunk.convert()
+        self.chunks[key] = chunk
+        if len(self.chunks) > MAX_CHUNKS: self.chunks.popitem(last = False)
+        return chunk
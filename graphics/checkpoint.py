@@ -0,0 +1,178 @@
+'''
+Created on 18 oct 2026
+
+@desc: Binary checkpoints of the complete state of a simulation
+@author: Alejandro R. Lopez
+'''
+
+# Imports
+from graphics import rng
+from graphics import species
+from graphics import species_gen as sg
+from graphics import species_stats
+from graphics import lifecycle
+from graphics.population import FIELDS, Population
+import numpy as np
+import json
+import os
+
+# Version of the checkpoint layout
+FORMAT_VERSION = 4
+
+# Columns of a list of Species (name, dtype, shape of each element)
+SPECIES_FIELDS = [(f, dtype, shape) for f, dtype, shape in FIELDS if f in species.Species.__slots__] + \
+                 [("mother_id", np.int64, ())]
+
+def save(path, bg_mat, ind_list, sq_size, day = 0):
+    """
+    Saves the world, the population, the embryos in gestation, the taxonomy,
+    the day counter and the random streams in an uncompressed .npz file.
+    The file is replaced atomically, so an interrupted save keeps the previous checkpoint.
+
+        Parameters:
+            path (str): File to write
+            bg_mat (int 2d array): Numerical info of the world
+            ind_list (list of Species or Population): Individuals of the simulation
+            sq_size (int): Size of squares
+            day (int): Current day
+    """
+
+    arrays = {"bg_mat": np.asarray(bg_mat),
+              "taxonomy": np.array([name or "" for name in species.species], dtype = str),
+              "free_names": np.array(list(species.free_names or ()), dtype = str),
+              "free_ids": np.array(species.free_ids, np.int64)}
+
+    # Population
+    if isinstance(ind_list, Population):
+        engine = "arrays"
+        ind_list._flush()
+        for f, _, _ in FIELDS: arrays["pop_"+f] = ind_list.cols[f]
+    else:
+        engine = "objects"
+        arrays.update(_species_columns("pop_", ind_list))
+
+        # Embryos, with the row of their mother
+        row = {i: k for k, i in enumerate(ind_list)}
+        embryos = []
+        mothers = []
+        for m, litter in sg.pregnancies.items():
+            k = row.get(m)
+            if k is None: continue
+            embryos.extend(litter)
+            mothers.extend([k]*len(litter))
+        arrays.update(_species_columns("embryo_", embryos))
+        arrays["embryo_mother"] = np.array(mothers, np.int64)
+
+    # Random streams, with the numbers already drawn but not used yet
+    rng_states = {}
+    for name in rng.SUBSYSTEMS:
+        rng_states[name], arrays["rng_"+name] = rng.get(name).get_state()
+
+    meta = {"version": FORMAT_VERSION, "engine": engine, "day": day, "sq_size": sq_size, "next_id": species.next_id,
+            "name_pool": species.free_names is not None, "rng": rng_states}
+    arrays["meta"] = np.array(json.dumps(meta))
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f: np.savez(f, **arrays)
+    os.replace(tmp_path, path)
+
+def load(path):
+    """
+    Restores a simulation saved with save. Besides returning the world and the population,
+    the taxonomy, the embryos, the identifiers and the random streams are restored,
+    so the simulation continues exactly as it would have done without the checkpoint.
+
+        Parameters:
+            path (str): File to read
+
+        Returns:
+            bg_mat (int 2d array): Numerical info of the world
+            ind_list (list of Species or Population): Individuals of the simulation
+            sq_size (int): Size of squares
+            day (int): Day of the checkpoint
+    """
+
+    with np.load(path, allow_pickle = False) as data:
+        meta = json.loads(str(data["meta"]))
+        if meta["version"] != FORMAT_VERSION:
+            raise ValueError("Unsupported checkpoint version: "+str(meta["version"]))
+
+        bg_mat = data["bg_mat"]
+
+        # Population
+        sg.pregnancies.clear()
+        if meta["engine"] == "arrays":
+            ind_list = Population()
+            ind_list.cols = {f: data["pop_"+f] for f, _, _ in FIELDS}
+        else:
+            ind_list = _species_objects("pop_", data, bg_mat, meta["sq_size"])
+            embryos = _species_objects("embryo_", data, bg_mat, meta["sq_size"])
+            for e, k in zip(embryos, data["embryo_mother"].tolist()):
+                sg.pregnancies.setdefault(ind_list[k], []).append(e)
+        species_stats.reset()                                                    # Rebuilt on its first use
+        lifecycle.reset()
+
+        # Taxonomy and identifiers
+        species.restore_taxonomy([name or None for name in data["taxonomy"].tolist()],
+                                 data["free_names"].tolist() if meta["name_pool"] else None, data["free_ids"].tolist())
+        species.next_id = meta["next_id"]
+
+        # Random streams
+        for name in rng.SUBSYSTEMS: rng.get(name).set_state(meta["rng"][name], data["rng_"+name])
+
+    return bg_mat, ind_list, meta["sq_size"], meta["day"]
+
+def _species_columns(prefix, ind_list):
+    """
+    Returns the columns of a list of Species
+
+        Parameters:
+            prefix (str): Prefix of the column names
+            ind_list (list of Species): Individuals to store
+
+        Returns:
+            Dict of arrays indexed by prefixed field name
+    """
+
+    cols = {}
+    for f, dtype, shape in SPECIES_FIELDS:
+        if f == "mother_id": values = [-1 if i.mother_id is None else i.mother_id for i in ind_list]
+        else: values = [getattr(i, f) for i in ind_list]
+        cols[prefix+f] = np.array(values, dtype).reshape((-1,)+shape)
+    return cols
+
+def _species_objects(prefix, data, bg_mat, sq_size):
+    """
+    Rebuilds a list of Species from its columns
+
+        Parameters:
+            prefix (str): Prefix of the column names
+            data (NpzFile): Checkpoint file
+            bg_mat (int 2d array): Numerical info of the world
+            sq_size (int): Size of squares
+
+        Returns:
+            List of Species
+    """
+
+    fields = []
+    columns = []
+    for f, _, _ in SPECIES_FIELDS:
+        column = data[prefix+f].tolist()
+        if f in ("colour", "location"): column = list(map(tuple, column))
+        elif f == "cammo":
+            shared = {}
+            column = [shared.setdefault(t, t) for t in map(tuple, column)]
+        elif f == "mother_id": column = [None if v < 0 else v for v in column]
+        fields.append(f)
+        columns.append(column)
+
+    ind_list = []
+    new = species.Species.__new__
+    for row in zip(*columns):
+        i = new(species.Species)
+        for f, v in zip(fields, row): setattr(i, f, v)
+        i.tile = None
+        i.locate(sq_size, bg_mat)
+        ind_list.append(i)
+    return ind_list
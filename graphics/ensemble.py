@@ -0,0 +1,221 @@
+'''
+Created on 18 oct 2026
+
+@desc: Ensembles of independent simulations run in parallel processes
+@author: Alejandro R. Lopez
+'''
+
+# Imports
+from graphics import world_gen as wg
+from graphics import rng
+from graphics import species_gen as sg
+from graphics import species
+from graphics import species_stats
+from graphics import lifecycle
+from graphics.population import Population
+from graphics.telemetry import TRAITS
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import time
+
+# Death probability constants of species_gen that can be varied
+PARAMS = ["child_prob", "old_prob", "size_prob", "cammo_prob", "res_terr_prob"]
+
+# Version of the results, part of the hash so that old cached results are not reused
+RESULT_VERSION = 1
+
+def make_grid(seeds, days, n_species, n_squares, sq_size, n_ind = 49, engine = "arrays", **params):
+    """
+    Returns one configuration for each combination of seed and death probability constants
+
+        Parameters:
+            seeds (int list): Seeds of the random generators
+            days (int): Days to simulate
+            n_species (int): Species generated at the beginning
+            n_squares (int): Tiles of each side of the world
+            sq_size (int): Size of squares
+            n_ind (int): Individuals generated with each specimen
+            engine (str): "objects" for a list of Species, "arrays" for a Population
+            params (float lists): Values of each constant of PARAMS, its current value if missing
+
+        Returns:
+            configs (dict list): List of configurations
+    """
+
+    values = [params.get(p) or [getattr(sg, p.upper())] for p in PARAMS]
+    configs = []
+    for combination in itertools.product(*values):
+        for seed in seeds:
+            config = {"seed": seed, "days": days, "n_species": n_species, "n_squares": n_squares,
+                      "sq_size": sq_size, "n_ind": n_ind, "engine": engine}
+            config.update(zip(PARAMS, combination))
+            configs.append(config)
+    return configs
+
+def config_hash(config):
+    """
+    Returns the identifier of a configuration
+
+        Parameters:
+            config (dict): Configuration of a simulation
+    """
+
+    text = json.dumps(dict(config, version = RESULT_VERSION), sort_keys = True)
+    return hashlib.sha1(text.encode()).hexdigest()
+
+def run_config(config):
+    """
+    Runs one simulation from scratch in the current process. The module state
+    is reset first, so a worker process can run several configurations in a row.
+
+        Parameters:
+            config (dict): Configuration of the simulation
+
+        Returns:
+            result (dict): Days simulated, populations, surviving species and mean traits
+    """
+
+    start = time.perf_counter()
+
+    # Fresh module state
+    for p in PARAMS: setattr(sg, p.upper(), config[p])
+    species.reset_taxonomy()
+    species.next_id = 0
+    sg.pregnancies.clear()
+    species_stats.reset()
+    lifecycle.reset()
+    rng.seed(config["seed"])
+
+    # World and species
+    n_squares = config["n_squares"]
+    sq_size = config["sq_size"]
+    bg_mat = wg.createBg(n_squares)
+    individuals = Population() if config["engine"] == "arrays" else []
+    for _ in range(config["n_species"]):
+        sg.gen_individuals(n_squares, sq_size, bg_mat, individuals, config["n_ind"])
+
+    # Simulation, until the last day or the extinction of every species
+    days = 0
+    peak = len(individuals)
+    while days < config["days"] and individuals:
+        sg.update_individuals(individuals, n_squares, sq_size, bg_mat)
+        days += 1
+        peak = max(peak, len(individuals))
+
+    # Final state
+    cols = getattr(individuals, "cols", None)
+    if cols is None:
+        cols = {t: np.array([getattr(i, t) for i in individuals], float) for t in TRAITS}
+        cols["species_id"] = [i.species_id for i in individuals]
+    result = {"days": days, "peak_population": peak, "final_population": len(individuals),
+              "species": len(set(np.asarray(cols["species_id"]).tolist()))}
+    for t in TRAITS: result[t] = float(np.mean(cols[t])) if len(individuals) else float("nan")
+    result["wall_time"] = time.perf_counter() - start
+
+    return result
+
+def run_ensemble(configs, workers = None, cache_dir = None):
+    """
+    Runs every configuration in a pool of processes, yielding each result as soon as it is ready.
+    Each configuration seeds its own random streams, so the runs do not depend on the worker.
+    Results found in the cache folder are yielded first without running them again.
+
+        Parameters:
+            configs (dict list): Configurations to run
+            workers (int): Number of processes, one per core if None
+            cache_dir (str): Folder of the results of finished configurations, no cache if None
+
+        Returns:
+            Generator of (config, result) tuples, in order of completion
+    """
+
+    pending = []
+    for config in configs:
+        path = os.path.join(cache_dir, config_hash(config)+".json") if cache_dir is not None else None
+        if path is not None and os.path.exists(path):
+            with open(path, "r") as f: yield config, json.load(f)["result"]
+        else: pending.append((config, path))
+    if not pending: return
+
+    if cache_dir is not None: os.makedirs(cache_dir, exist_ok = True)
+    with ProcessPoolExecutor(max_workers = workers) as pool:
+        futures = {pool.submit(run_config, config): (config, path) for config, path in pending}
+        for future in as_completed(futures):
+            config, path = futures[future]
+            result = future.result()
+            if path is not None:
+                with open(path+".tmp", "w") as f: json.dump({"config": config, "result": result}, f)
+                os.replace(path+".tmp", path)
+            yield config, result
+
+def aggregate(results):
+    """
+    Groups the results of the same parameters with different seeds
+
+        Parameters:
+            results (list): List of (config, result) tuples
+
+        Returns:
+            groups (dict): Number of runs, and mean and standard deviation of each result,
+                           indexed by the tuple of values of PARAMS
+    """
+
+    runs = {}
+    for config, result in results:
+        runs.setdefault(tuple(config[p] for p in PARAMS), []).append(result)
+
+    groups = {}
+    for key, group in runs.items():
+        summary = {"runs": len(group)}
+        for field in group[0]:
+            values = np.array([r[field] for r in group], float)
+            summary[field] = (float(np.nanmean(values)), float(np.nanstd(values))) if not np.isnan(values).all() \
+                             else (float("nan"), float("nan"))
+        groups[key] = summary
+    return groups
+
+def print_groups(groups):
+    """
+    Prints the aggregated results of an ensemble
+
+        Parameters:
+            groups (dict): Groups returned by aggregate
+    """
+
+    for key, summary in sorted(groups.items()):
+        print(", ".join(p+"="+str(v) for p, v in zip(PARAMS, key))+" ("+str(summary["runs"])+" runs)")
+        for field, value in summary.items():
+            if field == "runs": continue
+            print("  "+field+": "+str(round(value[0], 3))+" +- "+str(round(value[1], 3)))
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description = "Runs independent simulations over a grid of seeds and death probabilities.")
+    parser.add_argument("--seeds", type = int, default = 4, help = "seeds 0..N-1 of each combination")
+    parser.add_argument("--days", type = int, default = 1000, help = "days to simulate")
+    parser.add_argument("--species", type = int, default = 5, help = "species generated at the beginning")
+    parser.add_argument("--size", type = int, default = 25, help = "tiles of each side of the world")
+    parser.add_argument("--sq-size", type = int, default = 35, help = "size of squares")
+    parser.add_argument("--individuals", type = int, default = 49, help = "individuals generated with each specimen")
+    parser.add_argument("--engine", choices = ["objects", "arrays"], default = "arrays", help = "population storage")
+    parser.add_argument("--workers", type = int, help = "processes, one per core by default")
+    parser.add_argument("--cache", default = "ensemble_cache", help = "folder of the finished configurations")
+    for p in PARAMS:
+        parser.add_argument("--"+p.replace("_", "-"), type = float, nargs = "+", help = "values of "+p.upper())
+    args = parser.parse_args(argv)
+
+    configs = make_grid(range(args.seeds), args.days, args.species, args.size, args.sq_size, args.individuals,
+                        args.engine, **{p: getattr(args, p) for p in PARAMS})
+    results = []
+    for config, result in run_ensemble(configs, args.workers, args.cache):
+        results.append((config, result))
+        print("["+str(len(results))+"/"+str(len(configs))+"] seed "+str(config["seed"])+": "
+              +str(result["days"])+" days, "+str(result["final_population"])+" individuals")
+    print_groups(aggregate(results))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+'''
+Created on 18 oct 2026
+
+@desc: Habitat lookup tables for the placement and movement of individuals
+@author: Alejandro R. Lopez
+'''
+
+# Imports
+from graphics import rng
+from graphics import profiler
+import numpy as np
+
+# Biome of the aquatic habitat
+WATER = 2
+
+# Lookup tables of the last world used
+_last_map = None
+
+def get_map(bg_mat, n_squares, sq_size):
+    """
+    Returns the lookup tables of a world, building them only when the world changes
+
+        Parameters:
+            bg_mat (int 2d array): Numerical info of the world
+            n_squares (int): Tiles of each side of the world
+            sq_size (int): Size of squares
+
+        Returns:
+            HabitatMap of the world
+    """
+
+    global _last_map
+
+    if _last_map is None or _last_map.bg_mat is not bg_mat or \
+       _last_map.n_squares != n_squares or _last_map.sq_size != sq_size:
+        _last_map = HabitatMap(bg_mat, n_squares, sq_size)
+    return _last_map
+
+class HabitatMap:
+    """
+    A class to represent the valid tiles of each habitat in a world.
+    Pixel v belongs to tile ceil(v/sq_size)-1, so pixel 0 belongs to the last tile.
+
+        Attributes
+        ----------
+            bg_mat : int 2d array
+                Numerical info of the world
+            n_squares : int
+                Tiles of each side of the world
+            sq_size : int
+                Size of squares
+            valid : list
+                Validity bitmap of the tiles (nested lists of bool) of each habitat code
+            tiles : list
+                List of the valid tiles of each habitat code
+
+
+        Methods
+        -------
+            place(s_type):
+                Returns a random position inside the habitat
+            step(s_type, prev_pos):
+                Returns a random position inside the habitat near the previous one
+    """
+
+    def __init__(self, bg_mat, n_squares, sq_size):
+        """
+        Builds the lookup tables of a world.
+
+        Parameters
+        ----------
+            bg_mat : int 2d array
+                Numerical info of the world
+            n_squares : int
+                Tiles of each side of the world
+            sq_size : int
+                Size of squares
+        """
+
+        self.bg_mat = bg_mat
+        self.n_squares = n_squares
+        self.sq_size = sq_size
+
+        water = np.asarray(bg_mat) == WATER
+        # Indexed by habitat code: terrestrial, aquatic
+        self.valid = [(~water).tolist(), water.tolist()]
+        self.tiles = [np.argwhere(~water).tolist(), np.argwhere(water).tolist()]
+
+        self.max_move_frwd = round(sq_size*0.5)
+        self.max_move_bkwd = round(sq_size*-0.5)
+
+    def tile(self, v):
+        """
+        Returns the tile of a pixel coordinate, as used to index bg_mat
+
+        Parameters
+        ----------
+            v : int
+                Pixel coordinate
+        """
+
+        return (v+self.sq_size-1)//self.sq_size-1
+
+    def place(self, s_type):
+        """
+        Returns a random position inside the habitat, uniform over its pixels
+
+        Parameters
+        ----------
+            s_type : int
+                Type code of individual based on his habitat
+        """
+
+        limit = self.n_squares*self.sq_size
+        tiles = self.tiles[s_type]
+        r = rng.get("movement")
+
+        # No tile of the habitat in this world
+        if not tiles: return (r.randint(0, limit-1), r.randint(0, limit-1))
+
+        tx, ty = r.choice(tiles)
+        x = tx*self.sq_size + r.randint(1, self.sq_size)
+        y = ty*self.sq_size + r.randint(1, self.sq_size)
+        return (x % limit, y % limit)
+
+    def step(self, s_type, prev_pos):
+        """
+        Returns a random position inside the habitat near the previous one.
+        The result follows the same distribution as redrawing the step until it is valid,
+        but it takes bounded time. If no valid position can be reached, the individual stays.
+
+        Parameters
+        ----------
+            s_type : int
+                Type code of individual based on his habitat
+            prev_pos : int tuple
+                Previous location of the individual
+        """
+
+        valid = self.valid[s_type]
+        limit = self.n_squares*self.sq_size
+        r = rng.get("movement")
+
+        # First draw
+        x = min(max(prev_pos[0] + r.randint(self.max_move_bkwd, self.max_move_frwd), 0), limit)
+        y = min(max(prev_pos[1] + r.randint(self.max_move_bkwd, self.max_move_frwd), 0), limit)
+        if valid[self.tile(x)][self.tile(y)]: return (x, y)
+
+        if profiler.active: profiler.active.add("step_fallbacks")
+        return self.reachable_step(s_type, prev_pos)
+
+    def reachable_step(self, s_type, prev_pos):
+        """
+        Draws a step among the valid reachable positions only
+
+        Parameters
+        ----------
+            s_type : int
+                Type code of individual based on his habitat
+            prev_pos : int tuple
+                Previous location of the individual
+        """
+
+        valid = self.valid[s_type]
+        axes = [self._reachable(prev_pos[0]), self._reachable(prev_pos[1])]
+
+        # Weight of each valid pair of tiles
+        pairs = []
+        weights = []
+        for tx, xs in axes[0].items():
+            for ty, ys in axes[1].items():
+                if valid[tx][ty]:
+                    pairs.append((xs, ys))
+                    weights.append(len(xs)*len(ys))
+
+        if not pairs: return tuple(prev_pos)
+
+        r = rng.get("movement")
+        xs, ys = r.weighted_choice(pairs, weights)
+        return (r.choice(xs), r.choice(ys))
+
+    def _reachable(self, p):
+        """
+        Returns the coordinates reachable in one step from p, grouped by tile.
+        A coordinate appears once for each step that leads to it after the window limits.
+
+        Parameters
+        ----------
+            p : int
+                Previous coordinate
+        """
+
+        limit = self.n_squares*self.sq_size
+        reachable = {}
+        for d in range(self.max_move_bkwd, self.max_move_frwd+1):
+            v = min(max(p + d, 0), limit)
+            reachable.setdefault(self.tile(v) % self.n_squares, []).append(v)
+        return reachable
@@ -0,0 +1,230 @@
+'''
+Created on 18 oct 2026
+
+@desc: Calendar of the births and comings of age of the population
+@author: Alejandro R. Lopez
+'''
+
+# Imports
+from graphics import species
+
+# Kinds of events
+DELIVERY, MATURITY = range(2)
+
+class TimerWheel:
+    """
+    A class to represent a hashed timing wheel of days. Each event is kept in the slot
+    of its day modulo the number of slots, so scheduling and taking the events of a day
+    cost as much as the events themselves, whatever the number of pending events.
+
+        Attributes
+        ----------
+            day : int
+                Current day
+            pending : int
+                Number of events scheduled and not yet due
+
+
+        Methods
+        -------
+            schedule(delay, event):
+                Schedules an event some days after the current one
+            advance():
+                Moves to the next day and returns its events
+    """
+
+    def __init__(self, slots = 256):
+        """
+        Initializes an empty wheel.
+
+        Parameters
+        ----------
+            slots : int
+                Number of slots; later events wait for as many turns of the wheel as needed
+        """
+
+        self.day = 0
+        self.pending = 0
+        self._slots = [[] for _ in range(slots)]
+
+    def schedule(self, delay, event):
+        """
+        Schedules an event some days after the current one
+
+        Parameters
+        ----------
+            delay : int
+                Days until the event, at least 1
+            event : object
+                Event returned by advance on its day
+        """
+
+        due = self.day + delay
+        self._slots[due % len(self._slots)].append((due, event))
+        self.pending += 1
+
+    def advance(self):
+        """
+        Moves to the next day and returns its events, in the order they were scheduled
+
+        Returns
+        -------
+            events : list
+                Events due on the new day
+        """
+
+        self.day += 1
+        slot = self._slots[self.day % len(self._slots)]
+        if not slot: return []
+
+        events = [event for due, event in slot if due == self.day]
+        if len(events) < len(slot): slot[:] = [entry for entry in slot if entry[0] != self.day]
+        else: slot.clear()
+        self.pending -= len(events)
+        return events
+
+class Lifecycle:
+    """
+    A class to represent the calendar of the lifecycle of a population. The day a female
+    delivers is known when she conceives, and the day a child comes of age when it is born,
+    so both are scheduled once in a TimerWheel instead of checking every individual every day.
+    Events of individuals unregistered before their day are dropped when they come up.
+
+        Attributes
+        ----------
+            ind_list : list of Species
+                List of the registered individuals
+            wheel : TimerWheel
+                Pending events, as (kind, individual, registration) tuples
+            members : dict
+                Registration of each registered individual, so that the events of an
+                individual unregistered and registered again are not repeated
+            growing : dict
+                Children that grow every day, in order of registration
+
+
+        Methods
+        -------
+            add(i):
+                Registers an individual and schedules its events
+            remove(i):
+                Unregisters a dead individual
+            conceive(i):
+                Schedules the delivery of a female that is now pregnant
+            advance():
+                Moves to the next day and returns its events
+    """
+
+    def __init__(self, ind_list = ()):
+        """
+        Initializes the calendar with the given individuals.
+
+        Parameters
+        ----------
+            ind_list : list of Species
+                Individuals to register
+        """
+
+        self.ind_list = ind_list
+        self.wheel = TimerWheel()
+        self.members = {}
+        self.growing = {}
+        self._registrations = 0
+
+        for i in ind_list: self.add(i)
+
+    def add(self, i):
+        """
+        Registers an individual and schedules its coming of age and, if pregnant, its delivery
+
+        Parameters
+        ----------
+            i : Species
+                Individual to register
+        """
+
+        self._registrations += 1
+        self.members[i] = self._registrations
+        # Children grow until the day their age reaches their childhood, included
+        if i.age < i.childhood:
+            self.growing[i] = None
+            self.wheel.schedule(i.childhood - i.age, (MATURITY, i, self._registrations))
+        if i.gender == species.FEMALE and i.gestation_days > 0: self.conceive(i)
+
+    def remove(self, i):
+        """
+        Unregisters a dead individual
+
+        Parameters
+        ----------
+            i : Species
+                Individual to unregister
+        """
+
+        self.members.pop(i, None)
+        self.growing.pop(i, None)
+
+    def conceive(self, i):
+        """
+        Schedules the delivery of a pregnant female, on the day after gestation_days reaches
+        gestation_period. Gestations already past their period never end, as before.
+
+        Parameters
+        ----------
+            i : Species
+                Female whose gestation_days has been updated for the current day
+        """
+
+        if i.gestation_period >= i.gestation_days:
+            self.wheel.schedule(i.gestation_period - i.gestation_days + 1, (DELIVERY, i, self.members[i]))
+
+    def advance(self):
+        """
+        Moves to the next day and returns its events, without those of unregistered individuals.
+        Events are sorted by the identifier of their individual, so that the order of the births
+        does not depend on when they were scheduled, and a calendar rebuilt from a checkpoint
+        gives the same days. Children that come of age stop growing after this day, so their
+        last growth must be applied before.
+
+        Returns
+        -------
+            events : list of tuples
+                (kind, individual) of each event due on the new day
+        """
+
+        members = self.members
+        events = [(kind, i) for kind, i, reg in self.wheel.advance() if members.get(i) == reg]
+        events.sort(key = lambda e: e[1].id)
+        for kind, i in events:
+            if kind == MATURITY: del self.growing[i]
+        return events
+
+# Calendar of the population updated by species_gen.update_individuals
+registry = Lifecycle()
+
+def reset():
+    """
+    Forgets the calendar, so that it is rebuilt on its next use. Called whenever the
+    individuals of a list are replaced outside update_individuals, e.g. ind_list[:] = other,
+    which get_lifecycle cannot notice if the length does not change
+    """
+
+    global registry
+    registry = Lifecycle()
+
+def get_lifecycle(ind_list):
+    """
+    Returns the calendar of a population, rebuilding it after reset, or if it belongs to another
+    list or individuals have been added or removed outside update_individuals
+
+        Parameters:
+            ind_list (list of Species): List of the individuals
+
+        Returns:
+            Lifecycle of the population
+    """
+
+    global registry
+
+    if registry.ind_list is not ind_list or len(registry.members) != len(ind_list): registry = Lifecycle(ind_list)
+    return registry
@@ -0,0 +1,667 @@
+'''
+Created on 18 oct 2026
+
+@desc: Population of individuals stored as parallel NumPy arrays
+@author: Alejandro R. Lopez
+'''
+
+# Imports
+from graphics import habitat
+from graphics import rng
+from graphics import profiler
+from graphics import species
+from graphics import species_gen as sg
+from graphics.species_stats import SpeciesStats
+import numpy as np
+from time import perf_counter
+
+# Columns of the population (name, dtype, shape of each element)
+FIELDS = [("id", np.int64, ()),
+          ("species_id", np.int32, ()),
+          ("s_type", np.int8, ()),
+          ("gender", np.int8, ()),
+          ("colour", np.int16, (3,)),
+          ("cammo", np.float64, (3,)),
+          ("size", np.float64, ()),
+          ("location", np.int32, (2,)),
+          ("old_age_death", np.int32, ()),
+          ("childhood", np.int32, ()),
+          ("age", np.int32, ()),
+          ("childhood_size", np.float64, ()),
+          ("growth", np.float64, ()),
+          ("offspring_size", np.float64, ()),
+          ("offspring_number", np.int32, ()),
+          ("gestation_period", np.int32, ()),
+          ("gestation_days", np.int32, ()),
+          ("death_prob", np.float64, ()),
+          ## Traits of the father of the litter in gestation
+          ("pregnant", np.bool_, ()),
+          ("mate_s_type", np.int8, ()),
+          ("mate_old_age_death", np.int32, ()),
+          ("mate_colour", np.int16, (3,)),
+          ("mate_size", np.float64, ()),
+          ("mate_childhood", np.int32, ())]
+
+# Vectorized redraws of a step before drawing it among the reachable positions
+MAX_STEP_TRIES = 4
+
+class Individual:
+    """
+    A class to represent a read-only view of one individual of a population.
+    It exposes the same attributes as Species, so the display and menu functions work on it.
+    """
+
+    __slots__ = ("_pop", "_k")
+
+    def __init__(self, pop, k):
+        self._pop = pop
+        self._k = k
+
+    id = property(lambda self: int(self._pop.cols["id"][self._k]))
+    species_id = property(lambda self: int(self._pop.cols["species_id"][self._k]))
+    name = property(lambda self: species.species[self._pop.cols["species_id"][self._k]])
+    s_type = property(lambda self: int(self._pop.cols["s_type"][self._k]))
+    gender = property(lambda self: int(self._pop.cols["gender"][self._k]))
+    colour = property(lambda self: tuple(int(c) for c in self._pop.cols["colour"][self._k]))
+    location = property(lambda self: tuple(int(c) for c in self._pop.cols["location"][self._k]))
+    size = property(lambda self: float(self._pop.cols["size"][self._k]))
+    old_age_death = property(lambda self: int(self._pop.cols["old_age_death"][self._k]))
+    childhood = property(lambda self: int(self._pop.cols["childhood"][self._k]))
+    age = property(lambda self: int(self._pop.cols["age"][self._k]))
+    childhood_size = property(lambda self: float(self._pop.cols["childhood_size"][self._k]))
+    growth = property(lambda self: float(self._pop.cols["growth"][self._k]))
+    offspring_size = property(lambda self: float(self._pop.cols["offspring_size"][self._k]))
+    offspring_number = property(lambda self: int(self._pop.cols["offspring_number"][self._k]))
+    gestation_period = property(lambda self: int(self._pop.cols["gestation_period"][self._k]))
+    gestation_days = property(lambda self: int(self._pop.cols["gestation_days"][self._k]))
+    death_prob = property(lambda self: float(self._pop.cols["death_prob"][self._k]))
+
+class Population:
+    """
+    A class to represent a population as parallel arrays, one row per individual.
+    It behaves as the list of individuals expected by the rest of the simulation.
+
+        Attributes
+        ----------
+            cols : dict
+                Array of each attribute, indexed by field name
+
+
+        Methods
+        -------
+            append(i):
+                Adds a Species object to the population
+            species_stats():
+                Returns the statistics registry of the population
+            render_data():
+                Returns the sprite parameters of each visible individual
+            step(n_squares, sq_size, bg_mat, telemetry):
+                Advances the population one day
+    """
+
+    def __init__(self, ind_list = ()):
+        """
+        Initializes an empty population and adds the given individuals.
+
+        Parameters
+        ----------
+            ind_list : list of Species
+                Individuals to add
+        """
+
+        self.cols = {f: np.zeros((0,)+shape, dtype) for f, dtype, shape in FIELDS}
+        self._pending = []
+        self._stats = None
+
+        for i in ind_list: self.append(i)
+
+    def __len__(self):
+        return len(self.cols["age"]) + len(self._pending)
+
+    def __iter__(self):
+        self._flush()
+        return (Individual(self, k) for k in range(len(self.cols["age"])))
+
+    def __getitem__(self, k):
+        self._flush()
+        rows = range(len(self.cols["age"]))[k]
+        if isinstance(k, slice): return [Individual(self, r) for r in rows]
+        return Individual(self, rows)
+
+    def __delitem__(self, k):
+        self._flush()
+        keep = np.ones(len(self.cols["age"]), bool)
+        keep[k] = False
+        self._filter(keep)
+
+    def append(self, i):
+        """
+        Adds a Species object to the population
+
+        Parameters
+        ----------
+            i : Species
+                Individual to add
+        """
+
+        self._pending.append(i)
+
+    def _flush(self):
+        """
+        Moves the pending Species objects into the arrays
+        """
+
+        if not self._pending: return
+
+        rows = {f: [] for f, _, _ in FIELDS}
+        for i in self._pending:
+            for f in ("id", "species_id", "s_type", "gender", "colour", "cammo", "size", "location", "old_age_death", "childhood", "age",
+                      "childhood_size", "growth", "offspring_size", "offspring_number", "gestation_period", "gestation_days", "death_prob"):
+                rows[f].append(getattr(i, f))
+        self._pending = []
+
+        new = {f: np.array(rows[f], dtype).reshape((-1,)+shape) if rows[f] else np.zeros((len(rows["id"]),)+shape, dtype)
+               for f, dtype, shape in FIELDS}
+        self._concat(new)
+
+    def _concat(self, new):
+        """
+        Appends rows to every column
+
+        Parameters
+        ----------
+            new : dict
+                Array of new values of each field
+        """
+
+        for f in self.cols: self.cols[f] = np.concatenate((self.cols[f], new[f]))
+        self._stats = None
+
+    def _filter(self, keep):
+        """
+        Keeps only the rows selected by a mask
+
+        Parameters
+        ----------
+            keep : bool array
+                Mask of rows to keep
+        """
+
+        for f in self.cols: self.cols[f] = self.cols[f][keep]
+        self._stats = None
+
+    def species_stats(self):
+        """
+        Returns the statistics registry of the population, computed once per day
+        """
+
+        self._flush()
+        if self._stats is None: self._stats = SpeciesStats.from_columns(self.cols)
+        return self._stats
+
+    def render_data(self, zoom = 1, origin = (0, 0), view = None):
+        """
+        Returns the colour, radius and top-left corner of the sprite of each visible individual,
+        placed like display_individuals places the circles of Species objects
+
+        Parameters
+        ----------
+            zoom : float
+                Screen pixels per world pixel
+            origin : int tuple
+                Zoomed world pixel at the top-left corner of the screen
+            view : int tuple
+                Width and height of the screen, to leave out the sprites outside it, if any
+        """
+
+        self._flush()
+        c = self.cols
+        size = np.where(c["age"] <= c["childhood"], c["childhood_size"], c["size"])
+        radius = (size*zoom).astype(np.int64)
+        visible = radius >= 1
+        corner = ((c["location"] - size[:, None]/2)*zoom).astype(np.int64) - origin - radius[:, None]
+        if view is not None:
+            visible &= ((corner + 2*radius[:, None] >= 0) & (corner < view)).all(axis = 1)
+        return zip(map(tuple, c["colour"][visible].tolist()), radius[visible].tolist(), map(tuple, corner[visible].tolist()))
+
+    def step(self, n_squares, sq_size, bg_mat, telemetry = None):
+        """
+        Advances the population one day. Each rule of update_individuals is applied
+        to every individual at once, and deaths and births are applied at the end of the day.
+
+        Parameters
+        ----------
+            n_squares : int
+                Tiles of each side of the world
+            sq_size : int
+                Size of squares
+            bg_mat : int 2d array
+                Numerical info of the world
+            telemetry : Telemetry
+                Recorder of the daily statistics, if any
+        """
+
+        self._flush()
+        if not len(self.cols["age"]):
+            if telemetry is not None: telemetry.record(self, 0, np.zeros(len(sg.CAUSES), np.int64))
+            return
+        bg = np.asarray(bg_mat)
+        c = self.cols
+        prof = profiler.active
+        times = [perf_counter()] if prof else None
+
+        # Growing up
+        c["age"] += 1
+        child = c["age"] <= c["childhood"]
+        c["childhood_size"][child] += c["growth"][child]
+        # Walking
+        self._walk(n_squares, sq_size, bg_mat)
+        if prof: times.append(perf_counter())
+        # Conception
+        female = c["gender"] == species.FEMALE
+        delivery = female & (c["gestation_days"] == c["gestation_period"])
+        newborns = self._offspring(np.flatnonzero(delivery & c["pregnant"]), sq_size)
+        c["pregnant"][delivery] = False
+        c["gestation_days"][delivery] = 0
+        if prof: times.append(perf_counter())
+        # Reproduction
+        fertile = np.flatnonzero(female & (c["age"] >= c["childhood"]) & (c["gestation_days"] == 0))
+        self._mate(fertile, n_squares, sq_size)
+        # Pregnancy
+        c["gestation_days"][c["gestation_days"] > 0] += 1
+        if prof: times.append(perf_counter())
+        # Death. update_individuals removes each dead individual at once, so an individual is only crowded
+        # by the survivors before it in the list and by everyone after it. The crowded that only die of crowding
+        # are counted again without the dead before them until nothing changes, which ends as each count
+        # only depends on earlier rows.
+        draws = rng.get("death").generator.integers(1, 101, len(c["age"]))
+        alone, age_prob, cammo_prob = self._death_prob(sq_size, bg)
+        crowded = self._nearby(n_squares, sq_size) >= 20
+        candidates = np.flatnonzero(crowded & (alone*100 < draws) & ((alone + sg.RES_TERR_PROB)*100 >= draws))
+        while True:
+            # Resources + Territory
+            crowd_prob = crowded*sg.RES_TERR_PROB
+            c["death_prob"] = alone + crowd_prob
+            dead = c["death_prob"]*100 >= draws
+            if not len(candidates): break
+            recount = crowded.copy()
+            recount[candidates] = self._nearby(n_squares, sq_size, rows = candidates, dead = dead) >= 20
+            if np.array_equal(recount, crowded): break
+            crowded = recount
+        cause = np.where((age_prob >= crowd_prob) & (age_prob >= cammo_prob), sg.AGE,
+                         np.where(crowd_prob >= cammo_prob, sg.CROWDING, sg.CAMOUFLAGE))
+        deaths = np.bincount(cause[dead], minlength=len(sg.CAUSES))
+        if prof: times.append(perf_counter())
+
+        # Apply deaths and births
+        lost = np.unique(c["species_id"][dead])
+        self._filter(~dead)
+        self._concat(newborns)
+        
+        # Release the names of the species extinct today
+        if len(lost):
+            alive = np.bincount(self.cols["species_id"], minlength=len(species.species))
+            for s in lost[alive[lost] == 0].tolist(): species.release_species(s)
+        if prof: times.append(perf_counter())
+
+        if telemetry is not None: telemetry.record(self, len(newborns["id"]), deaths)
+
+        if prof:
+            times.append(perf_counter())
+            for name, t in zip(("walk", "conception", "mate_search", "death", "apply", "telemetry"), np.diff(times)):
+                prof.add(name, t)
+            for name, value in (("mate_searches", len(fertile)), ("births", len(newborns["id"])),
+                                ("deaths", int(dead.sum())), ("total", times[-1] - times[0])):
+                prof.add(name, value)
+            prof.end_day(len(c["age"]))
+
+    def _habitat(self, location, sq_size, bg):
+        """
+        Returns the biome under each location, indexed like the Species functions do
+
+        Parameters
+        ----------
+            location : int 2d array
+                Positions to check
+            sq_size : int
+                Size of squares
+            bg : int 2d array
+                Numerical info of the world
+        """
+
+        tiles = np.ceil(location/sq_size).astype(np.intp)-1
+        return bg[tiles[:, 0], tiles[:, 1]]
+
+    def _walk(self, n_squares, sq_size, bg_mat):
+        """
+        Moves every individual near its previous position without leaving its habitat
+
+        Parameters
+        ----------
+            n_squares : int
+                Tiles of each side of the world
+            sq_size : int
+                Size of squares
+            bg_mat : int 2d array
+                Numerical info of the world
+        """
+
+        bg = np.asarray(bg_mat)
+        loc = self.cols["location"]
+        aquatic = self.cols["s_type"] == species.AQUATIC
+        max_move_frwd = round(sq_size*0.5)
+        max_move_bkwd = round(sq_size*-0.5)
+        todo = np.arange(len(loc))
+        gen = rng.get("movement").generator
+
+        for _ in range(MAX_STEP_TRIES):
+            new = loc[todo] + gen.integers(max_move_bkwd, max_move_frwd+1, (len(todo), 2))
+            np.clip(new, 0, n_squares*sq_size, out=new)
+            valid = (self._habitat(new, sq_size, bg) == sg.WATER) == aquatic[todo]
+            loc[todo[valid]] = new[valid]
+            todo = todo[~valid]
+            if not len(todo): return
+            if profiler.active: profiler.active.add("step_redraws", len(todo))
+        
+        # Individuals near the border of their habitat
+        if profiler.active: profiler.active.add("step_fallbacks", len(todo))
+        habitat_map = habitat.get_map(bg_mat, n_squares, sq_size)
+        for k in todo:
+            loc[k] = habitat_map.reachable_step(self.cols["s_type"][k], loc[k].tolist())
+
+    def _offspring(self, mothers, sq_size):
+        """
+        Generates the litters of the given mothers, following the Species offspring rules
+
+        Parameters
+        ----------
+            mothers : int array
+                Rows of the mothers giving birth
+            sq_size : int
+                Size of squares
+
+        Returns
+        -------
+            new : dict
+                Array of values of each field for the newborns
+        """
+
+        c = self.cols
+        m = np.repeat(mothers, c["offspring_number"][mothers])
+        n = len(m)
+        new = {f: np.zeros((n,)+shape, dtype) for f, dtype, shape in FIELDS}
+        mutation_prob = 0.1
+        gen = rng.get("reproduction").generator
+
+        def inherit(field):
+            from_mother = gen.integers(0, 2, n).astype(bool)
+            return np.where(from_mother.reshape((-1,)+(1,)*(c[field].ndim-1)), c[field][m], c["mate_"+field][m])
+        def mutates():
+            return gen.uniform(0, 1, n) <= mutation_prob
+
+        new["id"] = np.arange(n) + species.new_id(n)
+        new["species_id"] = c["species_id"][m]
+        new["s_type"] = inherit("s_type")
+        new["location"] = c["location"][m]
+        new["old_age_death"] = inherit("old_age_death") + gen.integers(-30, 31, n)
+        new["childhood_size"] = c["offspring_size"][m]
+
+        # Possible mutations
+        colour = inherit("colour")
+        mutated = np.flatnonzero(mutates())
+        colour[mutated] = random_colours(len(mutated))
+        new["colour"] = colour
+        new["cammo"] = camouflage(colour)
+        new["size"] = np.where(mutates(), gen.uniform(0, sq_size*0.4, n), inherit("size"))
+        new["offspring_size"] = np.where(mutates(), gen.uniform(0.1, 0.4, n)*new["size"], c["offspring_size"][m])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratio = new["size"]*0.4/new["offspring_size"]
+        max_number = np.where(np.isfinite(ratio), np.round(ratio), 0).astype(np.int64)+1
+        new["offspring_number"] = np.where(mutates(), randint_upto(max_number), c["offspring_number"][m])
+        new["gestation_period"] = np.where(mutates(), np.round(gen.uniform(0.1, 0.3, n)*new["old_age_death"]),
+                                           c["gestation_period"][m])
+        new["childhood"] = np.where(mutates(), np.round(gen.uniform(0.1, 0.5, n)*new["old_age_death"])+1,
+                                    inherit("childhood"))
+        # Inherited life expectancy can drift low enough to leave no childhood at all
+        with np.errstate(divide="ignore", invalid="ignore"):
+            new["growth"] = np.where(new["childhood"] > 0, (new["size"]-new["childhood_size"])/new["childhood"], 0.0)
+
+        # Common attributes
+        new["gender"] = gen.integers(0, 2, n)
+
+        return new
+
+    def _mate(self, females, n_squares, sq_size):
+        """
+        Fertilizes each given female with a male of her species within one square of distance
+
+        Parameters
+        ----------
+            females : int array
+                Rows of the fertile females
+            n_squares : int
+                Tiles of each side of the world
+            sq_size : int
+                Size of squares
+        """
+
+        c = self.cols
+        males = np.flatnonzero(c["gender"] == species.MALE)
+        if not len(females) or not len(males): return
+
+        # Males sorted by species and cell
+        mkeys, order = self._cell_keys(males, n_squares, sq_size, 1, True)
+        males = males[order]
+        mkeys = mkeys[order]
+
+        father = np.full(len(females), -1)
+        for dx, dy in _offsets(1):
+            pending = np.flatnonzero(father < 0)
+            if not len(pending): break
+            lo, hi = self._cell_ranges(females[pending], mkeys, n_squares, sq_size, 1, True, dx, dy)
+            active = np.flatnonzero(lo < hi)
+            while len(active):
+                cand = males[lo[active]]
+                near = self._within(cand, females[pending[active]], sq_size)
+                father[pending[active[near]]] = cand[near]
+                lo[active] += 1
+                active = active[~near & (lo[active] < hi[active])]
+
+        # Fertilization
+        found = father >= 0
+        f, j = females[found], father[found]
+        c["gestation_days"][f] += 1
+        c["pregnant"][f] = True
+        for field in ("s_type", "old_age_death", "colour", "size", "childhood"):
+            c["mate_"+field][f] = c[field][j]
+
+    def _cell_keys(self, rows, n_squares, sq_size, reach, by_species):
+        """
+        Returns the cell key of each given row, and the order that sorts the keys
+
+        Parameters
+        ----------
+            rows : int array
+                Rows to index
+            n_squares : int
+                Tiles of each side of the world
+            sq_size : int
+                Size of squares
+            reach : int
+                Maximum cell offset that will be queried
+            by_species : bool
+                Whether keys are separated by species
+        """
+
+        side = n_squares + 1 + 2*reach
+        cells = self.cols["location"][rows]//sq_size + reach
+        keys = cells[:, 0].astype(np.int64)*side + cells[:, 1]
+        if by_species: keys += self.cols["species_id"][rows].astype(np.int64)*side*side
+        return keys, np.argsort(keys, kind="stable")
+
+    def _cell_ranges(self, rows, sorted_keys, n_squares, sq_size, reach, by_species, dx, dy):
+        """
+        Returns, for each given row, the range of sorted keys that belong to its offset cell
+
+        Parameters
+        ----------
+            rows : int array
+                Rows whose neighbours are searched
+            sorted_keys : int array
+                Sorted cell keys of the indexed rows
+            n_squares : int
+                Tiles of each side of the world
+            sq_size : int
+                Size of squares
+            reach : int
+                Maximum cell offset that will be queried
+            by_species : bool
+                Whether keys are separated by species
+            dx, dy : int
+                Cell offset to search
+        """
+
+        keys, _ = self._cell_keys(rows, n_squares, sq_size, reach, by_species)
+        keys += dx*(n_squares + 1 + 2*reach) + dy
+        return np.searchsorted(sorted_keys, keys, "left"), np.searchsorted(sorted_keys, keys, "right")
+
+    def _within(self, a, b, radius):
+        """
+        Returns whether each pair of rows is not further apart than radius
+
+        Parameters
+        ----------
+            a, b : int array
+                Rows of each pair
+            radius : float
+                Maximum distance
+        """
+
+        d = self.cols["location"][a].astype(np.int64) - self.cols["location"][b]
+        return (d*d).sum(axis=1) <= radius*radius
+
+    def _death_prob(self, sq_size, bg):
+        """
+        Returns the death probability of every individual without crowding, and its age and
+        camouflage terms, following calculate_death_prob
+
+        Parameters
+        ----------
+            sq_size : int
+                Size of squares
+            bg : int 2d array
+                Numerical info of the world
+        """
+
+        c = self.cols
+        child = c["age"] <= c["childhood"]
+
+        # Age
+        age_prob = np.where(child, sg.CHILD_PROB, np.where(c["age"] >= c["old_age_death"], sg.OLD_PROB, 0.0))
+        # Size
+        size_prob = np.where(child, c["childhood_size"], np.maximum(c["size"], 0))*sg.SIZE_PROB
+        # Camouflage, from the colour distances computed at birth
+        habitat = self._habitat(c["location"], sq_size, bg)
+        cammo_prob = np.take_along_axis(c["cammo"], habitat[:, None].astype(np.intp), axis=1)[:, 0]*sg.CAMMO_PROB
+
+        return age_prob - size_prob + cammo_prob, age_prob, cammo_prob
+
+    def _nearby(self, n_squares, sq_size, limit = 20, rows = None, dead = None):
+        """
+        Counts the individuals within three squares of each given individual, up to limit
+
+        Parameters
+        ----------
+            n_squares : int
+                Tiles of each side of the world
+            sq_size : int
+                Size of squares
+            limit : int
+                Count at which an individual stops searching
+            rows : int array
+                Individuals to count for, all of them if not given
+            dead : bool array
+                Individuals not counted by the ones after them in the list, if any
+        """
+
+        everyone = np.arange(len(self.cols["age"]))
+        if rows is None: rows = everyone
+        keys, order = self._cell_keys(everyone, n_squares, sq_size, 3, False)
+        keys = keys[order]
+        count = np.zeros(len(rows), np.int64)
+
+        for dx, dy in _offsets(3):
+            pending = np.flatnonzero(count < limit)
+            if not len(pending): break
+            lo, hi = self._cell_ranges(rows[pending], keys, n_squares, sq_size, 3, False, dx, dy)
+            active = np.flatnonzero(lo < hi)
+            while len(active):
+                j, k = order[lo[active]], rows[pending[active]]
+                near = self._within(j, k, 3*sq_size)
+                if dead is not None: near &= ~dead[j] | (j >= k)
+                count[pending[active[near]]] += 1
+                lo[active] += 1
+                active = active[(lo[active] < hi[active]) & (count[pending[active]] < limit)]
+
+        return np.minimum(count, limit)
+
+def _offsets(reach):
+    """
+    Returns the cell offsets within reach, sorted by distance to the centre cell
+
+        Parameters:
+            reach (int): Maximum offset in each axis
+
+        Returns:
+            List of (dx, dy) tuples
+    """
+
+    offsets = [(dx, dy) for dx in range(-reach, reach+1) for dy in range(-reach, reach+1)]
+    return sorted(offsets, key = lambda o: o[0]**2+o[1]**2)
+
+def camouflage(colours):
+    """
+    Calculates the colour distance of each colour to each biome, like species.camouflage
+
+        Parameters:
+            colours (int 2d array): Colours, one per row
+
+        Returns:
+            Array of the distance of each colour (rows) to each biome (columns)
+    """
+
+    diff = colours[:, None, :].astype(np.int64) - np.array(sg.RGBs)[None, :, :]
+    return np.sqrt((diff**2).sum(axis=2))
+
+def random_colours(n):
+    """
+    Draws n colours of three different components, like random.sample(range(0, 255), 3)
+
+        Parameters:
+            n (int): Number of colours
+
+        Returns:
+            Array of n colours
+    """
+
+    gen = rng.get("reproduction").generator
+    colours = gen.integers(0, 255, (n, 3))
+    repeated = np.flatnonzero((colours[:, 0] == colours[:, 1]) | (colours[:, 0] == colours[:, 2]) | (colours[:, 1] == colours[:, 2]))
+    while len(repeated):
+        colours[repeated] = gen.integers(0, 255, (len(repeated), 3))
+        c = colours[repeated]
+        repeated = repeated[(c[:, 0] == c[:, 1]) | (c[:, 0] == c[:, 2]) | (c[:, 1] == c[:, 2])]
+    return colours
+
+def randint_upto(high):
+    """
+    Draws one integer between 1 and each upper limit, both included
+
+        Parameters:
+            high (int array): Upper limits
+
+        Returns:
+            Array of integers
+    """
+
+    return 1 + np.floor(rng.get("reproduction").generator.random(len(high))*np.maximum(high, 1)).astype(np.int64)
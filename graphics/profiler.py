@@ -0,0 +1,179 @@
+'''
+Created on 18 oct 2026
+
+@desc: Per-phase timings and counters of the simulation and the main loop
+@author: Alejandro R. Lopez
+'''
+
+# Imports
+from collections import defaultdict, deque
+import csv
+
+# Counters that are not times
+COUNTERS = ["population", "births", "deaths", "mate_searches", "step_redraws", "step_fallbacks", "days"]
+
+# Profiler in use, None when profiling is off. The instrumented code only checks this variable.
+active = None
+
+class Profiler:
+    """
+    A class to accumulate the wall time of each phase and other counters,
+    closed once per simulated day and once per rendered frame.
+
+        Attributes
+        ----------
+            window : int
+                Days and frames of the rolling averages
+            recent_days : deque
+                Counters of the last days
+            recent_frames : deque
+                Counters of the last frames
+            days : list
+                Counters of every day, kept only if keep_days is True
+
+
+        Methods
+        -------
+            add(name, value):
+                Adds a value to a counter of the current day
+            add_frame(name, value):
+                Adds a value to a counter of the current frame
+            end_day(population):
+                Closes the counters of the current day
+            end_frame():
+                Closes the counters of the current frame
+            day_averages(every_day):
+                Returns the average of each counter per day
+            frame_averages():
+                Returns the rolling average of each counter per frame
+            export(path):
+                Writes the counters of every day to a CSV file
+    """
+
+    def __init__(self, window = 60, keep_days = False):
+        """
+        Initializes empty counters.
+
+        Parameters
+        ----------
+            window : int
+                Days and frames of the rolling averages
+            keep_days : bool
+                Whether to keep the counters of every day for export
+        """
+
+        self.window = window
+        self.keep_days = keep_days
+        self.day = defaultdict(float)
+        self.frame = defaultdict(float)
+        self.recent_days = deque(maxlen = window)
+        self.recent_frames = deque(maxlen = window)
+        self.days = []
+
+    def add(self, name, value = 1):
+        """
+        Adds a value (a time in seconds or a count) to a counter of the current day
+        """
+
+        self.day[name] += value
+
+    def add_frame(self, name, value = 1):
+        """
+        Adds a value (a time in seconds or a count) to a counter of the current frame
+        """
+
+        self.frame[name] += value
+
+    def end_day(self, population):
+        """
+        Closes the counters of the current day
+
+        Parameters
+        ----------
+            population : int
+                Individuals alive at the end of the day
+        """
+
+        self.day["population"] = population
+        self.recent_days.append(self.day)
+        if self.keep_days: self.days.append(self.day)
+        self.day = defaultdict(float)
+
+    def end_frame(self):
+        """
+        Closes the counters of the current frame
+        """
+
+        self.recent_frames.append(self.frame)
+        self.frame = defaultdict(float)
+
+    def day_averages(self, every_day = False):
+        """
+        Returns the average of each counter per day, over the last days of the window
+        or over every kept day
+        """
+
+        return _averages(self.days if every_day else self.recent_days)
+
+    def frame_averages(self):
+        """
+        Returns the rolling average of each counter per frame
+        """
+
+        return _averages(self.recent_frames)
+
+    def export(self, path):
+        """
+        Writes the counters of every kept day to a CSV file, one row per day
+
+        Parameters
+        ----------
+            path : str
+                File to write
+        """
+
+        names = sorted(set(name for day in self.days for name in day))
+        with open(path, "w", newline = "") as f:
+            writer = csv.writer(f)
+            writer.writerow(["day"] + names)
+            for k, day in enumerate(self.days):
+                writer.writerow([k+1] + [day.get(name, 0) for name in names])
+
+def _averages(records):
+    """
+    Returns the mean of each counter over some records, counting missing counters as 0
+
+        Parameters:
+            records (deque of dict): Counters of each day or frame
+    """
+
+    totals = defaultdict(float)
+    for r in records:
+        for name, value in r.items(): totals[name] += value
+    return {name: value/len(records) for name, value in totals.items()} if records else {}
+
+def enable(window = 60, keep_days = False):
+    """
+    Starts profiling with new counters
+
+        Parameters:
+            window (int): Days and frames of the rolling averages
+            keep_days (bool): Whether to keep the counters of every day for export
+
+        Returns:
+            The active Profiler
+    """
+
+    global active
+
+    active = Profiler(window, keep_days)
+    return active
+
+def disable():
+    """
+    Stops profiling, so the instrumented code skips every measurement
+    """
+
+    global active
+
+    active = None
@@ -0,0 +1,389 @@
+'''
+Created on 18 oct 2026
+
+@desc: Recording of the positions, births and deaths of each day, and its playback without simulating
+@author: Alejandro R. Lopez
+'''
+
+# Imports
+import numpy as np
+import json
+import os
+import shutil
+import struct
+
+# File format
+MAGIC = b"NSREPLAY"
+VERSION = 1
+KEYFRAME_EVERY = 128
+TRAILER = struct.Struct("<QQ8s")
+DAY = struct.Struct("<iiiq")
+
+# Attributes kept once for each individual, with its age on the first day it was recorded
+STATIC = np.dtype([("id", "<i8"), ("colour", "u1", (3,)), ("size", "<f8"), ("childhood", "<i4"),
+                   ("childhood_size", "<f8"), ("growth", "<f8"), ("age", "<i4"), ("day", "<i8")])
+
+# Types of the steps of a day, the smallest one that holds every step is used
+DELTA_TYPES = [np.dtype("<i1"), np.dtype("<i2"), np.dtype("<i4")]
+
+def _snapshot(ind_list):
+    """
+    Returns the identifier and the location of each individual, and a function to get
+    the attributes of STATIC of some of them
+
+        Parameters:
+            ind_list (list of Species or Population): Individuals alive at the end of the day
+    """
+
+    cols = getattr(ind_list, "cols", None)
+    if cols is not None:
+        ind_list._flush()
+        def static(idx, day):
+            rows = np.zeros(len(idx), STATIC)
+            for f in ("id", "colour", "size", "childhood", "childhood_size", "growth", "age"): rows[f] = cols[f][idx]
+            rows["day"] = day
+            return rows
+        return cols["id"].astype(np.int64), cols["location"].astype(np.int32), static
+
+    n = len(ind_list)
+    ids = np.fromiter((i.id for i in ind_list), np.int64, n)
+    location = np.array([i.location for i in ind_list], np.int32).reshape((n, 2))
+    def static(idx, day):
+        return np.array([(i.id, i.colour, i.size, i.childhood, i.childhood_size, i.growth, i.age, day)
+                         for i in map(ind_list.__getitem__, idx.tolist())], STATIC)
+    return ids, location, static
+
+class Recorder:
+    """
+    A class to record a simulation to a replay file. Each day keeps only the dead, the newborns
+    with their position, and the step of every other individual since the previous day, in the
+    smallest integer type that holds them. Every keyframe_every days the whole state is kept too,
+    so a day can be rebuilt from the keyframe before it. The attributes of each individual are
+    written once, and an index of the days is appended when the recorder is closed.
+
+        Attributes
+        ----------
+            path : str
+                File of the replay
+            first_day : int
+                Day of the first state
+            day : int
+                Day of the last state
+            keyframe_every : int
+                Days between keyframes
+
+
+        Methods
+        -------
+            record(ind_list):
+                Records the state of the population at the end of a day
+            close():
+                Writes the index and closes the file
+    """
+
+    def __init__(self, path, bg_mat, sq_size, ind_list, day = 0, keyframe_every = KEYFRAME_EVERY):
+        """
+        Creates the file and records the first state.
+
+        Parameters
+        ----------
+            path : str
+                File of the replay, replaced if it exists
+            bg_mat : int 2d array
+                Numerical info of the world
+            sq_size : int
+                Size of squares
+            ind_list : list of Species or Population
+                Individuals of the first state
+            day : int
+                Day of the first state
+            keyframe_every : int
+                Days between keyframes
+        """
+
+        self.path = path
+        self.first_day = self.day = day
+        self.keyframe_every = keyframe_every
+        self._day_offsets = []
+        self._key_offsets = []
+        self._n_rows = 0
+
+        # State of the last day, in the order of the replay: survivors first and newborns at the end
+        self._ids = np.zeros(0, np.int64)
+        self._rows = np.zeros(0, np.uint32)
+        self._location = np.zeros((0, 2), np.int32)
+
+        bg_mat = np.ascontiguousarray(bg_mat, np.int8)
+        header = json.dumps({"version": VERSION, "sq_size": sq_size, "n_squares": len(bg_mat),
+                             "first_day": day, "keyframe_every": keyframe_every}).encode()
+        self._file = open(path, "wb")
+        self._file.write(MAGIC + struct.pack("<I", len(header)) + header)
+        self._file.write(bg_mat.tobytes())
+        self._static = open(path+".static", "w+b")
+
+        # First state, as newborns of its day
+        self._update(ind_list)
+        self._keyframe()
+
+    def _update(self, ind_list):
+        """
+        Updates the state with the individuals of the current day
+
+        Returns
+        -------
+            dead : uint32 array
+                Position in the previous state of each dead individual
+            born : int32 2d array
+                Location of each newborn
+            steps : int 2d array
+                Step of each survivor since the previous state
+        """
+
+        ids, location, static = _snapshot(ind_list)
+
+        # Position in the current list of each individual of the previous state
+        order = np.argsort(ids, kind = "stable")
+        k = np.minimum(np.searchsorted(ids, self._ids, sorter = order), max(len(ids)-1, 0))
+        alive = ids[order[k]] == self._ids if len(ids) else np.zeros(len(self._ids), bool)
+        now = order[k[alive]]
+        is_new = np.ones(len(ids), bool)
+        is_new[now] = False
+        new = np.flatnonzero(is_new)
+
+        # Attributes of the newborns
+        rows = np.arange(self._n_rows, self._n_rows+len(new), dtype = np.uint32)
+        self._static.write(static(new, self.day).tobytes())
+        self._n_rows += len(new)
+
+        steps = location[now] - self._location[alive]
+        self._ids = np.concatenate((self._ids[alive], ids[new]))
+        self._rows = np.concatenate((self._rows[alive], rows))
+        self._location = np.concatenate((location[now], location[new]))
+        return np.flatnonzero(~alive).astype(np.uint32), location[new], steps
+
+    def _keyframe(self):
+        """
+        Writes the whole state of the current day
+        """
+
+        self._key_offsets.append(self._file.tell())
+        self._file.write(struct.pack("<i", len(self._rows)))
+        self._file.write(self._rows.astype("<u4").tobytes())
+        self._file.write(self._location.astype("<i4").tobytes())
+
+    def record(self, ind_list):
+        """
+        Records the state of the population at the end of a day
+
+        Parameters
+        ----------
+            ind_list : list of Species or Population
+                Individuals alive at the end of the day
+        """
+
+        self.day += 1
+        first_row = self._n_rows                                                       # Newborns take the next rows
+        dead, born, steps = self._update(ind_list)
+        span = int(np.abs(steps).max()) if steps.size else 0
+        code = next(k for k, t in enumerate(DELTA_TYPES) if span <= np.iinfo(t).max)
+
+        self._day_offsets.append(self._file.tell())
+        self._file.write(DAY.pack(len(dead), len(born), code, first_row))
+        self._file.write(dead.astype("<u4").tobytes())
+        self._file.write(born.astype("<i4").tobytes())
+        self._file.write(steps.astype(DELTA_TYPES[code]).tobytes())
+
+        if (self.day - self.first_day) % self.keyframe_every == 0: self._keyframe()
+
+    def close(self):
+        """
+        Appends the attributes of the individuals and the index of the days, and closes the file
+        """
+
+        if self._file is None: return
+
+        index = {"last_day": self.day, "n_rows": self._n_rows, "n_keyframes": len(self._key_offsets)}
+        index["static"] = self._file.tell()
+        self._static.seek(0)
+        shutil.copyfileobj(self._static, self._file)
+        index["days"] = self._file.tell()
+        self._file.write(np.array(self._day_offsets, "<i8").tobytes())
+        index["keyframes"] = self._file.tell()
+        self._file.write(np.array(self._key_offsets, "<i8").tobytes())
+
+        footer = json.dumps(index).encode()
+        offset = self._file.tell()
+        self._file.write(footer)
+        self._file.write(TRAILER.pack(offset, len(footer), MAGIC))
+        self._file.close()
+        self._static.close()
+        os.remove(self.path+".static")
+        self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class Frame:
+    """
+    A class to represent the individuals of one day of a replay, drawn by
+    species_gen.display_individuals like a Population
+
+        Attributes
+        ----------
+            day : int
+                Day of the frame
+            rows : int array
+                Row of STATIC of each individual
+            location : int 2d array
+                Location of each individual
+    """
+
+    def __init__(self, replay, day, rows, location):
+        self._static = replay.static
+        self.day = day
+        self.rows = rows
+        self.location = location
+
+    def __len__(self):
+        return len(self.rows)
+
+    def render_data(self, zoom = 1, origin = (0, 0), view = None):
+        """
+        Returns the colour, radius and top-left corner of the sprite of each visible individual,
+        placed like display_individuals places the circles of Species objects
+
+        Parameters
+        ----------
+            zoom : float
+                Screen pixels per world pixel
+            origin : int tuple
+                Zoomed world pixel at the top-left corner of the screen
+            view : int tuple
+                Width and height of the screen, to leave out the sprites outside it, if any
+        """
+
+        s = self._static[self.rows]
+        age = s["age"] + (self.day - s["day"])
+        size = np.where(age <= s["childhood"], s["childhood_size"] + s["growth"]*(age - s["age"]), s["size"])
+        radius = (size*zoom).astype(np.int64)
+        visible = radius >= 1
+        corner = ((self.location - size[:, None]/2)*zoom).astype(np.int64) - origin - radius[:, None]
+        if view is not None:
+            visible &= ((corner + 2*radius[:, None] >= 0) & (corner < view)).all(axis = 1)
+        return zip(map(tuple, s["colour"][visible].tolist()), radius[visible].tolist(), map(tuple, corner[visible].tolist()))
+
+class Replay:
+    """
+    A class to read a replay file, memory-mapped so that only the days shown are read.
+    Any day is rebuilt from the keyframe before it, so seeking does not depend on the
+    length of the run, and the following days are applied one after another.
+
+        Attributes
+        ----------
+            bg_mat : int 2d array
+                Numerical info of the world
+            sq_size : int
+                Size of squares
+            first_day : int
+                Day of the first state
+            last_day : int
+                Day of the last state
+            static : structured array
+                Attributes of STATIC of every individual recorded
+
+
+        Methods
+        -------
+            seek(day):
+                Returns the individuals of a day
+    """
+
+    def __init__(self, path):
+        """
+        Opens a replay file written by a Recorder.
+
+        Parameters
+        ----------
+            path : str
+                File of the replay
+        """
+
+        data = self._data = np.memmap(path, np.uint8, "r")
+        offset, length, magic = TRAILER.unpack(data[-TRAILER.size:].tobytes())
+        if data[:len(MAGIC)].tobytes() != MAGIC or magic != MAGIC:
+            raise ValueError(path+" is not a complete replay file.")
+
+        size = struct.unpack("<I", data[len(MAGIC):len(MAGIC)+4].tobytes())[0]
+        header = json.loads(data[len(MAGIC)+4:len(MAGIC)+4+size].tobytes())
+        if header["version"] != VERSION: raise ValueError("Unsupported replay version "+str(header["version"])+".")
+        index = json.loads(data[offset:offset+length].tobytes())
+
+        n = header["n_squares"]
+        self.bg_mat = np.frombuffer(data, np.int8, n*n, len(MAGIC)+4+size).reshape((n, n)).copy()
+        self.sq_size = header["sq_size"]
+        self.first_day = header["first_day"]
+        self.last_day = index["last_day"]
+        self.keyframe_every = header["keyframe_every"]
+        self.static = np.frombuffer(data, STATIC, index["n_rows"], index["static"])
+        self._day_offsets = np.frombuffer(data, "<i8", self.last_day - self.first_day, index["days"])
+        self._key_offsets = np.frombuffer(data, "<i8", index["n_keyframes"], index["keyframes"])
+        self._frame = None
+
+    def _keyframe(self, k):
+        """
+        Returns the state of the keyframe k
+        """
+
+        offset = int(self._key_offsets[k])
+        n = struct.unpack("<i", self._data[offset:offset+4].tobytes())[0]
+        rows = np.frombuffer(self._data, "<u4", n, offset+4)
+        location = np.frombuffer(self._data, "<i4", 2*n, offset+4+4*n).reshape((n, 2))
+        return Frame(self, self.first_day + k*self.keyframe_every, rows, location)
+
+    def _next(self, frame):
+        """
+        Returns the state of the day after a frame
+        """
+
+        offset = int(self._day_offsets[frame.day - self.first_day])
+        n_dead, n_born, code, first_row = DAY.unpack(self._data[offset:offset+DAY.size].tobytes())
+        offset += DAY.size
+        dead = np.frombuffer(self._data, "<u4", n_dead, offset)
+        offset += 4*n_dead
+        born = np.frombuffer(self._data, "<i4", 2*n_born, offset).reshape((n_born, 2))
+        offset += 8*n_born
+        steps = np.frombuffer(self._data, DELTA_TYPES[code], 2*(len(frame)-n_dead), offset).reshape((-1, 2))
+
+        alive = np.ones(len(frame), bool)
+        alive[dead] = False
+        rows = np.concatenate((frame.rows[alive], np.arange(first_row, first_row+n_born, dtype = np.uint32)))
+        location = np.concatenate((frame.location[alive] + steps, born))
+        return Frame(self, frame.day + 1, rows, location)
+
+    def seek(self, day):
+        """
+        Returns the individuals of a day, from the current one if it is before the day
+        and no farther than the keyframe before it
+
+        Parameters
+        ----------
+            day : int
+                Day to show, clamped to the days of the replay
+
+        Returns
+        -------
+            frame : Frame
+                Individuals of the day
+        """
+
+        day = min(max(day, self.first_day), self.last_day)
+        k = (day - self.first_day)//self.keyframe_every
+        frame = self._frame
+        if frame is None or frame.day > day or frame.day < self.first_day + k*self.keyframe_every:
+            frame = self._keyframe(k)
+        while frame.day < day: frame = self._next(frame)
+        self._frame = frame
+        return frame
@@ -0,0 +1,157 @@
+'''
+Created on 18 oct 2026
+
+@desc: Seeded random number streams of each part of the simulation
+@author: Alejandro R. Lopez
+'''
+
+# Imports
+import numpy as np
+from bisect import bisect_right
+from itertools import accumulate
+
+# Independent stream of each subsystem
+SUBSYSTEMS = ["world", "species", "movement", "reproduction", "death"]
+
+# Uniform numbers drawn at once by each stream for its scalar draws
+BATCH = 4096
+
+class Stream:
+    """
+    A class to represent the random numbers of one subsystem.
+    Vectorized code draws from its numpy Generator directly. Scalar draws are
+    served from a batch of uniform numbers drawn in advance, which avoids
+    calling the Generator once per number on the hot path.
+
+        Attributes
+        ----------
+            generator : numpy.random.Generator
+                Generator of the stream
+
+
+        Methods
+        -------
+            random():
+                Returns a uniform number in [0, 1)
+            randint(a, b):
+                Returns an integer between a and b, both included
+            uniform(a, b):
+                Returns a uniform number between a and b
+            choice(seq):
+                Returns a random element of a sequence
+            weighted_choice(seq, weights):
+                Returns an element of a sequence with probability proportional to its weight
+            sample(n, k):
+                Returns k different integers below n
+    """
+
+    def __init__(self, seed_seq):
+        """
+        Creates the generator of the stream.
+
+        Parameters
+        ----------
+            seed_seq : numpy.random.SeedSequence
+                Seed of the stream
+        """
+
+        self.generator = np.random.Generator(np.random.PCG64(seed_seq))
+        self._next = iter(()).__next__
+
+    def random(self):
+        """
+        Returns a uniform number in [0, 1), drawing a new batch when the current one is used up
+        """
+
+        try: return self._next()
+        except StopIteration:
+            self._next = iter(self.generator.random(BATCH).tolist()).__next__
+            return self._next()
+
+    def randint(self, a, b):
+        """
+        Returns an integer between a and b, both included, like random.randint
+        """
+
+        return a + int(self.random()*(b-a+1))
+
+    def uniform(self, a, b):
+        """
+        Returns a uniform number between a and b, like random.uniform
+        """
+
+        return a + (b-a)*self.random()
+
+    def choice(self, seq):
+        """
+        Returns a random element of a non-empty sequence
+        """
+
+        return seq[int(self.random()*len(seq))]
+
+    def weighted_choice(self, seq, weights):
+        """
+        Returns an element of a sequence with probability proportional to its weight
+        """
+
+        cum_weights = list(accumulate(weights))
+        return seq[bisect_right(cum_weights, self.random()*cum_weights[-1])]
+
+    def sample(self, n, k):
+        """
+        Returns k different integers below n, like random.sample(range(n), k) for small k
+        """
+
+        values = []
+        while len(values) < k:
+            v = int(self.random()*n)
+            if v not in values: values.append(v)
+        return values
+
+    def get_state(self):
+        """
+        Returns the state of the generator and the numbers of the batch not used yet
+        """
+
+        remaining = []
+        while True:
+            try: remaining.append(self._next())
+            except StopIteration: break
+        self._next = iter(remaining).__next__
+        return self.generator.bit_generator.state, np.array(remaining)
+
+    def set_state(self, state, remaining):
+        """
+        Restores a state returned by get_state
+        """
+
+        self.generator.bit_generator.state = state
+        self._next = iter(np.asarray(remaining, float).tolist()).__next__
+
+# Streams of the current simulation
+streams = {}
+
+def seed(value = None):
+    """
+    Creates the streams of every subsystem from a single seed.
+    The streams are spawned from the same SeedSequence, so they never overlap,
+    and different seeds (for instance one per worker) give independent simulations.
+
+        Parameters:
+            value (int): Seed, or None to take it from the operating system
+    """
+
+    children = np.random.SeedSequence(value).spawn(len(SUBSYSTEMS))
+    for name, child in zip(SUBSYSTEMS, children): streams[name] = Stream(child)
+
+def get(name):
+    """
+    Returns the stream of a subsystem
+
+        Parameters:
+            name (str): Name of the subsystem, one of SUBSYSTEMS
+    """
+
+    return streams[name]
+
+seed()
@@ -0,0 +1,220 @@
+'''
+Created on 18 oct 2026
+
+@desc: Headless batch runner of the simulation
+@author: Alejandro R. Lopez
+'''
+
+# Imports
+from graphics import world_gen as wg
+from graphics import species_gen as sg
+from graphics import checkpoint as ckpt
+from graphics import rng
+from graphics import profiler
+from graphics.population import Population
+from graphics.sharding import ShardedWorld
+from graphics.telemetry import Telemetry
+from graphics.replay import Recorder
+import argparse
+import time
+
+def run(days, n_species, n_squares, sq_size, n_ind = 49, engine = "objects", resume = None, checkpoint = None,
+        checkpoint_every = 0, telemetry_dir = None, seed = None, profile = None, shards = 0, replay = None):
+    """
+    Runs a simulation without display and measures its throughput
+
+        Parameters:
+            days (int): Days to simulate
+            n_species (int): Species generated at the beginning
+            n_squares (int): Tiles of each side of the world
+            sq_size (int): Size of squares
+            n_ind (int): Individuals generated with each specimen
+            engine (str): "objects" for a list of Species, "arrays" for a Population
+            resume (str): Checkpoint to continue from, instead of generating a new world and species
+            checkpoint (str): File where the state is saved at the end of the run
+            checkpoint_every (int): Days between intermediate saves of the checkpoint, 0 for none
+            telemetry_dir (str): Folder where the statistics of each day are appended, if any
+            seed (int): Seed of the random streams, ignored when resuming
+            profile (str): CSV file where the time of each phase of each day is written, if any
+            shards (int): Regions of the world simulated by their own process (objects engine only),
+                          0 for a single process, None for one per core
+            replay (str): File where the positions, births and deaths of each day are recorded, if any
+
+        Returns:
+            report (dict): Days simulated, last day, peak population and wall time of each phase
+    """
+
+    report = {"days": 0, "last_day": 0, "peak_population": 0, "final_population": 0, "phases": {}}
+
+    if resume is not None:
+        # Previous simulation
+        start = time.perf_counter()
+        bg_mat, individuals, sq_size, report["last_day"] = ckpt.load(resume)
+        n_squares = len(bg_mat)
+        report["phases"]["load"] = time.perf_counter() - start
+    else:
+        rng.seed(seed)
+        
+        # World generation
+        start = time.perf_counter()
+        bg_mat = wg.createBg(n_squares)
+        report["phases"]["world"] = time.perf_counter() - start
+
+        # Species generation
+        start = time.perf_counter()
+        individuals = Population() if engine == "arrays" else []
+        for _ in range(n_species):
+            sg.gen_individuals(n_squares, sq_size, bg_mat, individuals, n_ind)
+        report["phases"]["species"] = time.perf_counter() - start
+    report["peak_population"] = len(individuals)
+
+    # Simulation in several processes
+    if shards != 0:
+        if isinstance(individuals, Population) or telemetry_dir is not None or profile is not None or replay is not None:
+            raise ValueError("Shards need the objects engine, without telemetry, profile or replay.")
+        return _run_sharded(report, days, bg_mat, individuals, n_squares, sq_size, checkpoint, checkpoint_every, shards)
+
+    # Simulation, until the last day or the extinction of every species
+    prof = profiler.enable(keep_days = True) if profile is not None else None
+    telemetry = Telemetry(telemetry_dir, report["last_day"]) if telemetry_dir is not None else None
+    recorder = Recorder(replay, bg_mat, sq_size, individuals, report["last_day"]) if replay is not None else None
+    save_time = 0.0
+    start = time.perf_counter()
+    while report["days"] < days and individuals:
+        sg.update_individuals(individuals, n_squares, sq_size, bg_mat, telemetry)
+        if recorder is not None: recorder.record(individuals)
+        report["days"] += 1
+        report["last_day"] += 1
+        report["peak_population"] = max(report["peak_population"], len(individuals))
+        if checkpoint is not None and checkpoint_every > 0 and report["days"] % checkpoint_every == 0:
+            save_start = time.perf_counter()
+            ckpt.save(checkpoint, bg_mat, individuals, sq_size, report["last_day"])
+            save_time += time.perf_counter() - save_start
+    report["phases"]["simulation"] = time.perf_counter() - start - save_time
+    report["final_population"] = len(individuals)
+
+    # Time of each phase of the days
+    if prof is not None:
+        profiler.disable()
+        prof.export(profile)
+        report["day_phases"] = prof.day_averages(every_day = True)
+
+    # Pending statistics
+    if telemetry is not None:
+        start = time.perf_counter()
+        telemetry.close()
+        report["phases"]["telemetry"] = time.perf_counter() - start
+
+    # Index of the replay
+    if recorder is not None:
+        start = time.perf_counter()
+        recorder.close()
+        report["phases"]["replay"] = time.perf_counter() - start
+
+    # Final state
+    if checkpoint is not None:
+        save_start = time.perf_counter()
+        ckpt.save(checkpoint, bg_mat, individuals, sq_size, report["last_day"])
+        save_time += time.perf_counter() - save_start
+        report["phases"]["checkpoint"] = save_time
+
+    return report
+
+def _run_sharded(report, days, bg_mat, individuals, n_squares, sq_size, checkpoint, checkpoint_every, shards):
+    """
+    Runs the days of run with the world split in regions, each one simulated by its own process
+
+        Parameters:
+            report (dict): Report of run, completed with the simulation
+            days (int): Days to simulate
+            bg_mat (int 2d array): Numerical info of the world
+            individuals (list of Species): Individuals of the simulation
+            n_squares (int): Tiles of each side of the world
+            sq_size (int): Size of squares
+            checkpoint (str): File where the state is saved at the end of the run
+            checkpoint_every (int): Days between intermediate saves of the checkpoint, 0 for none
+            shards (int): Number of regions, one per core if None
+
+        Returns:
+            report (dict): Days simulated, last day, peak population and wall time of each phase
+    """
+
+    save_time = 0.0
+    start = time.perf_counter()
+    with ShardedWorld(bg_mat, n_squares, sq_size, individuals, shards) as world:
+        report["shards"] = len(world.counts)
+        while report["days"] < days and len(world):
+            world.step()
+            report["days"] += 1
+            report["last_day"] += 1
+            report["peak_population"] = max(report["peak_population"], len(world))
+            if checkpoint is not None and checkpoint_every > 0 and report["days"] % checkpoint_every == 0:
+                save_start = time.perf_counter()
+                ckpt.save(checkpoint, bg_mat, world.collect(), sq_size, report["last_day"])
+                save_time += time.perf_counter() - save_start
+        report["phases"]["simulation"] = time.perf_counter() - start - save_time
+        report["final_population"] = len(world)
+
+        # Final state
+        if checkpoint is not None:
+            save_start = time.perf_counter()
+            ckpt.save(checkpoint, bg_mat, world.collect(), sq_size, report["last_day"])
+            save_time += time.perf_counter() - save_start
+            report["phases"]["checkpoint"] = save_time
+
+    return report
+
+def print_report(report):
+    """
+    Prints the throughput report of a run
+
+        Parameters:
+            report (dict): Report returned by run
+    """
+
+    sim_time = report["phases"]["simulation"]
+    days_sec = report["days"]/sim_time if sim_time > 0 else float("inf")
+
+    if "shards" in report: print("Shards: "+str(report["shards"]))
+    print("Days simulated: "+str(report["days"]))
+    print("Last day: "+str(report["last_day"]))
+    print("Days/sec: "+str(round(days_sec, 2)))
+    print("Peak population: "+str(report["peak_population"]))
+    print("Final population: "+str(report["final_population"]))
+    print("Wall time per phase:")
+    for phase, t in report["phases"].items():
+        print("  "+phase+": "+str(round(t, 3))+" s")
+    if "day_phases" in report:
+        print("Mean per day:")
+        for name, value in sorted(report["day_phases"].items()):
+            if name in profiler.COUNTERS: print("  "+name+": "+str(round(value, 2)))
+            else: print("  "+name+": "+str(round(value*1000, 3))+" ms")
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description = "Runs the simulation without display.")
+    parser.add_argument("--days", type = int, default = 1000, help = "days to simulate")
+    parser.add_argument("--species", type = int, default = 5, help = "species generated at the beginning")
+    parser.add_argument("--size", type = int, default = 25, help = "tiles of each side of the world")
+    parser.add_argument("--sq-size", type = int, default = 35, help = "size of squares")
+    parser.add_argument("--individuals", type = int, default = 49, help = "individuals generated with each specimen")
+    parser.add_argument("--engine", choices = ["objects", "arrays"], default = "objects", help = "population storage")
+    parser.add_argument("--resume", help = "checkpoint to continue from")
+    parser.add_argument("--checkpoint", help = "file where the final state is saved")
+    parser.add_argument("--checkpoint-every", type = int, default = 0, help = "days between intermediate checkpoints")
+    parser.add_argument("--telemetry", help = "folder where the statistics of each day are appended")
+    parser.add_argument("--seed", type = int, help = "seed of the random streams")
+    parser.add_argument("--profile", help = "CSV file where the time of each phase of each day is written")
+    parser.add_argument("--shards", type = int, default = 0,
+                        help = "regions of the world simulated by their own process, -1 for one per core (objects engine)")
+    parser.add_argument("--replay", help = "file where the positions, births and deaths of each day are recorded")
+    args = parser.parse_args(argv)
+    if args.shards != 0 and (args.engine != "objects" or args.telemetry or args.profile or args.replay):
+        parser.error("--shards needs the objects engine, without --telemetry, --profile or --replay")
+
+    report = run(args.days, args.species, args.size, args.sq_size, args.individuals, args.engine,
+                 args.resume, args.checkpoint, args.checkpoint_every, args.telemetry, args.seed, args.profile,
+                 None if args.shards < 0 else args.shards, args.replay)
+    print_report(report)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,409 @@
+'''
+Created on 18 oct 2026
+
+@desc: Simulation of a world split in regions, each one updated by its own process
+@author: Alejandro R. Lopez
+'''
+
+# Imports
+from graphics import rng
+from graphics import species
+from graphics import species_gen as sg
+from graphics import species_stats
+from graphics import lifecycle
+from graphics import profiler
+import multiprocessing as mp
+import os
+
+# Constants of species_gen copied to the workers, in case they have been changed
+CONSTANTS = ["CHILD_PROB", "OLD_PROB", "SIZE_PROB", "CAMMO_PROB", "RES_TERR_PROB"]
+
+# Identifiers reserved for the newborns of each region
+ID_STRIDE = 1 << 40
+
+def shard_shape(shards):
+    """
+    Returns the rows and columns of regions of a layout of the given number of regions, as square as possible
+
+        Parameters:
+            shards (int): Number of regions
+    """
+
+    rows = max(r for r in range(1, int(shards**0.5)+1) if shards % r == 0)
+    return rows, shards//rows
+
+class Layout:
+    """
+    A class to represent the split of the world in a grid of rectangular regions of pixels.
+    Region k covers row k//cols and column k%cols; the first coordinate of a location gives its column.
+
+        Attributes
+        ----------
+            rows : int
+                Regions along the second coordinate
+            cols : int
+                Regions along the first coordinate
+            world_px : int
+                Pixels of each side of the world
+            reach : int
+                Distance to a region at which individuals of other regions are part of its halo
+
+
+        Methods
+        -------
+            shard_of(location):
+                Returns the region of a location
+            near(location):
+                Returns the regions within reach of a location
+            neighbours(k):
+                Returns the regions that can exchange individuals with region k
+    """
+
+    def __init__(self, rows, cols, world_px, reach):
+        """
+        Initializes the layout.
+
+        Parameters
+        ----------
+            rows : int
+                Regions along the second coordinate
+            cols : int
+                Regions along the first coordinate
+            world_px : int
+                Pixels of each side of the world
+            reach : int
+                Halo distance
+        """
+
+        self.rows = rows
+        self.cols = cols
+        self.world_px = world_px
+        self.reach = reach
+
+    def _index(self, v, n):
+        """
+        Returns the band of n bands that contains a pixel coordinate, clamped to the world
+        """
+
+        return min(max(v, 0)*n//self.world_px, n-1)
+
+    def shard_of(self, location):
+        """
+        Returns the region of a location
+
+        Parameters
+        ----------
+            location : int tuple
+                Position in the world
+        """
+
+        return self._index(location[1], self.rows)*self.cols + self._index(location[0], self.cols)
+
+    def near(self, location):
+        """
+        Returns the regions within reach of a location, its own region included
+
+        Parameters
+        ----------
+            location : int tuple
+                Position in the world
+        """
+
+        x, y = location
+        c0, c1 = self._index(x-self.reach, self.cols), self._index(x+self.reach, self.cols)
+        r0, r1 = self._index(y-self.reach, self.rows), self._index(y+self.reach, self.rows)
+        return [r*self.cols + c for r in range(r0, r1+1) for c in range(c0, c1+1)]
+
+    def neighbours(self, k):
+        """
+        Returns the other regions within twice the reach of region k, which covers the regions near
+        the individuals that have just stepped out of it
+
+        Parameters
+        ----------
+            k : int
+                Region
+        """
+
+        r, c = divmod(k, self.cols)
+        x0, x1 = -(-c*self.world_px//self.cols), -(-(c+1)*self.world_px//self.cols) - 1
+        y0, y1 = -(-r*self.world_px//self.rows), -(-(r+1)*self.world_px//self.rows) - 1
+        c0, c1 = self._index(x0-2*self.reach, self.cols), self._index(x1+2*self.reach, self.cols)
+        r0, r1 = self._index(y0-2*self.reach, self.rows), self._index(y1+2*self.reach, self.rows)
+        return [n for n in (rr*self.cols + cc for rr in range(r0, r1+1) for cc in range(c0, c1+1)) if n != k]
+
+class _DayCounts:
+    """
+    A class to keep the births and deaths of the last day, with the interface of Telemetry
+    """
+
+    def __init__(self):
+        self.births = 0
+        self.deaths = [0]*len(sg.CAUSES)
+
+    def record(self, ind_list, births, deaths):
+        self.births = births
+        self.deaths = list(deaths)
+
+def _serve(conn, links, k, layout, bg_mat, n_squares, sq_size, ind_list, pregnancies, halo, seed, next_id, taxonomy, constants):
+    """
+    Main loop of the process of one region. It owns the individuals of the region and answers
+    the messages of ShardedWorld: "step" to simulate one day, "collect" and "stop". At the end
+    of each day, emigrants and halo copies are sent straight to the neighbouring regions.
+
+        Parameters:
+            conn (Connection): End of the pipe of the process
+            links (dict): End of the pipe to each neighbouring region
+            k (int): Region of the process
+            layout (Layout): Split of the world
+            bg_mat (int 2d array): Numerical info of the world
+            n_squares (int): Tiles of each side of the world
+            sq_size (int): Size of squares
+            ind_list (list of Species): Individuals of the region
+            pregnancies (dict): Embryos of each mother of the region
+            halo (list of Species): Individuals of other regions near this one
+            seed (int): Seed of the random streams of the region
+            next_id (int): First identifier of the newborns of the region
+            taxonomy (str list): Name of each species ID
+            constants (dict): Values of CONSTANTS
+    """
+
+    # Module state of this process
+    profiler.disable()
+    for name, value in constants.items(): setattr(sg, name, value)
+    species.restore_taxonomy(taxonomy, None, [])
+    species.next_id = next_id
+    rng.seed(seed)
+    sg.pregnancies.clear()
+    sg.pregnancies.update(pregnancies)
+    species_stats.registry = species_stats.SpeciesStats(ind_list)
+    lifecycle.registry = lifecycle.Lifecycle(ind_list)
+    counts = _DayCounts()
+
+    while True:
+        msg = conn.recv()
+
+        if msg[0] == "step":
+            sg.update_individuals(ind_list, n_squares, sq_size, bg_mat, counts, halo)
+            stats = species_stats.get_stats(ind_list)
+            life = lifecycle.get_lifecycle(ind_list)
+
+            # Individuals that leave the region, and copies of the ones near other regions
+            outbox = {n: ([], []) for n in links}
+            stay = []
+            halo = []
+            for i in ind_list:
+                near = layout.near(i.location)
+                dest = near[0] if len(near) == 1 else layout.shard_of(i.location)
+                if dest != k:
+                    outbox[dest][0].append((i, sg.pregnancies.pop(i, None)))
+                    stats.remove(i)
+                    life.remove(i)
+                else: stay.append(i)
+                for n in near:
+                    if n == dest: continue
+                    if n == k: halo.append(i)                                           # Emigrant still near
+                    else: outbox[n][1].append(i)
+            ind_list[:] = stay
+
+            # Exchange with each neighbour, pair by pair in the same order in every process,
+            # so that no two processes wait to send to each other
+            for n in sorted(links):
+                if n > k:
+                    links[n].send(outbox[n])
+                    immigrants, copies = links[n].recv()
+                else:
+                    immigrants, copies = links[n].recv()
+                    links[n].send(outbox[n])
+                halo.extend(copies)
+                for i, litter in immigrants:
+                    ind_list.append(i)
+                    stats.add(i)
+                    life.add(i)
+                    if litter: sg.pregnancies[i] = litter
+
+            # Species left only by emigrants are not released here. update_individuals releases the species
+            # missing from this region in the local taxonomy, which is never sent back; the shared taxonomy
+            # only releases the species missing from every region, in ShardedWorld.step
+            stats.extinct.clear()
+
+            conn.send((counts.births, counts.deaths, list(stats.totals), len(ind_list)))
+
+        elif msg[0] == "collect":
+            conn.send((ind_list, sg.pregnancies, species.next_id))
+
+        else: break
+
+    conn.close()
+
+class ShardedWorld:
+    """
+    A class to represent a simulation split in rectangular regions, each one updated by its own process
+    with the rules of update_individuals. Individuals within reach of a border are copied to the
+    neighbouring regions as a halo, so mating and crowding near borders see the individuals of both
+    sides, and individuals that step out of their region migrate, with their embryos, at the end of the day.
+    Halos and emigrants go straight from one process to the other; this process only receives counts.
+    Every region has its own random streams, so results match a single process statistically, not exactly.
+
+        Attributes
+        ----------
+            layout : Layout
+                Split of the world
+            bg_mat : int 2d array
+                Numerical info of the world
+            n_squares : int
+                Tiles of each side of the world
+            sq_size : int
+                Size of squares
+            counts : int list
+                Individuals of each region
+            births : int
+                Individuals born during the last day
+            deaths : int list
+                Individuals dead during the last day by each cause of species_gen.CAUSES
+
+
+        Methods
+        -------
+            step():
+                Simulates one day in every region
+            collect():
+                Returns every individual and restores species_gen.pregnancies with their embryos
+            close():
+                Stops the processes
+    """
+
+    def __init__(self, bg_mat, n_squares, sq_size, ind_list, shards = None):
+        """
+        Splits the individuals by region and starts the process of each region.
+        The seed of each region is drawn from the world stream, so runs are reproducible.
+
+        Parameters
+        ----------
+            bg_mat : int 2d array
+                Numerical info of the world
+            n_squares : int
+                Tiles of each side of the world
+            sq_size : int
+                Size of squares
+            ind_list : list of Species
+                Individuals of the simulation, with their embryos in species_gen.pregnancies
+            shards : int
+                Number of regions, one per core if None
+        """
+
+        shards = shards or os.cpu_count() or 1
+        rows, cols = shard_shape(shards)
+        # Crowding radius, plus the step an individual can take before being checked
+        reach = 3*sq_size + round(sq_size*0.5)
+        self.layout = Layout(rows, cols, n_squares*sq_size, reach)
+        self.bg_mat = bg_mat
+        self.n_squares = n_squares
+        self.sq_size = sq_size
+        self.births = 0
+        self.deaths = [0]*len(sg.CAUSES)
+
+        # Individuals and embryos of each region, and the first halos
+        regions = [[] for _ in range(shards)]
+        litters = [{} for _ in range(shards)]
+        halos = [[] for _ in range(shards)]
+        for i in ind_list:
+            k = self.layout.shard_of(i.location)
+            regions[k].append(i)
+            if i in sg.pregnancies: litters[k][i] = sg.pregnancies[i]
+            for n in self.layout.near(i.location):
+                if n != k: halos[n].append(i)
+        self.counts = [len(r) for r in regions]
+        self._alive = set(i.species_id for i in ind_list)
+
+        # Pipes between neighbouring regions
+        links = [{} for _ in range(shards)]
+        for k in range(shards):
+            for n in self.layout.neighbours(k):
+                if n > k: links[k][n], links[n][k] = mp.Pipe()
+
+        # Processes
+        seeds = rng.get("world").generator.integers(0, 2**63, shards).tolist()
+        constants = {name: getattr(sg, name) for name in CONSTANTS}
+        self._conns = []
+        self._procs = []
+        for k in range(shards):
+            conn, child = mp.Pipe()
+            proc = mp.Process(target = _serve, daemon = True,
+                              args = (child, links[k], k, self.layout, bg_mat, n_squares, sq_size, regions[k], litters[k],
+                                      halos[k], seeds[k], species.next_id + k*ID_STRIDE, species.species, constants))
+            proc.start()
+            child.close()
+            self._conns.append(conn)
+            self._procs.append(proc)
+        for link in links:
+            for end in link.values(): end.close()                                        # Only used by the processes
+
+    def __len__(self):
+        return sum(self.counts)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def step(self):
+        """
+        Simulates one day in every region at the same time. The regions move the emigrants
+        and the halo copies between themselves, and reply with their counts and species
+        """
+
+        for conn in self._conns: conn.send(("step",))
+        replies = [conn.recv() for conn in self._conns]
+
+        self.births = 0
+        self.deaths = [0]*len(sg.CAUSES)
+        alive = set()
+        for k, (births, deaths, species_ids, count) in enumerate(replies):
+            self.births += births
+            self.deaths = [a+b for a, b in zip(self.deaths, deaths)]
+            alive.update(species_ids)
+            self.counts[k] = count
+
+        # Release the names of the species extinct in every region
+        for s in self._alive - alive: species.release_species(s)
+        self._alive = alive
+
+    def collect(self):
+        """
+        Returns every individual, region by region, and restores species_gen.pregnancies
+        and the identifiers of species with their state. The processes keep their individuals.
+
+        Returns
+        -------
+            ind_list : list of Species
+                Individuals of every region
+        """
+
+        for conn in self._conns: conn.send(("collect",))
+        ind_list = []
+        sg.pregnancies.clear()
+        next_ids = [species.next_id]
+        for conn in self._conns:
+            individuals, pregnancies, next_id = conn.recv()
+            ind_list.extend(individuals)
+            sg.pregnancies.update(pregnancies)
+            next_ids.append(next_id)
+        species.next_id = max(next_ids)
+        species_stats.reset()                                                        # Rebuilt on its first use
+        lifecycle.reset()
+        return ind_list
+
+    def close(self):
+        """
+        Stops the processes
+        """
+
+        for conn in self._conns:
+            try: conn.send(("stop",))
+            except (BrokenPipeError, OSError): pass
+            conn.close()
+        for proc in self._procs: proc.join()
+        self._conns = []
+        self._procs = []
@@ -0,0 +1,485 @@
+'''
+Created on 18 oct 2026
+
+@desc: Uniform grid spatial index of the individuals, whole or partitioned by species, gender and habitat
+@author: Alejandro R. Lopez
+'''
+
+# Imports
+from math import ceil, sqrt
+
+# Side in pixels of the spots, indexed to find the nearest member in crowded cells
+SPOT_SIZE = 1
+# Members within reach above which nearest searches the spots instead of the cells
+DENSE = 256
+
+class SpatialGrid:
+    """
+    A class to represent a uniform grid index of the individuals, keyed on the world tiles.
+
+        Attributes
+        ----------
+            sq_size : int
+                Size of squares, used as the side of each cell
+            cells : dict
+                Individuals of each cell, indexed by cell coordinates
+            cell_of : dict
+                Cell coordinates of each indexed individual
+
+
+        Methods
+        -------
+            insert(i):
+                Adds an individual to the cell of its location
+            remove(i):
+                Removes an individual from the index
+            move(i):
+                Updates the cell of an individual after a change of location
+            query(location, radius):
+                Yields the individuals whose distance to a location is not greater than radius
+            query_rect(left, top, right, bottom, margin):
+                Yields the individuals of the cells overlapping a rectangle
+    """
+
+    def __init__(self, sq_size, ind_list = ()):
+        """
+        Initializes the grid and indexes the given individuals.
+
+        Parameters
+        ----------
+            sq_size : int
+                Size of squares
+            ind_list : list of Species
+                Individuals to index
+        """
+
+        self.sq_size = sq_size
+        self.cells = {}
+        self.cell_of = {}
+
+        for i in ind_list: self.insert(i)
+
+    def cell(self, location):
+        """
+        Returns the cell coordinates of a location
+
+        Parameters
+        ----------
+            location : int tuple
+                Position in the world
+        """
+
+        return (int(location[0]//self.sq_size), int(location[1]//self.sq_size))
+
+    def insert(self, i):
+        """
+        Adds an individual to the cell of its location
+
+        Parameters
+        ----------
+            i : Species
+                Individual to index
+        """
+
+        if i in self.cell_of:
+            self.move(i)
+            return
+
+        key = self.cell(i.location)
+        self.cell_of[i] = key
+        self.cells.setdefault(key, {})[i] = None
+
+    def remove(self, i):
+        """
+        Removes an individual from the index
+
+        Parameters
+        ----------
+            i : Species
+                Individual to remove
+        """
+
+        key = self.cell_of.pop(i, None)
+        if key is None: return
+
+        cell = self.cells[key]
+        del cell[i]
+        if not cell: del self.cells[key]
+
+    def move(self, i):
+        """
+        Updates the cell of an individual after a change of location, indexing it if needed
+
+        Parameters
+        ----------
+            i : Species
+                Individual that has moved
+        """
+
+        old_key = self.cell_of.get(i)
+        if old_key is None:
+            self.insert(i)
+            return
+        new_key = self.cell(i.location)
+        if old_key == new_key: return
+
+        cell = self.cells[old_key]
+        del cell[i]
+        if not cell: del self.cells[old_key]
+        self.cell_of[i] = new_key
+        self.cells.setdefault(new_key, {})[i] = None
+
+    def query(self, location, radius):
+        """
+        Yields the individuals whose distance to a location is not greater than radius.
+        Only the cells overlapping the radius are visited.
+
+        Parameters
+        ----------
+            location : int tuple
+                Centre of the query
+            radius : float
+                Maximum distance to the centre
+        """
+
+        cx, cy = self.cell(location)
+        reach = ceil(radius/self.sq_size)
+        x, y = location
+
+        for kx in range(cx-reach, cx+reach+1):
+            for ky in range(cy-reach, cy+reach+1):
+                cell = self.cells.get((kx, ky))
+                if cell is None: continue
+                for j in cell:
+                    if sqrt((j.location[0]-x)**2+(j.location[1]-y)**2) <= radius: yield j
+
+    def query_rect(self, left, top, right, bottom, margin = 1):
+        """
+        Yields the individuals of the cells overlapping a rectangle, plus some cells around it.
+        When the rectangle covers more cells than are occupied, the occupied cells are filtered instead.
+
+        Parameters
+        ----------
+            left, top, right, bottom : float
+                Borders of the rectangle in world pixels
+            margin : int
+                Cells added on every side
+        """
+
+        x0, y0 = self.cell((left, top))
+        x1, y1 = self.cell((right, bottom))
+        x0 -= margin
+        y0 -= margin
+        x1 += margin
+        y1 += margin
+
+        if (x1-x0+1)*(y1-y0+1) > len(self.cells):
+            for (kx, ky), cell in self.cells.items():
+                if x0 <= kx <= x1 and y0 <= ky <= y1: yield from cell
+            return
+        for kx in range(x0, x1+1):
+            for ky in range(y0, y1+1):
+                cell = self.cells.get((kx, ky))
+                if cell is not None: yield from cell
+
+def partition_key(i):
+    """
+    Returns the partition of an individual: its species, gender and habitat codes
+
+        Parameters:
+            i (Species): Individual
+    """
+
+    return (i.species_id, i.gender, i.s_type)
+
+class PartitionedGrid(SpatialGrid):
+    """
+    A class to represent a grid index of the whole population that also keeps the members of
+    each partition (species, gender and habitat) and its cells, so searches restricted to one
+    partition only visit its members. Memberships are updated in constant time on insertion,
+    removal and movement.
+
+        Attributes
+        ----------
+            members : dict
+                Individuals of each non-empty partition, indexed by partition key
+            part_of : dict
+                Partition key of each indexed individual
+            part_cells : dict
+                Individuals of each cell of each partition, indexed by partition key and cell coordinates
+            spot_size : int
+                Side of the spots
+            spot_of : dict
+                Spot coordinates of each indexed individual
+            part_spots : dict
+                Individuals of each spot of each partition, indexed by partition key and spot coordinates,
+                built on the first search of a crowded place (None before)
+
+
+        Methods
+        -------
+            partition(key):
+                Returns the members of a partition
+            query_partition(key, location, radius):
+                Yields the members of a partition whose distance to a location is not greater than radius
+            nearest(keys, location, radius):
+                Returns the nearest member of some partitions not further than radius from a location
+    """
+
+    def __init__(self, sq_size, ind_list = ()):
+        """
+        Initializes the grid and its partitions and indexes the given individuals.
+
+        Parameters
+        ----------
+            sq_size : int
+                Size of squares
+            ind_list : list of Species
+                Individuals to index
+        """
+
+        self.members = {}
+        self.part_of = {}
+        self.part_cells = {}
+        self.spot_size = SPOT_SIZE
+        self.spot_of = {}
+        self.part_spots = None
+        self._rings = {}
+        super().__init__(sq_size, ind_list)
+
+    def spot(self, location):
+        """
+        Returns the spot coordinates of a location
+
+        Parameters
+        ----------
+            location : int tuple
+                Position in the world
+        """
+
+        return (int(location[0]//self.spot_size), int(location[1]//self.spot_size))
+
+    def _add_spot(self, i, part):
+        """
+        Adds an individual to the spot of its location
+        """
+
+        spot = self.spot_of[i] = self.spot(i.location)
+        self.part_spots.setdefault((part,)+spot, {})[i] = None
+
+    def insert(self, i):
+        """
+        Adds an individual to the cell of its location and to its partition
+
+        Parameters
+        ----------
+            i : Species
+                Individual to index
+        """
+
+        if i in self.cell_of:
+            self.move(i)
+            return
+
+        key = self.cell_of[i] = self.cell(i.location)
+        self.cells.setdefault(key, {})[i] = None
+        part = self.part_of[i] = partition_key(i)
+        self.members.setdefault(part, {})[i] = None
+        self.part_cells.setdefault((part,)+key, {})[i] = None
+        if self.part_spots is not None: self._add_spot(i, part)
+
+    def remove(self, i):
+        """
+        Removes an individual from the index and from its partition
+
+        Parameters
+        ----------
+            i : Species
+                Individual to remove
+        """
+
+        key = self.cell_of.get(i)
+        if key is None: return
+        super().remove(i)
+
+        part = self.part_of.pop(i)
+        members = self.members[part]
+        del members[i]
+        if not members: del self.members[part]
+        cell = self.part_cells[(part,)+key]
+        del cell[i]
+        if not cell: del self.part_cells[(part,)+key]
+        if self.part_spots is not None:
+            spot = (part,)+self.spot_of.pop(i)
+            cell = self.part_spots[spot]
+            del cell[i]
+            if not cell: del self.part_spots[spot]
+
+    def move(self, i):
+        """
+        Updates the cell of an individual after a change of location, indexing it if needed
+
+        Parameters
+        ----------
+            i : Species
+                Individual that has moved
+        """
+
+        old_key = self.cell_of.get(i)
+        if old_key is None:
+            self.insert(i)
+            return
+        part = (self.part_of[i],)
+
+        if self.part_spots is not None:
+            old_spot, new_spot = self.spot_of[i], self.spot(i.location)
+            if old_spot != new_spot:
+                cell = self.part_spots[part+old_spot]
+                del cell[i]
+                if not cell: del self.part_spots[part+old_spot]
+                self.spot_of[i] = new_spot
+                self.part_spots.setdefault(part+new_spot, {})[i] = None
+
+        new_key = self.cell(i.location)
+        if old_key == new_key: return
+
+        cell = self.cells[old_key]
+        del cell[i]
+        if not cell: del self.cells[old_key]
+        self.cell_of[i] = new_key
+        self.cells.setdefault(new_key, {})[i] = None
+
+        cell = self.part_cells[part+old_key]
+        del cell[i]
+        if not cell: del self.part_cells[part+old_key]
+        self.part_cells.setdefault(part+new_key, {})[i] = None
+
+    def partition(self, key):
+        """
+        Returns the members of a partition
+
+        Parameters
+        ----------
+            key : tuple
+                Species, gender and habitat codes
+        """
+
+        return self.members.get(key, {}).keys()
+
+    def query_partition(self, key, location, radius):
+        """
+        Yields the members of a partition whose distance to a location is not greater than radius.
+        Only the cells of the partition overlapping the radius are visited.
+
+        Parameters
+        ----------
+            key : tuple
+                Species, gender and habitat codes
+            location : int tuple
+                Centre of the query
+            radius : float
+                Maximum distance to the centre
+        """
+
+        if key not in self.members: return
+        cx, cy = self.cell(location)
+        reach = ceil(radius/self.sq_size)
+        x, y = location
+
+        for kx in range(cx-reach, cx+reach+1):
+            for ky in range(cy-reach, cy+reach+1):
+                cell = self.part_cells.get((key, kx, ky))
+                if cell is None: continue
+                for j in cell:
+                    if sqrt((j.location[0]-x)**2+(j.location[1]-y)**2) <= radius: yield j
+
+    def nearest(self, keys, location, radius):
+        """
+        Returns the nearest member of some partitions whose distance to a location is not greater
+        than radius, the first one found on ties, or None. Cells are visited from the nearest one,
+        until the rest are further than the best member found; with more than DENSE members
+        within reach, the same is done with the spots, so that crowded cells are not scanned whole.
+
+        Parameters
+        ----------
+            keys : tuple list
+                Species, gender and habitat codes of each partition
+            location : int tuple
+                Centre of the query
+            radius : float
+                Maximum distance to the centre
+        """
+
+        keys = [key for key in keys if key in self.members]
+        if not keys: return None
+        x, y = location
+
+        # Cells of each partition within reach, with the least squared distance to them
+        cx, cy = self.cell(location)
+        reach = ceil(radius/self.sq_size)
+        s = self.sq_size
+        part_cells = self.part_cells
+        cells = []
+        found = 0
+        for kx in range(cx-reach, cx+reach+1):
+            gx = max(kx*s - x, x - (kx+1)*s, 0)
+            for ky in range(cy-reach, cy+reach+1):
+                gy = max(ky*s - y, y - (ky+1)*s, 0)
+                for key in keys:
+                    cell = part_cells.get((key, kx, ky))
+                    if cell:
+                        cells.append((gx*gx + gy*gy, cell))
+                        found += len(cell)
+
+        best, best_d = None, radius*radius
+
+        # Spots within reach of crowded places, by their least squared distance
+        if found > DENSE:
+            if self.part_spots is None:
+                self.part_spots = {}
+                for i, part in self.part_of.items(): self._add_spot(i, part)
+            spots = self.part_spots
+            sx, sy = self.spot(location)
+
+            # Nothing is nearer than a member on the same location
+            for key in keys:
+                for j in spots.get((key, sx, sy), ()):
+                    if j.location[0] == x and j.location[1] == y: return j
+
+            for gap, dx, dy in self._ring(ceil(radius/self.spot_size)):
+                if gap > best_d: break
+                for key in keys:
+                    cell = spots.get((key, sx+dx, sy+dy))
+                    if cell is None: continue
+                    for j in cell:
+                        jx, jy = j.location
+                        d = (jx-x)*(jx-x) + (jy-y)*(jy-y)
+                        if d < best_d or (d == best_d and best is None): best, best_d = j, d
+            return best
+
+        cells.sort(key = lambda c: c[0])
+        for gap, cell in cells:
+            if gap > best_d: break
+            for j in cell:
+                jx, jy = j.location
+                d = (jx-x)*(jx-x) + (jy-y)*(jy-y)
+                if d < best_d or (d == best_d and best is None): best, best_d = j, d
+        return best
+
+    def _ring(self, reach):
+        """
+        Returns the spot offsets within reach, with a lower bound of the squared distance from any point
+        of the centre spot to them, sorted by that bound
+
+        Parameters
+        ----------
+            reach : int
+                Maximum offset in each axis
+        """
+
+        ring = self._rings.get(reach)
+        if ring is None:
+            s = self.spot_size
+            ring = self._rings[reach] = sorted(((max(abs(dx)-1, 0)*s)**2 + (max(abs(dy)-1, 0)*s)**2, dx, dy)
+                                               for dx in range(-reach, reach+1) for dy in range(-reach, reach+1))
+        return ring
@@ -6,8 +6,11 @@ Created on 13 oct 2022
 '''
 
 # Imports
-import random
-from math import ceil
+from graphics import habitat
+from graphics import rng
+from graphics import world_gen as wg
+from collections import deque
+from math import sqrt
 
 # Global variables
 tax_first = open("tax_first.txt", "r")
@@ -16,7 +19,19 @@ names1 = tax_first.read().split("\n")
 names2 = tax_sec.read().split("\n")
 genders = ["Male", "Female"]
 types = ["Terrestrial", "Aquatic"]
+## Taxonomy: name of each species ID (None once extinct), ID of each name in use,
+## names not in use in allocation order (shuffled on first use) and IDs of extinct species
 species = []
+species_ids = {}
+free_names = None
+free_ids = []
+## Codes of genders and types (their index in the lists above)
+MALE = 0
+FEMALE = 1
+TERRESTRIAL = 0
+AQUATIC = 1
+## Identifier of the next individual
+next_id = 0
 
 tax_first.close()
 tax_sec.close()
@@ -26,7 +41,7 @@ def set_position(s_type, n_squares, sq_size, bg_mat, prev_pos = None):
     Creates a new position or modifies a previous one for an individual
     
         Parameters:
-            s_type (str): Type of individual based on his habitat
+            s_type (int): Type code of individual based on his habitat
             n_squares (int): Tiles of each side of the world
             sq_size (int): Size of squares
             bg_mat (int 2d array): Numerical info of the world
@@ -36,88 +51,157 @@ def set_position(s_type, n_squares, sq_size, bg_mat, prev_pos = None):
             New position in form of a two element tuple
     """
     
+    habitat_map = habitat.get_map(bg_mat, n_squares, sq_size)
+    
     # First position of specimen case
-    if prev_pos is None:
-        x = random.randint(0, n_squares*sq_size-1)
-        y = random.randint(0, n_squares*sq_size-1)
-                
-        # Detect habitat borders
-        if s_type == "Terrestrial":
-            while bg_mat[ceil(x/sq_size)-1][ceil(y/sq_size)-1] == 2:
-                x = random.randint(0, n_squares*sq_size-1)
-                y = random.randint(0, n_squares*sq_size-1)
-        elif s_type == "Aquatic":
-            while bg_mat[ceil(x/sq_size)-1][ceil(y/sq_size)-1] != 2:
-                x = random.randint(0, n_squares*sq_size-1)
-                y = random.randint(0, n_squares*sq_size-1)
+    if prev_pos is None: return habitat_map.place(s_type)
     
     # First position of normal individuals or walking case
-    else:
-        max_move_frwd = round(sq_size*0.5)
-        max_move_bkwd = round(sq_size*-0.5)
-        x = prev_pos[0] + random.randint(max_move_bkwd, max_move_frwd)
-        y = prev_pos[1] + random.randint(max_move_bkwd, max_move_frwd)
-        
-        # Check window limits
-        if x > n_squares*sq_size: x = n_squares*sq_size
-        if y > n_squares*sq_size: y = n_squares*sq_size
-        if x < 0: x = 0
-        if y < 0: y = 0
-                
-        # Detect habitat borders
-        if s_type == "Terrestrial":
-            while bg_mat[ceil(x/sq_size)-1][ceil(y/sq_size)-1] == 2:
-                x = prev_pos[0] + random.randint(max_move_bkwd, max_move_frwd)
-                y = prev_pos[1] + random.randint(max_move_bkwd, max_move_frwd)
-                
-                # Check window limits
-                if x > n_squares*sq_size: x = n_squares*sq_size
-                if y > n_squares*sq_size: y = n_squares*sq_size
-                if x < 0: x = 0
-                if y < 0: y = 0
-        elif s_type == "Aquatic":
-            while bg_mat[ceil(x/sq_size)-1][ceil(y/sq_size)-1] != 2:
-                x = prev_pos[0] + random.randint(max_move_bkwd, max_move_frwd)
-                y = prev_pos[1] + random.randint(max_move_bkwd, max_move_frwd)
-                
-                # Check window limits
-                if x > n_squares*sq_size: x = n_squares*sq_size
-                if y > n_squares*sq_size: y = n_squares*sq_size
-                if x < 0: x = 0
-                if y < 0: y = 0
+    return habitat_map.step(s_type, prev_pos)
+
+def name_pool():
+    """
+    Returns the names not in use, shuffling every unique name on the first call
+    after a reset of the taxonomy
             
-    return (x, y)
+        Returns:
+            free_names (deque of str): Names in allocation order
+    """
+    
+    global free_names
+    
+    if free_names is None:
+        unique = list(dict.fromkeys(n1 + n2 for n1 in names1 for n2 in names2))
+        order = rng.get("species").generator.permutation(len(unique)).tolist()
+        free_names = deque(unique[k] for k in order if unique[k] not in species_ids)
+    return free_names
 
 def create_tax_name():
     """
-    Creates a new taxonomical name for a species
+    Creates a new taxonomical name for a species, taking the next one of the pool
             
         Returns:
-            tax_name (str): Taxonomical name
+            tax_name (str): Taxonomical name, None if every name is in use
     """
     
-    # Check limit of possible unique names (44*44 = 1936)
-    if len(species) == 1936:
+    pool = name_pool()
+    
+    # Check limit of unique names in use at the same time
+    if not pool:
         print("ATTENTION: You have reached the limit of species.")
-    else:
-        tax_name = names1[random.randint(0, len(names1)-1)] + names2[random.randint(0, len(names2)-1)]
-        
-        # Check that the name is unique
-        while tax_name in species:
-            tax_name = names1[random.randint(0, len(names1)-1)] + names2[random.randint(0, len(names2)-1)]
-        
-        species.append(tax_name)
-        return tax_name
+        return None
+    return pool.popleft()
+
+def create_species():
+    """
+    Registers a new species with a new taxonomical name
+            
+        Returns:
+            species_id (int): Identifier of the species, None if every name is in use
+    """
+    
+    tax_name = create_tax_name()
+    if tax_name is None: return None
+    
+    species_id = free_ids.pop() if free_ids else len(species)
+    if species_id == len(species): species.append(tax_name)
+    else: species[species_id] = tax_name
+    species_ids[tax_name] = species_id
+    return species_id
+
+def release_species(species_id):
+    """
+    Unregisters an extinct species. Its name goes back to the end of the pool
+    and its identifier is reused by the next new species.
+    
+        Parameters:
+            species_id (int): Identifier of the species
+    """
+    
+    tax_name = species[species_id]
+    if tax_name is None: return
+    
+    species[species_id] = None
+    del species_ids[tax_name]
+    name_pool().append(tax_name)
+    free_ids.append(species_id)
+
+def names_left():
+    """
+    Returns the number of taxonomical names not in use
+    """
+    
+    return len(name_pool())
+
+def reset_taxonomy():
+    """
+    Forgets every species, so the pool is shuffled again from the current species stream
+    """
+    
+    global free_names
+    
+    species.clear()
+    species_ids.clear()
+    free_ids.clear()
+    free_names = None
+
+def restore_taxonomy(names, pool, ids):
+    """
+    Restores a taxonomy saved from species, free_names and free_ids
+    
+        Parameters:
+            names (str list): Name of each species ID, None for the extinct ones
+            pool (str list): Names not in use in allocation order, None if not shuffled yet
+            ids (int list): Identifiers of extinct species
+    """
+    
+    global free_names
+    
+    species[:] = names
+    species_ids.clear()
+    species_ids.update((name, k) for k, name in enumerate(names) if name is not None)
+    free_names = None if pool is None else deque(pool)
+    free_ids[:] = ids
+
+def camouflage(colour):
+    """
+    Calculates the colour distance of a colour to each biome
+    
+        Parameters:
+            colour (int tuple): Colour of the individual
+            
+        Returns:
+            cammo (float tuple): Euclidean distance to the RGB value of each biome code
+    """
+    
+    return tuple(sqrt((colour[0]-b[0])**2+(colour[1]-b[1])**2+(colour[2]-b[2])**2) for b in wg.RGBs)
+
+def new_id(n = 1):
+    """
+    Reserves new unique identifiers for individuals
+    
+        Parameters:
+            n (int): Number of consecutive identifiers to reserve
+            
+        Returns:
+            ind_id (int): First identifier reserved
+    """
+    
+    global next_id
+    
+    ind_id = next_id
+    next_id += n
+    return ind_id
 
 def get_species_names():
     """
-    Returns the list of species
+    Returns the list of species in use
             
         Returns:
             species (str list): List of species names
     """
     
-    return species
+    return list(species_ids)
 
 class Species:
     """
@@ -131,8 +215,8 @@ class Species:
                 Life expectancy
             age : int
                 Days alive
-            gender : str
-                Gender of the individual
+            gender : int
+                Gender code of the individual
             childhood : int
                 Duration of childhood
             gestation_days : int
@@ -143,8 +227,8 @@ class Species:
                 Size of embryos
             offspring_number : int
                 Number of embryos
-            s_type : str
-                Individual type based on its habitat
+            s_type : int
+                Individual type code based on its habitat
             colour : int tuple
                 Colour of the individual
             size : float
@@ -155,16 +239,35 @@ class Species:
                 Size of hatchling during its childhood
             growth : float
                 Size growth between days
-            mother : Species
-                Mother object of the individual if exists
+            mother_id : int
+                Identifier of the mother of the individual if exists
+            id : int
+                Unique identifier of the individual
+            cammo : float tuple
+                Colour distance to each biome, shared with the relatives of the same colour
+            tile : int tuple
+                Tile of the location of the individual
+            habitat : int
+                Biome of its tile
+            species_id : int
+                Identifier of the species of the individual
+            name : str
+                Taxonomical name of the species of the individual
         
 
         Methods
         -------
-            update_pos(n_squares, sq_size, bg_mat):
+            update_pos(n_squares, sq_size, bg_mat, grid):
                 Sets a new position for the individual near the previous one
+            locate(sq_size, bg_mat):
+                Updates the tile and the biome of the individual after a change of location
     """
     
+    # Fixed attribute storage: no per-instance __dict__
+    __slots__ = ("id", "species_id", "s_type", "colour", "size", "location", "old_age_death", "childhood", "age",
+                 "childhood_size", "growth", "mother_id", "offspring_size", "offspring_number", "gestation_period",
+                 "death_prob", "gender", "gestation_days", "cammo", "tile", "habitat")
+    
     def __init__(self, n_squares, sq_size, bg_mat, specimen = None, mother = None):
         """
         Initializes all the attributes for the species object.
@@ -178,81 +281,97 @@ class Species:
             bg_mat : int 2d array
                 Numerical info of the world
             specimen : Species
-                Specimen to imitate its properties if needed
+                Specimen to imitate its properties if needed, or father of an offspring
+            mother : Species
+                Mother of an offspring
         """
         
+        self.id = new_id()
+        r = rng.get("species") if mother is None else rng.get("reproduction")
+        
         # Specimen attributes
         if specimen is None:
-            self.name = create_tax_name()
-            self.s_type = types[random.randint(0,1)]
-            self.colour = list(random.sample(range(0, 255), 3))
-            self.size = random.uniform(0, sq_size*0.4) 
+            self.species_id = create_species()
+            self.s_type = r.randint(0,1)
+            self.colour = tuple(r.sample(255, 3))
+            self.cammo = camouflage(self.colour)
+            self.size = r.uniform(0, sq_size*0.4) 
             self.location = set_position(self.s_type, n_squares, sq_size, bg_mat)
-            self.old_age_death = random.randint(60,365)
-            self.childhood = round(random.uniform(0.1,0.5) * self.old_age_death)+1
-            self.age = random.randint(self.childhood, self.old_age_death)
-            self.childhood_size = random.uniform(0.1, self.size*0.4)
+            self.old_age_death = r.randint(60,365)
+            self.childhood = round(r.uniform(0.1,0.5) * self.old_age_death)+1
+            self.age = r.randint(self.childhood, self.old_age_death)
+            self.childhood_size = r.uniform(0.1, self.size*0.4)
             self.growth = (self.size-self.childhood_size)/self.childhood
-            self.mother = None
-            self.offspring_size = random.uniform(0.1, 0.4)*self.size
-            self.offspring_number = random.randint(1, round(self.size*0.4/self.offspring_size)+1)
-            self.gestation_period = round(random.uniform(0.1, 0.3) * self.old_age_death)
+            self.mother_id = None
+            self.offspring_size = r.uniform(0.1, 0.4)*self.size
+            self.offspring_number = r.randint(1, round(self.size*0.4/self.offspring_size)+1)
+            self.gestation_period = round(r.uniform(0.1, 0.3) * self.old_age_death)
                 
         # Normal individual attributes
         elif specimen is not None and mother is None :
-            self.name = specimen.name
+            self.species_id = specimen.species_id
             self.s_type = specimen.s_type
             self.colour = specimen.colour
+            self.cammo = specimen.cammo
             self.location = set_position(self.s_type, n_squares, sq_size, bg_mat, specimen.location)
             self.old_age_death = specimen.old_age_death
-            self.mother = None
-            self.size = specimen.size + random.uniform(-specimen.size*0.1, specimen.size*0.1)
+            self.mother_id = None
+            self.size = specimen.size + r.uniform(-specimen.size*0.1, specimen.size*0.1)
             self.childhood = specimen.childhood
-            self.age = random.randint(self.childhood, self.old_age_death)
-            self.childhood_size = random.uniform(0.1, self.size*0.4)
+            self.age = r.randint(self.childhood, self.old_age_death)
+            self.childhood_size = r.uniform(0.1, self.size*0.4)
             self.growth = (self.size-self.childhood_size)/self.childhood
-            self.offspring_size = random.uniform(0.1, 0.4)*self.size
-            self.offspring_number = random.randint(1, round(self.size*0.4/self.offspring_size)+1)
-            self.gestation_period = round(random.uniform(0.1, 0.3) * self.old_age_death)
+            self.offspring_size = r.uniform(0.1, 0.4)*self.size
+            self.offspring_number = r.randint(1, round(self.size*0.4/self.offspring_size)+1)
+            self.gestation_period = round(r.uniform(0.1, 0.3) * self.old_age_death)
         
         # Offspring attributes
         else:
             mutation_prob = 0.1
             
             fathers = [specimen, mother]
-            self.name = mother.name
+            self.species_id = mother.species_id
             self.age = 0
-            self.s_type = fathers[random.randint(0,1)].s_type
+            self.s_type = fathers[r.randint(0,1)].s_type
             self.location = mother.location
-            self.old_age_death = fathers[random.randint(0,1)].old_age_death + random.randint(-30,30)
-            self.mother = mother
+            self.old_age_death = fathers[r.randint(0,1)].old_age_death + r.randint(-30,30)
+            self.mother_id = mother.id
             self.childhood_size = mother.offspring_size
             
             # Possible mutations
-            if random.uniform(0,1) <= mutation_prob: self.colour = list(random.sample(range(0, 255), 3))
-            else: self.colour = fathers[random.randint(0,1)].colour
-            if random.uniform(0,1) <= mutation_prob: self.size = random.uniform(0, sq_size*0.4) 
-            else: self.size = fathers[random.randint(0,1)].size
-            if random.uniform(0,1) <= mutation_prob: self.offspring_size = random.uniform(0.1, 0.4)*self.size
+            if r.uniform(0,1) <= mutation_prob: 
+                self.colour = tuple(r.sample(255, 3))
+                self.cammo = camouflage(self.colour)
+            else: 
+                parent = fathers[r.randint(0,1)]
+                self.colour = parent.colour
+                self.cammo = parent.cammo
+            if r.uniform(0,1) <= mutation_prob: self.size = r.uniform(0, sq_size*0.4) 
+            else: self.size = fathers[r.randint(0,1)].size
+            if r.uniform(0,1) <= mutation_prob: self.offspring_size = r.uniform(0.1, 0.4)*self.size
             else: self.offspring_size = mother.offspring_size
-            if random.uniform(0,1) <= mutation_prob: self.offspring_number = random.randint(1, round(self.size*0.4/self.offspring_size)+1)
+            if r.uniform(0,1) <= mutation_prob: self.offspring_number = r.randint(1, round(self.size*0.4/self.offspring_size)+1)
             else: self.offspring_number = mother.offspring_number
-            if random.uniform(0,1) <= mutation_prob: self.gestation_period = round(random.uniform(0.1, 0.3) * self.old_age_death)
+            if r.uniform(0,1) <= mutation_prob: self.gestation_period = round(r.uniform(0.1, 0.3) * self.old_age_death)
             else: self.gestation_period = mother.gestation_period
-            if random.uniform(0,1) <= mutation_prob: self.childhood = round(random.uniform(0.1,0.5) * self.old_age_death)+1
-            else: self.childhood = fathers[random.randint(0,1)].childhood
+            if r.uniform(0,1) <= mutation_prob: self.childhood = round(r.uniform(0.1,0.5) * self.old_age_death)+1
+            else: self.childhood = fathers[r.randint(0,1)].childhood
             
-            
-            self.growth = (self.size-self.childhood_size)/self.childhood
+            # Inherited life expectancy can drift low enough to leave no childhood at all
+            if self.childhood > 0: self.growth = (self.size-self.childhood_size)/self.childhood
+            else: self.growth = 0.0
         
         # Common attributes
         ## Death
         self.death_prob = 0.0 
         ## Reproduction
-        self.gender = genders[random.randint(0,1)]
+        self.gender = r.randint(0,1)
         self.gestation_days = 0     
+        ## Habitat
+        self.tile = None
+        self.locate(sq_size, bg_mat)
                     
-    def update_pos(self, n_squares, sq_size, bg_mat):
+    def update_pos(self, n_squares, sq_size, bg_mat, grid = None):
         """
         Sets a new position for the individual near the previous one 
 
@@ -264,7 +383,37 @@ class Species:
                 Size of squares
             bg_mat : int 2d array
                 Numerical info of the world
+            grid : SpatialGrid
+                Spatial index to keep up to date with the new position
         """
         
         self.location = set_position(self.s_type, n_squares, sq_size, bg_mat, self.location)
-    
\ No newline at end of file
+        self.locate(sq_size, bg_mat)
+        if grid is not None: grid.move(self)
+        
+    def locate(self, sq_size, bg_mat):
+        """
+        Updates the tile of the individual, and its biome only when the tile has changed.
+        Pixel v belongs to tile ceil(v/sq_size)-1, so pixel 0 belongs to the last tile.
+
+        Parameters
+        ----------
+            sq_size : int
+                Size of squares
+            bg_mat : int 2d array
+                Numerical info of the world
+        """
+        
+        x, y = self.location
+        tile = ((x+sq_size-1)//sq_size-1, (y+sq_size-1)//sq_size-1)
+        if tile != self.tile:
+            self.tile = tile
+            self.habitat = int(bg_mat[tile[0]][tile[1]])
+    
+    @property
+    def name(self):
+        """
+        Returns the taxonomical name of the species of the individual
+        """
+        
+        return species[self.species_id]
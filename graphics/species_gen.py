@@ -7,9 +7,13 @@ Created on 13 oct 2022
 
 # Imports
 from graphics import species
-import numpy as np
-import pygame as pg
-from math import sqrt, ceil
+from graphics import species_stats
+from graphics import lifecycle
+from graphics import rng
+from graphics import profiler
+from graphics.spatial_grid import SpatialGrid, PartitionedGrid
+from math import sqrt
+from time import perf_counter
 
 # Biome RGB Values
 GRASS = 0
@@ -17,8 +21,30 @@ SAND = 1
 WATER = 2
 RGBs = [(0,175,0), (255,204,153), (0,102,204)]
 
+# Death probabilities
+CHILD_PROB = 0.0001
+OLD_PROB = 0.5
+SIZE_PROB = 0.001
+CAMMO_PROB = 0.0001
+RES_TERR_PROB = 0.4
+
+# Causes of death (dominant term of the death probability)
+AGE = 0
+CROWDING = 1
+CAMOUFLAGE = 2
+CAUSES = ["age", "crowding", "camouflage"]
+
 # Global variables
-embryos = []
+## Embryos in gestation of each mother
+pregnancies = {}
+## Pre-rasterised circle of each (colour, radius)
+sprites = {}
+MAX_SPRITES = 4096
+COLOUR_KEY = (255, 0, 255)
+
+# Index of the list of individuals last updated, kept to draw only the ones under a camera
+view_grid = None
+view_list = None
 
 def euclidean_dist(p1, p2):
     """
@@ -47,6 +73,11 @@ def gen_individuals(n_squares, sq_size, bg_mat, ind_list, n_ind):
             n_ind (int): Number of individuals to generate
     """
     
+    # Check that a taxonomical name is available
+    if not species.names_left():
+        print("ATTENTION: You have reached the limit of species.")
+        return
+    
     # Generate the specimen
     specimen = species.Species(n_squares, sq_size, bg_mat)
     ind_list.append(specimen)
@@ -56,91 +87,252 @@ def gen_individuals(n_squares, sq_size, bg_mat, ind_list, n_ind):
         i = species.Species(n_squares, sq_size, bg_mat, specimen)
         ind_list.append(i)        
     
-def display_individuals(ind_list, scr):
+def get_sprite(colour, radius):
+    """
+    Returns the cached image of a circle with a black border
+    
+        Parameters:
+            colour (int tuple): Colour of the circle
+            radius (int): Radius of the circle in pixels
+        
+        Returns:
+            Pygame surface of side 2*radius+1, transparent outside the circle
+    """
+    
+    key = (colour, radius)
+    sprite = sprites.get(key)
+    if sprite is None:
+        import pygame as pg                                                             # Only the drawing needs Pygame
+        if len(sprites) >= MAX_SPRITES: sprites.clear()
+        sprite = pg.Surface((2*radius+1, 2*radius+1))
+        sprite.fill(COLOUR_KEY)
+        pg.draw.circle(sprite, colour, (radius, radius), radius)
+        pg.draw.circle(sprite, (0,0,0), (radius, radius), radius, 2)
+        sprite.set_colorkey(COLOUR_KEY, pg.RLEACCEL)
+        sprites[key] = sprite
+    return sprite
+
+def display_individuals(ind_list, scr, camera = None):
     """
-    Display each individual as a circle on screen
+    Display each individual as a circle on screen. The circles are cached sprites
+    blitted in one batch, with the same pixels as drawing them with pg.draw.circle.
+    With a camera, only the individuals around its view are visited, scaled by its zoom.
     
         Parameters:
             ind_list (list of Species): List of the individuals
             scr: Screen display of Pygame
+            camera (Camera): Camera of the view, the whole world unscaled if None
+        
+        Returns:
+            rects (list of Rect): Areas of the screen that have been drawn
     """
     
-    for i in ind_list:
-        if i.age <= i.childhood:
-            pg.draw.circle(scr, i.colour, (i.location[0]-i.childhood_size/2, i.location[1]-i.childhood_size/2), i.childhood_size)
-            pg.draw.circle(scr, (0,0,0), (i.location[0]-i.childhood_size/2, i.location[1]-i.childhood_size/2), i.childhood_size, 2)
-        else:
-            pg.draw.circle(scr, i.colour, (i.location[0]-i.size/2, i.location[1]-i.size/2), i.size)
-            pg.draw.circle(scr, (0,0,0), (i.location[0]-i.size/2, i.location[1]-i.size/2), i.size, 2)
+    global view_grid, view_list
+    
+    batch = []
+    cached = sprites.get
+    zoom, ox, oy = (camera.zoom, camera.ox, camera.oy) if camera is not None else (1, 0, 0)
+    
+    # Populations stored as arrays compute the sprite positions at once
+    render_data = getattr(ind_list, "render_data", None)
+    if render_data is not None:
+        view = camera.view_size if camera is not None else None
+        for colour, radius, corner in render_data(zoom, (ox, oy), view):
+            batch.append((cached((colour, radius)) or get_sprite(colour, radius), corner))
+        return scr.blits(batch)
+    
+    # Individuals near the view, from the index of the last update if it is still valid
+    visible = ind_list
+    if camera is not None:
+        if view_list is not ind_list or view_grid is None or len(view_grid.cell_of) != len(ind_list):
+            view_grid = SpatialGrid(camera.sq_size, ind_list)
+            view_list = ind_list
+        visible = view_grid.query_rect(*camera.visible_rect())
+    
+    for i in visible:
+        size = i.childhood_size if i.age <= i.childhood else i.size
+        radius = int(size*zoom)
+        if radius < 1: continue
+        colour = i.colour
+        location = i.location
+        batch.append((cached((colour, radius)) or get_sprite(colour, radius), 
+                      (int((location[0]-size/2)*zoom)-ox-radius, int((location[1]-size/2)*zoom)-oy-radius)))
+    
+    return scr.blits(batch)
         
-def update_individuals(ind_list, n_squares, sq_size, bg_mat):
+def update_individuals(ind_list, n_squares, sq_size, bg_mat, telemetry = None, halo = ()):
     """
-    Updates individual info for the following day
+    Updates individual info for the following day. Every individual alive at the start
+    of the day is updated once, in list order; the dead are removed and the newborns
+    are appended at the end of the day. Halo individuals are neighbours simulated
+    elsewhere: they can be mates and count for crowding, but they are not updated.
     
         Parameters:
             ind_list (list of Species): List of the individuals
             n_squares (int): Tiles of each side of the world
             sq_size (int): Size of squares
             bg_mat (int 2d array): Numerical info of the world
+            telemetry (Telemetry): Recorder of the daily statistics, if any
+            halo (list of Species): Copies of the individuals of other regions near this one
     """
     
+    global view_grid, view_list
+    
+    # Populations stored as arrays are updated in a single vectorized pass
+    step = getattr(ind_list, "step", None)
+    if step is not None:
+        step(n_squares, sq_size, bg_mat, telemetry)
+        return
+    
+    # Wall time of each phase, measured only when profiling
+    prof = profiler.active
+    if prof: 
+        start = perf_counter()
+        walk_time = mate_time = death_time = 0.0
+    
+    # Index the population by tiles, and by species, gender and habitat,
+    # so that only nearby individuals (of the right partition) are checked
+    grid = PartitionedGrid(sq_size, ind_list)
+    
+    # Free the embryos of mothers removed from the list outside this function
+    for m in [m for m in pregnancies if m not in grid.cell_of]: del pregnancies[m]
+    for h in halo: grid.insert(h)
+    
+    # Species statistics, aged in advance for every individual updated today, and calendar of events
+    stats = species_stats.get_stats(ind_list)
+    stats.tick()
+    life = lifecycle.get_lifecycle(ind_list)
+    
+    # Deaths and births of the day, applied once every individual has been updated
+    dead = set()
+    newborns = []
+    deaths = [0]*len(CAUSES)
+    death_rng = rng.get("death")
+    searches = 0
+    if prof: 
+        t0 = perf_counter()
+        prof.add("index", t0 - start)
+    
+    # Growing up, deliveries and comings of age due today. Each one only changes its own
+    # individual, so applying them before the walks gives the same day as checking each
+    # individual in its turn. Children grow on the day they come of age too.
+    for c in life.growing: c.childhood_size += c.growth
+    for kind, i in life.advance():
+        if kind == lifecycle.DELIVERY:
+            newborns.extend(pregnancies.pop(i, ()))
+            i.gestation_days = 0
+        else: stats.come_of_age(i)
+    if prof: conception_time = perf_counter() - t0
+    
     for i in ind_list:
-        # Growing up
+        if prof: t0 = perf_counter()
+        # Ageing
         i.age += 1
-        if i.age <= i.childhood: i.childhood_size += i.growth
         # Walking
-        i.update_pos(n_squares, sq_size, bg_mat)
-        # Conception
-        if i.gender == "Female" and i.gestation_days == i.gestation_period:
-            for _ in range(i.offspring_number):
-                for e in embryos:
-                    if e.mother == i: ind_list.append(e)
-            i.gestation_days = 0
+        i.update_pos(n_squares, sq_size, bg_mat, grid)
+        if prof: 
+            t1 = perf_counter()
+            walk_time += t1 - t0
         # Reproduction
-        if i.gender == "Female" and i.age >= i.childhood and i.gestation_days == 0:
-            for j in ind_list:
-                if j.name == i.name and j.gender == "Male" and euclidean_dist(j.location, i.location) <= sq_size:
-                    i.gestation_days += 1
-                    for _ in range(i.offspring_number):
-                        embryos.append(species.Species(n_squares, sq_size, bg_mat, j, i))
-                    break
+        if i.gender == species.FEMALE and i.age >= i.childhood and i.gestation_days == 0:
+            searches += 1
+            j = grid.nearest([(i.species_id, species.MALE, s_type) for s_type in (species.TERRESTRIAL, species.AQUATIC)],
+                             i.location, sq_size)
+            if j is not None:
+                i.gestation_days += 1
+                pregnancies[i] = [species.Species(n_squares, sq_size, bg_mat, j, i) for _ in range(i.offspring_number)]
         # Pregnancy
-        if i.gestation_days > 0: i.gestation_days += 1
+        if i.gestation_days > 0: 
+            i.gestation_days += 1
+            if i.gestation_days == 2: life.conceive(i)                                 # Conceived today
+        if prof:
+            t2 = perf_counter()
+            mate_time += t2 - t1
         # Death
-        calculate_death_prob(i, bg_mat, sq_size, ind_list)
-        if i.death_prob*100 >= np.random.choice(100)+1: ind_list.remove(i)
+        cause = calculate_death_prob(i, bg_mat, sq_size, ind_list, grid)
+        if i.death_prob*100 >= death_rng.randint(1, 100): 
+            dead.add(i)
+            deaths[cause] += 1
+            grid.remove(i)
+            pregnancies.pop(i, None)
+            stats.remove(i)
+            life.remove(i)
+        if prof: death_time += perf_counter() - t2
+    
+    # Remove the dead and add the newborns in a single pass
+    if prof: t0 = perf_counter()
+    ind_list[:] = [i for i in ind_list if i not in dead] + newborns
+    for e in newborns: 
+        stats.add(e)
+        life.add(e)
+        grid.insert(e)
+    
+    # Release the names of the species extinct today
+    for s in stats.extinct:
+        if s not in stats.totals: species.release_species(s)
+    stats.extinct.clear()
+    
+    # Keep the index to draw the individuals under a camera
+    view_grid = grid
+    view_list = ind_list
+    if prof: t1 = perf_counter()
+    
+    if telemetry is not None: telemetry.record(ind_list, len(newborns), deaths)
+    
+    if prof:
+        for name, value in (("walk", walk_time), ("conception", conception_time), ("mate_search", mate_time), ("death", death_time),
+                            ("apply", t1 - t0), ("telemetry", perf_counter() - t1), ("mate_searches", searches),
+                            ("births", len(newborns)), ("deaths", len(dead)), ("total", perf_counter() - start)):
+            prof.add(name, value)
+        prof.end_day(len(ind_list))
                             
     
-def calculate_death_prob(i, bg_mat, sq_size, ind_list):
-    # Define probabilities
+def calculate_death_prob(i, bg_mat, sq_size, ind_list, grid = None):
+    """
+    Calculates the probability of death of an individual for the current day
+    
+        Parameters:
+            i (Species): Individual to evaluate
+            bg_mat (int 2d array): Numerical info of the world
+            sq_size (int): Size of squares
+            ind_list (list of Species): List of the individuals
+            grid (SpatialGrid): Spatial index of the individuals, if available
+        
+        Returns:
+            cause (int): Cause with the largest contribution to the probability
+    """
+    
     death_prob = 0.0
-    child_prob = 0.0001
-    old_prob = 0.5
-    size_prob = 0.001
-    cammo_prob = 0.0001
-    res_terr_prob = 0.4
         
     # Age
-    if i.age <= i.childhood: death_prob += child_prob  
-    elif i.age >= i.old_age_death: death_prob += old_prob  
+    if i.age <= i.childhood: age_prob = CHILD_PROB  
+    elif i.age >= i.old_age_death: age_prob = OLD_PROB  
+    else: age_prob = 0.0
+    death_prob += age_prob
     # Size
-    if i.age <= i.childhood: death_prob -= i.childhood_size*size_prob
+    if i.age <= i.childhood: death_prob -= i.childhood_size*SIZE_PROB
     else:
-        if i.size > 0: death_prob -= i.size*size_prob
-    # Camouflage
-    habitat = bg_mat[ceil(i.location[0]/sq_size)-1][ceil(i.location[1]/sq_size)-1]
-    cammo_diff = euclidean_dist(i.colour, RGBs[habitat])
-    death_prob += cammo_diff*cammo_prob
+        if i.size > 0: death_prob -= i.size*SIZE_PROB
+    # Camouflage, from the colour distances and the biome cached by the individual
+    cammo_prob = i.cammo[i.habitat]*CAMMO_PROB
+    death_prob += cammo_prob
     # Resources + Territory
+    crowd_prob = 0.0
     nearby_i = 0
-    for j in ind_list:
-        if euclidean_dist(i.location, j.location) <= 3*sq_size: nearby_i+= 1
+    if grid is not None: neighbours = grid.query(i.location, 3*sq_size)
+    else: neighbours = (j for j in ind_list if euclidean_dist(i.location, j.location) <= 3*sq_size)
+    for _ in neighbours:
+        nearby_i += 1
         if nearby_i >= 20: 
-            death_prob += res_terr_prob   
+            crowd_prob = RES_TERR_PROB
+            death_prob += crowd_prob   
             break   
     
     # Update probability
     i.death_prob = death_prob
+    
+    if age_prob >= crowd_prob and age_prob >= cammo_prob: return AGE
+    return CROWDING if crowd_prob >= cammo_prob else CAMOUFLAGE
 
 
 
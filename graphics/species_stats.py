@@ -0,0 +1,286 @@
+'''
+Created on 18 oct 2026
+
+@desc: Running per-species statistics of the population
+@author: Alejandro R. Lopez
+'''
+
+# Imports
+from graphics import species
+import numpy as np
+
+class SpeciesTotals:
+    """
+    A class to represent the running counts and sums of the individuals of one species.
+    Adults are the individuals with age >= childhood, as in the menu.
+    """
+
+    __slots__ = ("count", "females", "children", "old_age_death", "age", "childhood", "gestation_period",
+                 "offspring_size", "offspring_number", "colour", "size", "childhood_size", "growth", "terrestrials", "aquatics")
+
+    def __init__(self):
+        self.count = self.females = self.children = self.terrestrials = self.aquatics = 0
+        self.old_age_death = self.age = self.childhood = self.gestation_period = self.offspring_number = 0
+        self.offspring_size = self.size = self.childhood_size = self.growth = 0.0
+        self.colour = [0, 0, 0]
+
+class SpeciesStats:
+    """
+    A class to represent a registry of running statistics of each species.
+    It is updated on births, deaths and coming of age, so reading the
+    dominant species and its means does not need a pass over the population.
+
+        Attributes
+        ----------
+            ind_list : list of Species
+                List of the registered individuals
+            totals : dict
+                SpeciesTotals of each living species, indexed by species ID
+            count : int
+                Number of registered individuals
+            extinct : int list
+                Species IDs whose last individual has been unregistered
+
+
+        Methods
+        -------
+            add(i):
+                Registers a new individual
+            remove(i):
+                Unregisters a dead individual
+            tick():
+                Ages every registered individual one day, and grows every child
+            come_of_age(i):
+                Registers the end of the childhood of an individual
+            dominant():
+                Returns the species with the largest number of individuals
+            info(species_id):
+                Returns the mean attributes of a species
+    """
+
+    def __init__(self, ind_list = ()):
+        """
+        Initializes the registry with the given individuals.
+
+        Parameters
+        ----------
+            ind_list : list of Species
+                Individuals to register
+        """
+
+        self.ind_list = ind_list
+        self.totals = {}
+        self.count = 0
+        self.extinct = []
+        self._dominant = None
+
+        for i in ind_list: self.add(i)
+
+    def add(self, i, sign = 1):
+        """
+        Registers a new individual
+
+        Parameters
+        ----------
+            i : Species
+                Individual to register
+            sign : int
+                -1 to unregister it instead
+        """
+
+        t = self.totals.get(i.species_id)
+        if t is None: t = self.totals[i.species_id] = SpeciesTotals()
+
+        t.count += sign
+        t.old_age_death += sign*i.old_age_death
+        t.age += sign*i.age
+        t.childhood += sign*i.childhood
+        if i.gender == species.FEMALE:
+            t.females += sign
+            t.gestation_period += sign*i.gestation_period
+            t.offspring_size += sign*i.offspring_size
+            t.offspring_number += sign*i.offspring_number
+        for c in range(3): t.colour[c] += sign*i.colour[c]
+        if i.age >= i.childhood: t.size += sign*i.size
+        else:
+            t.children += sign
+            t.childhood_size += sign*i.childhood_size
+            t.growth += sign*i.growth
+        if i.s_type == species.TERRESTRIAL: t.terrestrials += sign
+        else: t.aquatics += sign
+
+        # Extinction
+        if t.count == 0: 
+            del self.totals[i.species_id]
+            self.extinct.append(i.species_id)
+
+        self.count += sign
+        self._dominant = None
+
+    def remove(self, i):
+        """
+        Unregisters a dead individual, with its current attributes
+
+        Parameters
+        ----------
+            i : Species
+                Individual to unregister
+        """
+
+        self.add(i, -1)
+
+    def tick(self):
+        """
+        Ages every registered individual one day, and grows every child,
+        including those that come of age on this day
+        """
+
+        for t in self.totals.values(): 
+            t.age += t.count
+            t.childhood_size += t.growth
+
+    def come_of_age(self, i):
+        """
+        Registers the end of the childhood of an individual, after its last growth
+
+        Parameters
+        ----------
+            i : Species
+                Individual that becomes an adult
+        """
+
+        t = self.totals[i.species_id]
+        t.children -= 1
+        t.childhood_size -= i.childhood_size
+        t.growth -= i.growth
+        t.size += i.size
+
+    def dominant(self):
+        """
+        Returns the species with the largest number of individuals
+
+        Returns
+        -------
+            dominant : int
+                Species ID of the dominant species, None if there are no individuals
+        """
+
+        if self._dominant is None and self.totals:
+            max_count = 0
+            for species_id, t in self.totals.items():
+                if t.count > max_count:
+                    max_count = t.count
+                    self._dominant = species_id
+        return self._dominant
+
+    def info(self, species_id):
+        """
+        Returns the mean attributes of a species, in the order shown by the menu
+
+        Parameters
+        ----------
+            species_id : int
+                Species ID of the species
+
+        Returns
+        -------
+            info : list
+                List of mean attributes of the species
+        """
+
+        t = self.totals[species_id]
+        n_ind = t.count
+        n_adults = n_ind - t.children
+
+        info = [species.species[species_id],
+                round(t.old_age_death/n_ind/30,2),
+                round(t.age/n_ind/30,2),
+                round(t.childhood/n_ind/30,2)]
+        if t.females > 0:
+            info += [round(t.gestation_period/t.females/30,2), round(t.offspring_size/t.females,2),
+                     round(t.offspring_number/t.females,2)]
+        else: info += [0, 0, 0]
+        info.append(tuple(round(c/n_ind) for c in t.colour))
+        info.append(round(t.size/n_adults,2) if n_adults > 0 else 0)
+        info.append(round(t.childhood_size/t.children,2) if t.children > 0 else 0)
+        info.append(n_ind)
+        info.append("Terrestrial" if t.terrestrials > t.aquatics else "Aquatic")
+
+        return info
+
+    @classmethod
+    def from_columns(cls, cols):
+        """
+        Builds the registry of a population stored as arrays
+
+        Parameters
+        ----------
+            cols : dict
+                Array of each attribute of the population
+
+        Returns
+        -------
+            stats : SpeciesStats
+                Registry of the population
+        """
+
+        stats = cls()
+        code = cols["species_id"]
+        n_species = len(species.species)
+        female = cols["gender"] == species.FEMALE
+        adult = cols["age"] >= cols["childhood"]
+
+        def total(weights = None, mask = None):
+            if mask is None: return np.bincount(code, weights, minlength=n_species)
+            return np.bincount(code[mask], None if weights is None else weights[mask], minlength=n_species)
+
+        sums = {"count": total(), "females": total(mask=female), "children": total(mask=~adult),
+                "old_age_death": total(cols["old_age_death"]), "age": total(cols["age"]),
+                "childhood": total(cols["childhood"]), "gestation_period": total(cols["gestation_period"], female),
+                "offspring_size": total(cols["offspring_size"], female),
+                "offspring_number": total(cols["offspring_number"], female), "size": total(cols["size"], adult),
+                "childhood_size": total(cols["childhood_size"], ~adult), "growth": total(cols["growth"], ~adult),
+                "terrestrials": total(mask=cols["s_type"] == species.TERRESTRIAL),
+                "aquatics": total(mask=cols["s_type"] != species.TERRESTRIAL)}
+        colour = [total(cols["colour"][:, c]) for c in range(3)]
+
+        for k in np.flatnonzero(sums["count"]):
+            t = stats.totals[k.item()] = SpeciesTotals()
+            for field, values in sums.items(): setattr(t, field, values[k].item())
+            t.colour = [colour[c][k].item() for c in range(3)]
+        stats.count = len(code)
+
+        return stats
+
+# Registry of the population updated by species_gen.update_individuals
+registry = SpeciesStats()
+
+def reset():
+    """
+    Forgets the statistics registry, so that it is rebuilt on its next use. Called whenever the
+    individuals of a list are replaced outside update_individuals, e.g. ind_list[:] = other,
+    which get_stats cannot notice if the length does not change
+    """
+
+    global registry
+    registry = SpeciesStats()
+
+def get_stats(ind_list):
+    """
+    Returns the statistics registry of a population, rebuilding it after reset, or if it belongs
+    to another list or individuals have been added or removed outside update_individuals
+
+        Parameters:
+            ind_list (list of Species): List of the individuals
+
+        Returns:
+            SpeciesStats of the population
+    """
+
+    global registry
+
+    species_stats = getattr(ind_list, "species_stats", None)
+    if species_stats is not None: return species_stats()
+
+    if registry.ind_list is not ind_list or registry.count != len(ind_list): registry = SpeciesStats(ind_list)
+    return registry
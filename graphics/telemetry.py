@@ -0,0 +1,263 @@
+'''
+Created on 18 oct 2026
+
+@desc: Daily statistics of a simulation written to append-only columnar files
+@author: Alejandro R. Lopez
+'''
+
+# Imports
+from graphics import species
+from graphics import species_gen as sg
+import numpy as np
+import json
+import operator
+import os
+import queue
+import threading
+
+# Inherited traits summarised for each species
+TRAITS = ["size", "old_age_death", "childhood", "gestation_period", "offspring_size", "offspring_number"]
+PERCENTILES = [10, 50, 90]
+_traits = operator.attrgetter(*TRAITS)
+
+# Columns of each table (name, dtype)
+DAY_COLUMNS = [("day", np.int64), ("population", np.int64), ("species", np.int64), ("births", np.int64)] + \
+              [("deaths_"+cause, np.int64) for cause in sg.CAUSES]
+SPECIES_COLUMNS = [("day", np.int64), ("species", np.int32), ("count", np.int64)] + \
+                  [(t+"_"+stat, np.float64) for t in TRAITS for stat in ["mean"]+["p"+str(p) for p in PERCENTILES]]
+
+class Telemetry:
+    """
+    A class to record the statistics of each day of a simulation.
+    Records are kept in memory and handed in blocks to a background thread, which
+    appends each column to its own binary file, so the simulation never waits for the disk.
+    The files of a column can be read back with numpy.fromfile or with the read function.
+    Each species gets a new code when it appears, so a species whose name is taken again
+    after an extinction is not merged with the extinct one.
+
+        Attributes
+        ----------
+            directory : str
+                Folder of the files
+            day : int
+                Day of the last record
+            flush_days : int
+                Days kept in memory before writing them
+            names : str list
+                Taxonomical name of each species code
+            codes : dict
+                Code of each species alive on the last day, by taxonomical name
+
+
+        Methods
+        -------
+            record(ind_list, births, deaths):
+                Records the state of the population at the end of a day
+            flush():
+                Hands the days kept in memory to the writer
+            close():
+                Writes every pending day and stops the writer
+    """
+
+    def __init__(self, directory, day = 0, flush_days = 1000):
+        """
+        Creates the folder of the files and starts the writer.
+
+        Parameters
+        ----------
+            directory : str
+                Folder of the files, created if needed. Existing files are extended.
+            day : int
+                Day before the first record
+            flush_days : int
+                Days kept in memory before writing them
+        """
+
+        self.directory = directory
+        self.day = day
+        self.flush_days = flush_days
+        self._days = {name: [] for name, _ in DAY_COLUMNS}
+        self._species_ids = []
+        self._species_stats = []
+        self._pending_days = 0
+
+        # Species codes, shared by every run written to the folder. A resumed run keeps
+        # the codes of the species alive on its first day.
+        os.makedirs(directory, exist_ok = True)
+        self._names_path = os.path.join(directory, "species_names.txt")
+        self.names = []
+        self.codes = {}
+        if os.path.exists(self._names_path):
+            with open(self._names_path, "r") as f: self.names = f.read().splitlines()
+            days_path = os.path.join(directory, "species.day.bin")
+            if os.path.exists(days_path):
+                codes = np.fromfile(os.path.join(directory, "species.species.bin"), SPECIES_COLUMNS[1][1])
+                last = codes[np.fromfile(days_path, SPECIES_COLUMNS[0][1]) == day]
+                self.codes = {self.names[k]: k for k in last.tolist()}
+        self._new_names = []
+
+        with open(os.path.join(directory, "schema.json"), "w") as f:
+            json.dump({"days": [[name, np.dtype(dtype).str] for name, dtype in DAY_COLUMNS],
+                       "species": [[name, np.dtype(dtype).str] for name, dtype in SPECIES_COLUMNS]}, f, indent = 1)
+
+        self._queue = queue.Queue()
+        self._writer = threading.Thread(target = self._write, daemon = True)
+        self._writer.start()
+
+    def record(self, ind_list, births, deaths):
+        """
+        Records the state of the population at the end of a day
+
+        Parameters
+        ----------
+            ind_list : list of Species or Population
+                Individuals alive at the end of the day
+            births : int
+                Individuals born during the day
+            deaths : int list
+                Individuals dead during the day by each cause of species_gen.CAUSES
+        """
+
+        self.day += 1
+        code, traits = self._columns(ind_list)
+
+        # Species table, computed for every species at once
+        counts = np.bincount(code, minlength = len(self.names))
+        present = np.flatnonzero(counts)
+        n = counts[present]
+        starts = (np.cumsum(counts) - counts)[present]
+        if len(present):
+            ## Traits sorted inside each species (species codes dominate the sorting key)
+            span = 2*np.abs(traits).max() + 1
+            order = np.argsort(traits + (code*span)[:, None], axis = 0)
+            ranked = np.take_along_axis(traits, order, axis = 0)
+            means = np.add.reduceat(ranked, starts, axis = 0)/n[:, None]
+            ## Linear interpolation between the closest ranks, like numpy.percentile
+            pos = starts[:, None] + (n[:, None]-1)*np.array(PERCENTILES)/100
+            lo = np.floor(pos).astype(np.int64)
+            hi = np.minimum(lo+1, (starts+n-1)[:, None])
+            percentiles = ranked[lo] + (ranked[hi]-ranked[lo])*(pos-lo)[:, :, None]
+            ## One row per species, with the columns of each trait together
+            stats = np.concatenate((means[:, None, :], percentiles), axis = 1).transpose(0, 2, 1)
+            self._species_ids.append(np.column_stack((np.full(len(present), self.day), present, n)))
+            self._species_stats.append(stats.reshape(len(present), -1))
+
+        # Day table
+        row = [self.day, len(code), len(present), births] + list(deaths)
+        for (name, _), value in zip(DAY_COLUMNS, row): self._days[name].append(value)
+
+        self._pending_days += 1
+        if self._pending_days >= self.flush_days: self.flush()
+
+    def _columns(self, ind_list):
+        """
+        Returns the species code and the traits of each individual
+
+        Parameters
+        ----------
+            ind_list : list of Species or Population
+                Individuals to summarise
+
+        Returns
+        -------
+            code : int array
+                Species code of each individual
+            traits : float 2d array
+                Value of each trait (columns) of each individual (rows)
+        """
+
+        cols = getattr(ind_list, "cols", None)
+        if cols is not None:
+            ind_list._flush()
+            species_id = cols["species_id"].astype(np.int64)
+            traits = np.column_stack([cols[t] for t in TRAITS]) if len(species_id) else np.zeros((0, len(TRAITS)))
+        else:
+            species_id = np.fromiter((i.species_id for i in ind_list), np.int64, len(ind_list))
+            traits = np.array(list(map(_traits, ind_list)), np.float64).reshape((-1, len(TRAITS)))
+
+        # Code of each species ID present, new for the species that were not alive on the last day
+        present = np.unique(species_id)
+        remap = np.zeros(present[-1]+1 if len(present) else 1, np.int64)
+        codes = {}
+        for k in present.tolist():
+            name = species.species[k]
+            code = self.codes.get(name)
+            if code is None:
+                code = len(self.names)
+                self.names.append(name)
+                self._new_names.append(name)
+            codes[name] = remap[k] = code
+        self.codes = codes
+        return remap[species_id], traits
+
+    def flush(self):
+        """
+        Hands the days kept in memory to the writer, without waiting for them to be written
+        """
+
+        if not self._pending_days: return
+        block = {"days": {name: np.array(self._days[name], dtype) for name, dtype in DAY_COLUMNS},
+                 "species": {},
+                 "names": self._new_names}
+        if self._species_ids:
+            ids = np.concatenate(self._species_ids)
+            stats = np.concatenate(self._species_stats)
+            for k, (name, dtype) in enumerate(SPECIES_COLUMNS):
+                block["species"][name] = (ids[:, k] if k < 3 else stats[:, k-3]).astype(dtype)
+        self._days = {name: [] for name, _ in DAY_COLUMNS}
+        self._species_ids = []
+        self._species_stats = []
+        self._new_names = []
+        self._pending_days = 0
+        self._queue.put(block)
+
+    def close(self):
+        """
+        Writes every pending day and waits for the writer to finish
+        """
+
+        self.flush()
+        self._queue.put(None)
+        self._writer.join()
+
+    def _write(self):
+        """
+        Appends the blocks of the queue to the files, until a None block is received
+        """
+
+        while True:
+            block = self._queue.get()
+            if block is None: return
+            if block["names"]:
+                with open(self._names_path, "a") as f: f.write("".join(name+"\n" for name in block["names"]))
+            for table in ("days", "species"):
+                for name, values in block[table].items():
+                    with open(os.path.join(self.directory, table+"."+name+".bin"), "ab") as f: values.tofile(f)
+
+def read(directory):
+    """
+    Reads the files written by a Telemetry
+
+        Parameters:
+            directory (str): Folder of the files
+
+        Returns:
+            tables (dict): Array of each column of the "days" and "species" tables,
+                           and the taxonomical name of each species code under "names"
+    """
+
+    with open(os.path.join(directory, "schema.json"), "r") as f: schema = json.load(f)
+
+    tables = {}
+    for table, columns in schema.items():
+        tables[table] = {}
+        for name, dtype in columns:
+            path = os.path.join(directory, table+"."+name+".bin")
+            tables[table][name] = np.fromfile(path, dtype) if os.path.exists(path) else np.zeros(0, dtype)
+
+    names_path = os.path.join(directory, "species_names.txt")
+    tables["names"] = []
+    if os.path.exists(names_path):
+        with open(names_path, "r") as f: tables["names"] = f.read().splitlines()
+
+    return tables
@@ -0,0 +1,107 @@
+'''
+Created on 18 oct 2026
+
+@desc: Fixed-timestep scheduler of simulated days
+@author: Alejandro R. Lopez
+'''
+
+# Imports
+import time
+
+class DayScheduler:
+    """
+    A class to decide how many days to simulate on each rendered frame.
+    Elapsed time is accumulated and one day is simulated for each day_speed
+    seconds, so several days can run between two frames when time is sped up.
+
+        Attributes
+        ----------
+            day_speed : float
+                Seconds of real time per simulated day
+            max_frame_time : float
+                Maximum seconds of simulation per frame, to keep the window responsive
+            accumulator : float
+                Real time not yet simulated
+            days_per_sec : float
+                Days simulated per second during the last measuring window
+
+
+        Methods
+        -------
+            advance(dt, step):
+                Simulates the days due after dt seconds
+            reset():
+                Discards the accumulated time
+    """
+
+    def __init__(self, day_speed, max_frame_time = 0.05, rate_window = 0.5):
+        """
+        Initializes the scheduler.
+
+        Parameters
+        ----------
+            day_speed : float
+                Seconds of real time per simulated day
+            max_frame_time : float
+                Maximum seconds of simulation per frame
+            rate_window : float
+                Seconds between updates of days_per_sec
+        """
+
+        self.day_speed = day_speed
+        self.max_frame_time = max_frame_time
+        self.rate_window = rate_window
+        self.accumulator = 0.0
+        self.days_per_sec = 0.0
+        self._window_days = 0
+        self._window_time = 0.0
+
+    def advance(self, dt, step):
+        """
+        Simulates the days due after dt seconds. If they take longer than max_frame_time,
+        the remaining days are dropped instead of delaying the next frame.
+
+        Parameters
+        ----------
+            dt : float
+                Seconds elapsed since the previous frame
+            step : function
+                Simulates one day
+
+        Returns
+        -------
+            n_days : int
+                Days simulated
+        """
+
+        self.accumulator += dt
+        start = time.perf_counter()
+        n_days = 0
+
+        while self.accumulator >= self.day_speed:
+            step()
+            n_days += 1
+            self.accumulator -= self.day_speed
+            if time.perf_counter() - start >= self.max_frame_time:
+                self.accumulator = min(self.accumulator, self.day_speed)
+                break
+
+        # Achieved speed
+        self._window_days += n_days
+        self._window_time += dt
+        if self._window_time >= self.rate_window:
+            self.days_per_sec = self._window_days/self._window_time
+            self._window_days = 0
+            self._window_time = 0.0
+
+        return n_days
+
+    def reset(self):
+        """
+        Discards the accumulated time, so that a day is due on the next frame
+        """
+
+        self.accumulator = self.day_speed
+        self.days_per_sec = 0.0
+        self._window_days = 0
+        self._window_time = 0.0
@@ -6,8 +6,8 @@ Created on 12 oct 2022
 '''
 
 #Imports
+from graphics import rng
 import numpy as np
-import pygame as pg
 
 # Biome RGB Values
 GRASS = 0
@@ -15,139 +15,132 @@ SAND = 1
 WATER = 2
 RGBs = [(0,175,0), (255,204,153), (0,102,204)]
 
-def createBg(n_squares, sq_size):
+def createBg(n_squares):
     """
-    Defines the background image of the generated world
+    Generates the numerical info of a new random world
     
         Parameters:
             n_squares (int): Tiles of each side of the world
-            sq_size (int): Size of squares
         
         Returns:
             bg_mat (int 2d array): Numerical info of the world
     """
     
     # BG Matrix Generation
-    bg_mat = [[np.random.choice(3, p=[0.1, 0.0, 0.9]) for _ in range(n_squares)] for _ in range(n_squares)]
+    bg_mat = rng.get("world").generator.choice(3, size=(n_squares, n_squares), p=[0.1, 0.0, 0.9]).astype(np.int8)
     
     # Correct world
-    checkWorld(bg_mat, n_squares)
-    
-    # Print world
-    pg.display.init()
-    screen = pg.display.set_mode((n_squares*sq_size, n_squares*sq_size))
-    
-    # Save .png image of the world
-    matrix2Img(bg_mat, n_squares, sq_size, screen)
-    pg.image.save(screen, "bg.png")
+    checkWorld(bg_mat)
     
     # Save the numerical info of the world
     return bg_mat
     
-def matrix2Img(m, n_squares, sq_size, scr):
+def matrix2Img(m, sq_size):
     """
     Transforms a numerical matrix into an image
     
         Parameters:
-            m (list of lists): Background matrix
-            n_squares (int): Tiles of each side of the world
+            m (int 2d array): Background matrix
             sq_size (int): Size of squares
-            scr: Screen display of Pygame
+        
+        Returns:
+            Pygame surface with a square of sq_size pixels for each tile
     """
-    for x in range(n_squares):
-        for y in range(n_squares):
-            pg.draw.rect(scr, RGBs[m[x][y]], pg.Rect(x*sq_size, y*sq_size, sq_size, sq_size))
+    
+    import pygame as pg                                                                 # Only the drawing needs Pygame
+    
+    rgb = np.array(RGBs, np.uint8)[m]
+    rgb = rgb.repeat(sq_size, axis=0).repeat(sq_size, axis=1)
+    return pg.surfarray.make_surface(rgb)
             
-def checkWorld(m, n_squares):
+def checkWorld(m):
     """
     Checks and corrects the world generation
     
         Parameters:
-            m (list of lists): Background matrix
-            n_squares (int): Tiles of each side of the world
+            m (int 2d array): Background matrix
     """
     
-    amplifyBiome(m, n_squares)
-    
-    for x in range(n_squares):
-        for y in range(n_squares):
-            checkIsland(m, x, y, GRASS, n_squares)
-            checkIsland(m, x, y, SAND, n_squares)
-            checkPool(m, x, y, n_squares)
-            genBeach(m, x, y, n_squares)
+    amplifyBiome(m)
+    checkIsland(m, GRASS)
+    checkIsland(m, SAND)
+    checkPool(m)
+    genBeach(m)
             
-def amplifyBiome(m, n_squares):
+def amplifyBiome(m):
     """
-    Amplifies grass zones
+    Amplifies grass zones. Each land tile may turn its upper, left and upper-left
+    neighbours into grass; when several land tiles reach the same neighbour, the 
+    last one in row order decides, as if the tiles were visited one by one.
     
         Parameters:
-            m (list of lists): Background matrix
-            n_squares (int): Tiles of each side of the world
+            m (int 2d array): Background matrix
     """
+    
+    land = m < WATER
+    n_squares = len(m)
+    
+    ## Land tile at each neighbour position (x, y+1), (x+1, y) and (x+1, y+1)
+    from_right = np.zeros_like(land)
+    from_right[:, :-1] = land[:, 1:]
+    from_below = np.zeros_like(land)
+    from_below[:-1, :] = land[1:, :]
+    from_diag = np.zeros_like(land)
+    from_diag[:-1, :-1] = land[1:, 1:]
+    
+    side = rng.get("world").generator.choice(3, size=(n_squares, n_squares), p=[0.8, 0, 0.2])
+    diag = rng.get("world").generator.choice(3, size=(n_squares, n_squares), p=[0.6, 0, 0.4])
+    m[from_right] = side[from_right]
+    m[from_below] = side[from_below]
+    m[from_diag] = diag[from_diag]
+    
+def waterNeighbours(m):
+    """
+    Counts the water tiles next to each tile, out of the four sides
+    
+        Parameters:
+            m (int 2d array): Background matrix
         
-    for x in range(n_squares):
-        for y in range(n_squares):
-            if m[x][y] < 2:
-                if y-1 >= 0: m[x][y-1] = np.random.choice(3, p=[0.8, 0, 0.2])
-                if x-1 >= 0: m[x-1][y] = np.random.choice(3, p=[0.8, 0, 0.2]) 
-                if y-1 >= 0 and x-1 >= 0: m[x-1][y-1] = np.random.choice(3, p=[0.6, 0, 0.4])
+        Returns:
+            count (int 2d array): Number of water neighbours
+    """
+    
+    water = (m == WATER).astype(np.int8)
+    count = np.zeros_like(water)
+    count[:, 1:] += water[:, :-1]
+    count[:, :-1] += water[:, 1:]
+    count[1:, :] += water[:-1, :]
+    count[:-1, :] += water[1:, :]
+    return count
 
-def checkIsland(m, x, y, i_type, n_squares):
+def checkIsland(m, i_type):
     """
     Remove islands of only one square
     
         Parameters:
-            m (list of lists): Background matrix
-            x (int): Current row position
-            y (int): Current column position
-            type (int constant): Biome type of island to check
-            n_squares (int): Tiles of each side of the world
+            m (int 2d array): Background matrix
+            i_type (int constant): Biome type of island to check
     """
     
-    lim = n_squares-1
-    
-    if m[x][y] == i_type:
-        island = False
-        if (y-1 >= 0 and m[x][y-1] == WATER) and (y+1 <= lim and m[x][y+1] == WATER) and \
-           (x-1 >= 0 and m[x-1][y] == WATER) and (x+1 <= lim and m[x+1][y] == WATER): island = True
-    
-        if island: m[x][y] = WATER
+    m[(m == i_type) & (waterNeighbours(m) == 4)] = WATER
         
-def checkPool(m, x, y, n_squares):
+def checkPool(m):
     """
     Remove pools of only one square
     
         Parameters:
-            m (list of lists): Background matrix
-            x (int): Current row position
-            y (int): Current column position
-            n_squares (int): Tiles of each side of the world
+            m (int 2d array): Background matrix
     """
     
-    lim = n_squares-1
-    
-    if m[x][y] == WATER:
-        pool = True
-        if (y-1 >= 0 and m[x][y-1] == WATER) or (y+1 <= lim and m[x][y+1] == WATER) or \
-           (x-1 >= 0 and m[x-1][y] == WATER) or (x+1 <= lim and m[x+1][y] == WATER): pool = False
-    
-        if pool: m[x][y] = GRASS
+    m[(m == WATER) & (waterNeighbours(m) == 0)] = GRASS
         
-def genBeach(m, x, y, n_squares):
+def genBeach(m):
     """
     Add sand to beach zones
     
         Parameters:
-            m (list of lists): Background matrix
-            x (int): Current row position
-            y (int): Current column position
-            n_squares (int): Tiles of each side of the world
+            m (int 2d array): Background matrix
     """
     
-    lim = n_squares-1
-    
-    if m[x][y] == GRASS:
-        if (y-1 >= 0 and m[x][y-1] == WATER) or (y+1 <= lim and m[x][y+1] == WATER) or \
-           (x-1 >= 0 and m[x-1][y] == WATER) or (x+1 <= lim and m[x+1][y] == WATER): 
-            m[x][y] = np.random.choice(3, p=[0.6, 0.3, 0.1])
-            
\ No newline at end of file
+    beach = (m == GRASS) & (waterNeighbours(m) > 0)
+    m[beach] = rng.get("world").generator.choice(3, size=np.count_nonzero(beach), p=[0.6, 0.3, 0.1])
@@ -7,37 +7,161 @@ Created on 12 oct 2022
 
 # Imports
 import pygame as pg
+import argparse
+import os
 from graphics import world_gen as wg
 from graphics import species_gen as sg
 from graphics import menu_info as mi
-import time
+from graphics import assets
+from graphics import checkpoint
+from graphics import profiler
+from graphics.camera import Camera, ChunkedBackground
+from graphics.population import Population
+from graphics.replay import Replay
+from graphics.timestep import DayScheduler
+from time import perf_counter
+
+# Functions
+def hud_text(days, pause_time, scheduler, last_day = None):
+    """
+    Returns the text of the day counter, with the achieved speed while time is advancing
+    
+        Parameters:
+            days (int): Current day
+            pause_time (bool): Whether time is paused
+            scheduler (DayScheduler): Scheduler of the simulated days
+            last_day (int): Last day of the replay, if playing one back
+    """
+    
+    text = "Day: "+str(days) if last_day is None else "Day: "+str(days)+"/"+str(last_day)
+    if pause_time: return text
+    return text+"  ("+str(round(scheduler.days_per_sec, 1))+" days/s)"
+
+def draw_timeline(scr, days, replay):
+    """
+    Draws the timeline of a replay at the bottom of the screen, filled up to the current day
+    
+        Parameters:
+            scr: Screen display of Pygame
+            days (int): Current day
+            replay (Replay): Replay played back
+        
+        Returns:
+            rect (Rect): Area of the timeline
+    """
+    
+    rect = pg.Rect(0, scr.get_height()-timeline_height, scr.get_width(), timeline_height)
+    span = max(replay.last_day - replay.first_day, 1)
+    scr.fill((255,255,230), rect)
+    scr.fill((90,90,90), (0, rect.y, round(rect.width*(days - replay.first_day)/span), rect.height))
+    return rect
+
+def timeline_day(x, replay):
+    """
+    Returns the day of a replay under a horizontal position of the timeline
+    
+        Parameters:
+            x (int): Horizontal position on the screen
+            replay (Replay): Replay played back
+    """
+    
+    return replay.first_day + round(x/win_size*(replay.last_day - replay.first_day))
+
+def perf_hud(prof):
+    """
+    Returns an image with the rolling averages of the profiler: time of each phase of a frame
+    and of a simulated day in milliseconds, and the counters of a day
+    
+        Parameters:
+            prof (Profiler): Active profiler
+    """
+    
+    frame = prof.frame_averages()
+    day = prof.day_averages()
+    ms = lambda values, name: str(round(values.get(name, 0)*1000, 2))
+    count = lambda name: str(round(day.get(name, 0), 1))
+    lines = ["Frame: "+ms(frame, "frame")+" ms (sim "+ms(frame, "simulation")+", render "+ms(frame, "render")
+             +", flip "+ms(frame, "flip")+")  days/frame "+str(round(frame.get("days", 0), 2)),
+             "Day: "+ms(day, "total")+" ms (walk "+ms(day, "walk")+", conception "+ms(day, "conception")
+             +", mates "+ms(day, "mate_search")+", death "+ms(day, "death")+", apply "+ms(day, "apply")+")",
+             "Population "+count("population")+"  births "+count("births")+"  deaths "+count("deaths"),
+             "Mate searches "+count("mate_searches")+"  step redraws "+count("step_redraws")
+             +"  fallbacks "+count("step_fallbacks")]
+    
+    font = assets.get_font('Consolas', 16)
+    texts = [font.render(line, True, (0,0,0)) for line in lines]
+    hud = pg.Surface((max(t.get_width() for t in texts) + 10, sum(t.get_height() for t in texts) + 6))
+    hud.fill((255,255,230))
+    y = 3
+    for t in texts:
+        hud.blit(t, (5, y))
+        y += t.get_height()
+    return hud
 
 # Variables
+## World size (python main.py --size 200 for a world larger than the window)
+parser = argparse.ArgumentParser(description = "Simulation of evolving process and natural selection.")
+parser.add_argument("--size", type = int, default = 25, help = "tiles of each side of the world")
+parser.add_argument("--sq-size", type = int, default = 35, help = "size of squares")
+parser.add_argument("--engine", choices = ["objects", "arrays"], default = "objects", help = "population storage")
+parser.add_argument("--replay", help = "file recorded by graphics.run --replay to play back instead of simulating")
+args = parser.parse_args()
+n_squares = args.size
+sq_size = args.sq_size
+## Replay (right/left arrows to play forward/backward, comma/period for one day, click or drag the timeline to seek)
+replay = Replay(args.replay) if args.replay else None
+last_day = replay.last_day if replay is not None else None
+if replay is not None:
+    n_squares = len(replay.bg_mat)
+    sq_size = replay.sq_size
+direction = 1                                                                           # Direction of the playback
+scrubbing = False                                                                       # Timeline dragged with the mouse
+timeline_height = 12
+timeline_rect = pg.Rect(0, 0, 0, 0)                                                     # Area covered by the timeline
 ## Screen size
-n_squares = 25
-sq_size = 35
+win_size = min(n_squares*sq_size, 875)
+## Camera (W, A, S, D or mouse drag to move, mouse wheel or +/- to zoom, Home to zoom out)
+pan_speed = 600                                                                         # Screen pixels per second
+drawn_view = None                                                                       # Camera of the current view image
 ## Main loop
 finish = False
 days = 0
-individuals = []
+individuals = Population() if args.engine == "arrays" else []
 pause_time = True
-day_speed = 0.15
+scheduler = DayScheduler(day_speed = 0.15)                                              # Real seconds per simulated day
+clock = pg.time.Clock()
+fps = 60
 menu = False
+## Checkpoint file (F5 to save, F9 to load)
+checkpoint_path = "checkpoint.npz"
+## Display
+redraw = True                                                                           # Whole window must be drawn again
+drawn = []                                                                              # Areas covered by individuals
+text_rect = pg.Rect(0, 0, 0, 0)                                                         # Area covered by the day counter
+## Performance overlay (P to show or hide)
+perf_rect = pg.Rect(0, 0, 0, 0)                                                         # Area covered by the overlay
+perf_refresh = 0.5                                                                      # Real seconds between refreshes while paused
+perf_timer = 0.0
 
 # Pyhame display initialitation
 pg.display.init()
-screen = pg.display.set_mode((n_squares*sq_size, n_squares*sq_size))
+screen = pg.display.set_mode((win_size, win_size))
 pg.display.set_caption('Natural Selection Simulator')
 pg.font.init()
-font = pg.font.SysFont('Consolas', 30)
+font = assets.get_font('Consolas', 30)
 
-# Create a new random world and save it
-bg_mat = wg.createBg(n_squares, sq_size)
+# Create a new random world, or take the one of the replay and its first day, the camera and the image of its view
+if replay is None: bg_mat = wg.createBg(n_squares)
+else:
+    bg_mat = replay.bg_mat
+    individuals = replay.seek(replay.first_day)
+    days = individuals.day
+background = ChunkedBackground(bg_mat)
+camera = Camera(n_squares, sq_size, (win_size, win_size))
+bg = pg.Surface((win_size, win_size)).convert()
 
 # Load pre-saved images
-bg = pg.image.load("bg.png").convert()
-menu_img = pg.image.load(".\\img\\menu.png").convert_alpha()
-menu_img = pg.transform.scale(menu_img, (n_squares*sq_size*0.8, n_squares*sq_size*0.8))
+menu_img = assets.load_image("menu.png", (win_size*0.8, win_size*0.8))
 
 # Main loop
 while not finish:
@@ -52,49 +176,172 @@ while not finish:
                 finish = True
             elif event.key == pg.K_RIGHT and menu == False:                             # Right arrow to advance time
                 pause_time = False    
+                direction = 1
+                scheduler.reset()
+            elif event.key == pg.K_LEFT and replay is not None:                         # Left arrow to play the replay backward
+                pause_time = False
+                direction = -1
+                scheduler.reset()
+            elif event.key in (pg.K_COMMA, pg.K_PERIOD) and replay is not None:         # Comma/period to show the previous/next day
+                individuals = replay.seek(days + (1 if event.key == pg.K_PERIOD else -1))
+                days = individuals.day
+                redraw = True
             elif event.key == pg.K_UP:                                                  # Up arrow to increase advancing speed
-                day_speed /= 2
+                scheduler.day_speed /= 2
             elif event.key == pg.K_DOWN:                                                # Down arrow to decrease advancing speed
-                day_speed *= 2
-            elif event.key == pg.K_SPACE and menu == False:                             # Space to generate new species
+                scheduler.day_speed *= 2
+            elif event.key == pg.K_SPACE and menu == False and replay is None:          # Space to generate new species
                 sg.gen_individuals(n_squares, sq_size, bg_mat, individuals, 49) 
-            elif event.key == pg.K_m:  
+                redraw = True
+            elif event.key == pg.K_m and replay is None:  
                 if individuals: menu = not menu                                         # M to open or close the menu
+                redraw = True
+            elif event.key == pg.K_F5 and replay is None:                               # F5 to save the simulation
+                checkpoint.save(checkpoint_path, bg_mat, individuals, sq_size, days)
+            elif event.key == pg.K_F9 and menu == False and replay is None:             # F9 to load the saved simulation
+                if not os.path.exists(checkpoint_path): print("ATTENTION: There is no saved simulation.")
+                else:
+                    saved = checkpoint.load(checkpoint_path)
+                    if saved[2] != sq_size:
+                        print("ATTENTION: The saved simulation has a different size of squares.")
+                    else:
+                        bg_mat, individuals, _, days = saved
+                        n_squares = len(bg_mat)
+                        background = ChunkedBackground(bg_mat)
+                        camera = Camera(n_squares, sq_size, (win_size, win_size))
+                        drawn_view = None
+                        redraw = True
+            elif event.key in (pg.K_PLUS, pg.K_EQUALS, pg.K_KP_PLUS):                   # + to zoom in
+                camera.zoom_at(1)
+            elif event.key in (pg.K_MINUS, pg.K_KP_MINUS):                              # - to zoom out
+                camera.zoom_at(-1)
+            elif event.key == pg.K_HOME:                                                # Home to zoom out as much as possible
+                camera.fit()
+            elif event.key == pg.K_p:                                                   # P to show or hide the performance overlay
+                if profiler.active: profiler.disable()
+                else: profiler.enable()
+                redraw = True
                            
         # Key up events
         elif event.type == pg.KEYUP:
-            if event.key == pg.K_RIGHT:
+            if event.key == pg.K_RIGHT or (event.key == pg.K_LEFT and replay is not None):
                     pause_time = True
+                    redraw = True
+                    
+        # Mouse events
+        elif event.type == pg.MOUSEWHEEL:                                               # Mouse wheel to zoom on the pointer
+            camera.zoom_at(event.y, pg.mouse.get_pos())
+        elif event.type == pg.MOUSEBUTTONDOWN and event.button == 1 and timeline_rect.collidepoint(event.pos):
+            scrubbing = True                                                            # Click on the timeline to seek
+        elif event.type == pg.MOUSEBUTTONUP and event.button == 1:
+            scrubbing = False
+        elif event.type == pg.MOUSEMOTION and event.buttons[0] and not scrubbing:       # Drag to move the camera
+            camera.pan(-event.rel[0], -event.rel[1])
+        
+        # Seek the day under the pointer while the timeline is held
+        if scrubbing and event.type in (pg.MOUSEBUTTONDOWN, pg.MOUSEMOTION):
+            individuals = replay.seek(timeline_day(event.pos[0], replay))
+            days = individuals.day
+            redraw = True
   
     
-    # Display world
-    screen.blit(bg, (0, 0))
+    # Real time since the previous frame
+    dt = clock.tick(fps)/1000
+    prof = profiler.active
+    frame_start = perf_counter()
+    
+    # Move the camera with W, A, S and D
+    keys = pg.key.get_pressed()
+    camera.pan((keys[pg.K_d]-keys[pg.K_a])*pan_speed*dt, (keys[pg.K_s]-keys[pg.K_w])*pan_speed*dt)
     
-    # Display each individual
-    sg.display_individuals(individuals, screen)  
+    # Draw the world under the camera again when it has changed
+    if drawn_view != (camera.ox, camera.oy, camera.tile_px):
+        background.draw(bg, camera)
+        drawn_view = (camera.ox, camera.oy, camera.tile_px)
+        redraw = True
     
-    # Display menu
-    if menu:
-        screen.blit(menu_img, (n_squares*sq_size*0.1, n_squares*sq_size*0.1))   
-        dominant_name = mi.get_dominant_species(individuals)
-        info = mi.get_dominant_info(dominant_name, individuals)
-        mi.display_info(info, screen, n_squares*sq_size)
+    # When time is advancing, simulate the days due and render only the last one
+    day_passed = False
+    if not pause_time and replay is None:
+        n_days = scheduler.advance(dt, lambda: sg.update_individuals(individuals, n_squares, sq_size, bg_mat))
+        days += n_days
+        day_passed = n_days > 0
+        if prof: prof.add_frame("days", n_days)
+    # A replay jumps to the last day due at once, without reading the days in between twice
+    elif not pause_time:
+        n_days = scheduler.advance(dt, lambda: None)
+        if n_days > 0:
+            individuals = replay.seek(days + direction*n_days)
+            n_days = abs(individuals.day - days)
+            days = individuals.day
+        day_passed = n_days > 0
+        if prof: prof.add_frame("days", n_days)
+    sim_end = perf_counter()
     
-    # When time is advancing
-    if not pause_time:
-        days += 1
+    # Refresh the performance overlay from time to time while nothing else changes
+    if prof:
+        perf_timer += dt
+        if perf_timer >= perf_refresh and not day_passed: redraw = True
+    
+    # Display the whole window
+    if redraw or menu:
+        # Display world
         screen.blit(bg, (0, 0))
-        sg.update_individuals(individuals, n_squares, sq_size, bg_mat) 
-        sg.display_individuals(individuals, screen) 
-        time.sleep(day_speed)
-     
-    # Display day counter   
-    text = font.render("Day: "+str(days), True, (0,0,0), (255,255,230))
-    screen.blit(text, (5,0))
-    
-    # Update display
-    pg.display.flip()
+        
+        # Display each individual
+        drawn = sg.display_individuals(individuals, screen, camera)  
+        
+        # Display menu
+        if menu:
+            screen.blit(menu_img, (win_size*0.1, win_size*0.1))   
+            dominant = mi.get_dominant_species(individuals)
+            info = mi.get_dominant_info(dominant, individuals)
+            mi.display_info(info, screen, win_size)
+        
+        # Display day counter   
+        text = font.render(hud_text(days, pause_time, scheduler, last_day), True, (0,0,0), (255,255,230))
+        text_rect = screen.blit(text, (5,0))
+        
+        # Display performance overlay
+        perf_rect = screen.blit(perf_hud(prof), (5, text_rect.bottom)) if prof else pg.Rect(0, 0, 0, 0)
+        perf_timer = 0.0
+        
+        # Display timeline of the replay
+        if replay is not None: timeline_rect = draw_timeline(screen, days, replay)
+        
+        # Update display
+        render_end = perf_counter()
+        pg.display.flip()
+        redraw = False
+        
+    # Display only the areas that have changed
+    elif day_passed:
+        # Erase the previous day
+        erased = drawn + [text_rect, perf_rect, timeline_rect]
+        screen.blits([(bg, r, r) for r in erased])
+        
+        # Display each individual, the day counter, the performance overlay and the timeline
+        drawn = sg.display_individuals(individuals, screen, camera)
+        text = font.render(hud_text(days, pause_time, scheduler, last_day), True, (0,0,0), (255,255,230))
+        text_rect = screen.blit(text, (5,0))
+        perf_rect = screen.blit(perf_hud(prof), (5, text_rect.bottom)) if prof else pg.Rect(0, 0, 0, 0)
+        perf_timer = 0.0
+        if replay is not None: timeline_rect = draw_timeline(screen, days, replay)
+        
+        # Update display
+        render_end = perf_counter()
+        pg.display.update(erased + drawn + [text_rect, perf_rect, timeline_rect])
+    else: render_end = perf_counter()
+    
+    # Time of each phase of the frame, without the wait for the next one
+    if prof:
+        frame_end = perf_counter()
+        prof.add_frame("simulation", sim_end - frame_start)
+        prof.add_frame("render", render_end - sim_end)
+        prof.add_frame("flip", frame_end - render_end)
+        prof.add_frame("frame", frame_end - frame_start)
+        prof.end_frame()
 
 # Free resources
-del individuals[:]
+if replay is None: del individuals[:]
 pg.quit()
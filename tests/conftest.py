@@ -0,0 +1,39 @@
+'''
+Created on 18 oct 2026
+
+@desc: Shared fixtures of the tests
+@author: Alejandro R. Lopez
+'''
+
+# Imports
+import os
+import sys
+
+# The taxonomical names are read from the working directory when graphics.species is imported
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+os.chdir(ROOT)
+sys.path.insert(0, ROOT)
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+from graphics import rng
+from graphics import species
+from graphics import species_gen as sg
+from graphics import species_stats
+from graphics import lifecycle
+import pytest
+
+@pytest.fixture
+def fresh():
+    """
+    Returns a function that empties the module state and seeds the random streams,
+    like a new process would start
+    """
+
+    def reset(seed):
+        species.reset_taxonomy()
+        species.next_id = 0
+        sg.pregnancies.clear()
+        species_stats.reset()
+        lifecycle.reset()
+        rng.seed(seed)
+    return reset
@@ -0,0 +1,55 @@
+'''
+Created on 18 oct 2026
+
+@desc: Tests of the checkpoints of a simulation
+@author: Alejandro R. Lopez
+'''
+
+# Imports
+from graphics import checkpoint
+from graphics import run
+from graphics import species_gen as sg
+import numpy as np
+import pytest
+
+def saved_arrays(path):
+    """
+    Returns every array of a checkpoint file
+    """
+
+    with np.load(path, allow_pickle = False) as data: return {name: data[name] for name in data.files}
+
+@pytest.mark.parametrize("engine", ["objects", "arrays"])
+def test_resumed_run_matches_straight_run(engine, fresh, tmp_path):
+    straight = str(tmp_path/"straight.npz")
+    half = str(tmp_path/"half.npz")
+    resumed = str(tmp_path/"resumed.npz")
+
+    fresh(7)
+    report = run.run(300, 5, 25, 35, engine = engine, seed = 7, checkpoint = straight)
+    assert report["days"] == 300
+
+    fresh(7)
+    run.run(150, 5, 25, 35, engine = engine, seed = 7, checkpoint = half)
+    fresh(0)                                                                            # Nothing is left from the first half
+    report = run.run(150, 5, 25, 35, resume = half, checkpoint = resumed)
+    assert report["last_day"] == 300
+
+    expected = saved_arrays(straight)
+    found = saved_arrays(resumed)
+    assert found.keys() == expected.keys()
+    for name in expected: np.testing.assert_array_equal(found[name], expected[name], err_msg = name)
+
+def test_checkpoint_restores_embryos(fresh, tmp_path):
+    path = str(tmp_path/"state.npz")
+    fresh(3)
+    run.run(60, 5, 25, 35, seed = 3, checkpoint = path)
+    _, individuals, _, _ = checkpoint.load(path)
+    litters = {m.id: sorted(e.id for e in litter) for m, litter in sg.pregnancies.items()}
+    assert litters
+
+    fresh(0)
+    _, reloaded, _, _ = checkpoint.load(path)
+    assert [i.id for i in reloaded] == [i.id for i in individuals]
+    assert {m.id: sorted(e.id for e in litter) for m, litter in sg.pregnancies.items()} == litters
+    assert all(m in reloaded for m in sg.pregnancies)
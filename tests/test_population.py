@@ -0,0 +1,44 @@
+'''
+Created on 18 oct 2026
+
+@desc: Tests of the array engine against the list of individuals
+@author: Alejandro R. Lopez
+'''
+
+# Imports
+from graphics import species_gen as sg
+from graphics import world_gen as wg
+from graphics.population import Population
+import numpy as np
+
+SEEDS = range(10)
+DAYS = 60
+TRAITS = ("size", "old_age_death", "childhood", "offspring_number")
+
+def outcome(fresh, engine, seed, n_squares = 25, sq_size = 35):
+    """
+    Returns the mean population of the first days and once settled, the surviving species
+    and the mean traits of a seeded run
+    """
+
+    fresh(seed)
+    bg_mat = wg.createBg(n_squares)
+    individuals = []
+    for _ in range(5): sg.gen_individuals(n_squares, sq_size, bg_mat, individuals, 49)
+    if engine == "arrays": individuals = Population(individuals)
+    sizes = []
+    for _ in range(DAYS):
+        sg.update_individuals(individuals, n_squares, sq_size, bg_mat)
+        sizes.append(len(individuals))
+    traits = [np.mean([getattr(i, t) for i in individuals]) for t in TRAITS]
+    return [np.mean(sizes[:5]), np.mean(sizes[20:]), len({i.species_id for i in individuals})] + traits
+
+def test_engines_agree(fresh):
+    objects = np.array([outcome(fresh, "objects", seed) for seed in SEEDS])
+    arrays = np.array([outcome(fresh, "arrays", seed) for seed in SEEDS])
+
+    # Means over the seeds within four standard errors of their difference
+    error = np.sqrt(objects.var(0, ddof = 1)/len(SEEDS) + arrays.var(0, ddof = 1)/len(SEEDS))
+    difference = np.abs(objects.mean(0) - arrays.mean(0))
+    names = ["first days", "settled", "species"] + list(TRAITS)
+    for name, d, e in zip(names, difference, error): assert d <= 4*e + 0.5, name
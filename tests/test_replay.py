@@ -0,0 +1,95 @@
+'''
+Created on 18 oct 2026
+
+@desc: Tests of the recording and playback of replays
+@author: Alejandro R. Lopez
+'''
+
+# Imports
+from graphics import species_gen as sg
+from graphics import world_gen as wg
+from graphics.population import Population
+from graphics.replay import Recorder, Replay
+import numpy as np
+import pygame as pg
+import pytest
+
+N_SQUARES = 25
+SQ_SIZE = 35
+
+def pixels(ind_list):
+    """
+    Returns the pixels drawn by display_individuals for a population
+    """
+
+    scr = pg.Surface((N_SQUARES*SQ_SIZE, N_SQUARES*SQ_SIZE))
+    sg.display_individuals(ind_list, scr)
+    return pg.surfarray.array3d(scr)
+
+def snapshot(ind_list):
+    """
+    Returns the identifiers, the locations and the pixels of a population
+    """
+
+    if isinstance(ind_list, Population):
+        ind_list._flush()
+        return ind_list.cols["id"].tolist(), ind_list.cols["location"].tolist(), pixels(ind_list)
+    return [i.id for i in ind_list], [list(i.location) for i in ind_list], pixels(ind_list)
+
+def record(path, engine, days, keyframe_every):
+    """
+    Records a new simulation and returns the snapshot of each day
+    """
+
+    bg_mat = wg.createBg(N_SQUARES)
+    individuals = Population() if engine == "arrays" else []
+    for _ in range(5): sg.gen_individuals(N_SQUARES, SQ_SIZE, bg_mat, individuals, 49)
+    expected = {}
+    with Recorder(path, bg_mat, SQ_SIZE, individuals, 0, keyframe_every) as recorder:
+        expected[0] = snapshot(individuals)
+        for day in range(1, days+1):
+            sg.update_individuals(individuals, N_SQUARES, SQ_SIZE, bg_mat)
+            recorder.record(individuals)
+            expected[day] = snapshot(individuals)
+    return bg_mat, expected
+
+@pytest.mark.parametrize("engine", ["objects", "arrays"])
+def test_seek_returns_every_recorded_day(engine, fresh, tmp_path):
+    path = str(tmp_path/"run.rpl")
+    fresh(2)
+    bg_mat, expected = record(path, engine, 200, 16)
+    assert expected[200][0]                                                             # Still alive on the last day
+
+    replay = Replay(path)
+    assert (replay.first_day, replay.last_day, replay.sq_size) == (0, 200, SQ_SIZE)
+    np.testing.assert_array_equal(replay.bg_mat, bg_mat)
+
+    # Forward, backward and in random order, across keyframes
+    days = list(range(201)) + list(range(200, -1, -1)) + np.random.default_rng(0).permutation(201).tolist()
+    for day in days:
+        frame = replay.seek(day)
+        ids, location, drawn = expected[day]
+        assert frame.day == day
+        assert replay.static["id"][frame.rows].tolist() == ids, day
+        assert frame.location.tolist() == location, day
+        assert np.array_equal(pixels(frame), drawn), day
+
+def test_seek_clamps_to_the_recorded_days(fresh, tmp_path):
+    path = str(tmp_path/"run.rpl")
+    fresh(2)
+    record(path, "objects", 20, 8)
+    replay = Replay(path)
+    assert replay.seek(-5).day == 0
+    assert replay.seek(1000).day == 20
+
+def test_unfinished_recording_is_rejected(fresh, tmp_path):
+    path = str(tmp_path/"run.rpl")
+    fresh(2)
+    bg_mat = wg.createBg(N_SQUARES)
+    individuals = []
+    sg.gen_individuals(N_SQUARES, SQ_SIZE, bg_mat, individuals, 49)
+    recorder = Recorder(path, bg_mat, SQ_SIZE, individuals)
+    recorder.record(individuals)
+    recorder._file.flush()
+    with pytest.raises(ValueError): Replay(path)
+    recorder.close()
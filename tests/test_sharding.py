@@ -0,0 +1,105 @@
+'''
+Created on 18 oct 2026
+
+@desc: Tests of the simulation of a world split in regions
+@author: Alejandro R. Lopez
+'''
+
+# Imports
+from graphics import run
+from graphics import species
+from graphics import species_gen as sg
+from graphics import world_gen as wg
+from graphics.sharding import Layout, ShardedWorld, shard_shape
+import numpy as np
+
+def make_world(n_squares = 25, sq_size = 35, n_species = 5):
+    """
+    Returns a new world and its individuals
+    """
+
+    bg_mat = wg.createBg(n_squares)
+    individuals = []
+    for _ in range(n_species): sg.gen_individuals(n_squares, sq_size, bg_mat, individuals, 49)
+    return bg_mat, individuals
+
+def test_layout_covers_the_world():
+    rows, cols = shard_shape(6)
+    assert rows*cols == 6
+    layout = Layout(rows, cols, 875, 50)
+    for location in [(0, 0), (874, 874), (437, 100), (-5, 900)]:
+        k = layout.shard_of(location)
+        assert 0 <= k < 6
+        assert k in layout.near(location)
+    assert len(layout.near((437, 437))) > 1                                             # Border between regions
+
+def test_sharded_runs_are_reproducible(fresh, tmp_path):
+    saved = []
+    for name in ("first.npz", "second.npz"):
+        fresh(11)
+        report = run.run(100, 5, 25, 35, seed = 11, shards = 4, checkpoint = str(tmp_path/name))
+        assert report["days"] == 100
+        with np.load(str(tmp_path/name), allow_pickle = False) as data: saved.append({f: data[f] for f in data.files})
+    assert saved[0].keys() == saved[1].keys()
+    for f in saved[0]: np.testing.assert_array_equal(saved[0][f], saved[1][f], err_msg = f)
+
+def test_collect_returns_every_individual(fresh):
+    fresh(5)
+    bg_mat, individuals = make_world()
+    with ShardedWorld(bg_mat, 25, 35, individuals, 4) as world:
+        for _ in range(60): world.step()
+        n = len(world)
+        assert n > 0
+        collected = world.collect()
+
+        # Every individual once, with its embryos and a species still registered
+        assert len(collected) == n
+        ids = [i.id for i in collected]
+        assert len(set(ids)) == len(ids)
+        assert set(sg.pregnancies) <= set(collected)
+        assert all(species.species[i.species_id] is not None for i in collected)
+        assert species.next_id > max(ids)
+
+        # The processes keep their individuals
+        world.step()
+        assert len(world) > 0
+
+def test_collected_individuals_continue_in_one_process(fresh):
+    fresh(5)
+    bg_mat, individuals = make_world()
+    with ShardedWorld(bg_mat, 25, 35, individuals, 2) as world:
+        for _ in range(30): world.step()
+        collected = world.collect()
+    for _ in range(30): sg.update_individuals(collected, 25, 35, bg_mat)
+    ids = [i.id for i in collected]
+    assert len(set(ids)) == len(ids)
+
+def outcome(fresh, seed, shards, days = 60):
+    """
+    Returns the mean population once settled and the surviving species of a seeded run
+    """
+
+    fresh(seed)
+    bg_mat, individuals = make_world()
+    sizes = []
+    if shards:
+        with ShardedWorld(bg_mat, 25, 35, individuals, shards) as world:
+            for _ in range(days):
+                world.step()
+                sizes.append(len(world))
+            individuals = world.collect()
+    else:
+        for _ in range(days):
+            sg.update_individuals(individuals, 25, 35, bg_mat)
+            sizes.append(len(individuals))
+    return [np.mean(sizes[:5]), np.mean(sizes[20:]), len({i.species_id for i in individuals})]
+
+def test_sharded_runs_match_one_process(fresh):
+    seeds = range(8)
+    single = np.array([outcome(fresh, seed, 0) for seed in seeds])
+    sharded = np.array([outcome(fresh, seed, 4) for seed in seeds])
+
+    # Means over the seeds within four standard errors of their difference
+    error = np.sqrt(single.var(0, ddof = 1)/len(seeds) + sharded.var(0, ddof = 1)/len(seeds))
+    difference = np.abs(single.mean(0) - sharded.mean(0))
+    for name, d, e in zip(["first days", "settled", "species"], difference, error): assert d <= 4*e + 0.5, name
@@ -0,0 +1,61 @@
+'''
+Created on 18 oct 2026
+
+@desc: Tests of the grid index of the population
+@author: Alejandro R. Lopez
+'''
+
+# Imports
+from graphics import species
+from graphics import species_gen as sg
+from graphics import world_gen as wg
+from graphics import spatial_grid
+from graphics.spatial_grid import PartitionedGrid, partition_key
+import numpy as np
+import pytest
+
+@pytest.mark.parametrize("radius", [35, 105])
+def test_query_partition_matches_a_full_scan(fresh, radius):
+    fresh(9)
+    bg_mat = wg.createBg(25)
+    individuals = []
+    for _ in range(5): sg.gen_individuals(25, 35, bg_mat, individuals, 49)
+    grid = PartitionedGrid(35, individuals)
+
+    # Some individuals moved after indexing
+    r = np.random.default_rng(9)
+    for i in individuals[::3]:
+        i.location = (int(r.integers(0, 875)), int(r.integers(0, 875)))
+        grid.move(i)
+
+    keys = {partition_key(i) for i in individuals}
+    for i in individuals[::7]:
+        for key in keys:
+            found = list(grid.query_partition(key, i.location, radius))
+            expected = [j for j in individuals if partition_key(j) == key and sg.euclidean_dist(j.location, i.location) <= radius]
+            assert len(found) == len(set(found))
+            assert set(found) == set(expected)
+
+@pytest.mark.parametrize("dense", [spatial_grid.DENSE, 0])
+def test_nearest_matches_a_full_scan(fresh, monkeypatch, dense):
+    monkeypatch.setattr(spatial_grid, "DENSE", dense)                                   # 0 to search the spots
+    fresh(9)
+    bg_mat = wg.createBg(25)
+    individuals = []
+    for _ in range(5): sg.gen_individuals(25, 35, bg_mat, individuals, 49)
+    grid = PartitionedGrid(35, individuals)
+
+    # Some individuals moved after indexing, and again after the first searches
+    r = np.random.default_rng(9)
+    for start in range(2):
+        for i in individuals[start::3]:
+            i.location = (int(r.integers(0, 875)), int(r.integers(0, 875)))
+            grid.move(i)
+
+        for i in individuals[::5]:
+            keys = [(i.species_id, species.MALE, s_type) for s_type in (species.TERRESTRIAL, species.AQUATIC)]
+            found = grid.nearest(keys, i.location, 35)
+            distances = [sg.euclidean_dist(j.location, i.location) for j in individuals if partition_key(j) in keys]
+            distances = [d for d in distances if d <= 35]
+            if not distances: assert found is None
+            else: assert sg.euclidean_dist(found.location, i.location) == min(distances)